@@ -6,7 +6,6 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from accounts.serializers import RegisterSerializer
 from django.contrib.auth import authenticate
-from django.db import connection
 from accounts.models import CustomUser
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -57,17 +56,10 @@ def get_subcategory_tags(request):
     """
     여행지 태그 목록을 가져오는 API - subcategory0만 추출
     """
-    with connection.cursor() as cursor:
-        # 정확한 subcategory0 목록만 추출하는 쿼리
-        cursor.execute("""
-            SELECT DISTINCT json_extract(subcategories, '$[0]') AS first_subcategory
-            FROM destinations_location
-            WHERE json_extract(subcategories, '$[0]') IS NOT NULL
-            ORDER BY first_subcategory;
-        """)
-        subcategories = [row[0] for row in cursor.fetchall() if row[0]]
-        
-        print("추출된 subcategory0 목록:", subcategories)
+    from destinations.location_tags import first_subcategories
+    
+    # 정확한 subcategory0 목록만 추출 (LocationTag의 (kind, position, value) 인덱스 조회)
+    subcategories = first_subcategories()
     
     return Response({"tags": subcategories}, status=status.HTTP_200_OK)
 
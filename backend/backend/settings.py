@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -57,7 +58,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'corsheaders.middleware.CorsMiddleware'
+    'corsheaders.middleware.CorsMiddleware',
+    'destinations.middleware.ServerTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -164,4 +166,95 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_METHODS = ["GET", "POST", "OPTIONS", "PUT", "PATCH", "DELETE"]
 CORS_ALLOW_HEADERS = ["*"]
 
-CSRF_TRUSTED_ORIGINS = ["http://localhost:8080", "http://127.0.0.1:8080"]
\ No newline at end of file
+CSRF_TRUSTED_ORIGINS = ["http://localhost:8080", "http://127.0.0.1:8080"]
+
+# NLP 여행지 검색 설정
+# 'matrix': 임베딩 행렬 + 벡터화된 점수 계산, 'hybrid': BM25 + 임베딩 후보 순위 결합, 'legacy': 여행지별 유사도 계산 루프
+NLP_SEARCH_ENGINE = 'matrix'
+
+# 결합 검색('hybrid') 설정: 결합 방식('rrf' 또는 'weighted'), 검색기별 가중치, RRF 순위 완충 상수
+NLP_HYBRID_FUSION = 'rrf'
+NLP_HYBRID_WEIGHTS = {'lexical': 1.0, 'dense': 1.0}
+NLP_HYBRID_RRF_K = 60
+
+# 여행지 임베딩 영속 저장소 (메모리 맵, 워커 간 공유). None이면 프로세스 메모리에서만 임베딩
+NLP_EMBEDDING_STORE_DIR = BASE_DIR / 'models' / 'embeddings'
+
+# 근사 최근접 이웃(IVF) 인덱스: 여행지 수가 NLP_ANN_MIN_ROWS 이상일 때만 사용
+NLP_ANN_ENABLED = True
+NLP_ANN_MIN_ROWS = 50000
+NLP_ANN_NLIST = None  # None이면 약 4·sqrt(N)
+NLP_ANN_NPROBE = 8  # 탐색할 셀 수 (재현율 ↔ 지연 시간)
+NLP_ANN_MIN_CANDIDATES = 2000  # 최소 후보 수
+
+# 임베딩 배치 설정: 길이순 정렬 후 (배치 크기 × 최대 길이) ≤ MAX_BATCH_CHARS로 묶음
+NLP_ENCODE_BATCH_SIZE = 64
+NLP_ENCODE_MAX_BATCH_CHARS = 32768
+NLP_ENCODE_MAX_WAIT = 0.005  # 단건 요청을 모으는 최대 대기 시간(초)
+
+# 검색 결과 캐시: 'sqlite'는 같은 노드의 워커 간 공유, 'local'은 프로세스 메모리
+NLP_SEARCH_CACHE_BACKEND = 'sqlite'
+NLP_SEARCH_CACHE_PATH = BASE_DIR / 'models' / 'search_cache.sqlite3'
+NLP_SEARCH_CACHE_SIZE = 5000
+NLP_SEARCH_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 'local' 저장소에만 적용
+NLP_SEARCH_CACHE_TTL = 600
+# 검색어당 한 번 계산해 캐시하는 순위 목록 길이 (limit/offset이 이 안에 있으면 같은 순위 목록을 잘라서 반환)
+NLP_SEARCH_RANK_DEPTH = 1000
+# 검색어 표준형의 토큰 정렬 여부 (None이면 BM25 검색에서만 정렬, 임베딩 검색은 어순 유지)
+NLP_QUERY_SORT_TOKENS = None
+# 스트리밍 검색(?stream=1)에서 임베딩 점수를 나누어 계산할 카탈로그 분할 수 (분할마다 중간 결과 전송)
+NLP_STREAM_PARTITIONS = 4
+# 배치 검색 API 한 번에 받을 수 있는 최대 검색어 수
+NLP_BATCH_MAX_QUERIES = 32
+
+# 메모리 캐시 설정 (LRU, 항목 수 / 바이트 예산 제한)
+NLP_EMBEDDING_CACHE_SIZE = 20000
+NLP_EMBEDDING_CACHE_MAX_BYTES = 64 * 1024 * 1024
+NLP_SENTIMENT_CACHE_SIZE = 20000
+NLP_SENTIMENT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# 프로세스 시작 시 백그라운드에서 NLP 모델과 검색 인덱스를 미리 로드 (NLP_WARMUP=1 환경 변수로 활성화)
+NLP_WARMUP_ON_STARTUP = os.environ.get('NLP_WARMUP', '0') == '1'
+
+# 감정 분석 배치 워커: 동시에 들어온 요청을 최대 MAX_WAIT초 동안 모아 최대 BATCH_SIZE개씩 추론
+NLP_SENTIMENT_BATCH_SIZE = 16
+NLP_SENTIMENT_MAX_WAIT = 0.01
+
+# 리뷰 저장 시 감정 분석
+# 'queue': DB 작업 큐에 넣고 `python manage.py process_review_jobs` 워커가 처리
+# 'sync': 최대 TIMEOUT초까지 결과를 기다림, 'async': 저장 후 같은 프로세스에서 비동기로 채움
+REVIEW_ANALYSIS_MODE = 'queue'
+REVIEW_ANALYSIS_TIMEOUT = 2.0
+
+# 여행지 임베딩 압축(메모리 절감용): None(float32 그대로), 'float16', 'int8'(차원별 스케일 양자화)
+# 압축 행렬로 점수를 계산한 뒤 상위 NLP_VECTOR_RERANK개만 원본 행렬로 다시 계산 (0이면 다시 계산하지 않음)
+# 원본 행렬은 임베딩 저장소의 메모리 맵에 남으므로, 메모리 절감 효과는 저장소를 사용할 때 나타남
+# 점수 계산은 float16이 float32보다 느리고, int8/PCA는 대규모 카탈로그에서만 빨라짐 (benchmark_vectors로 확인)
+NLP_VECTOR_COMPRESSION = None
+NLP_VECTOR_PCA_DIM = None  # 예: 128 (PCA 차원 축소, 압축과 함께 사용)
+NLP_VECTOR_RERANK = 200
+
+# 검색 단계별 소요 시간(prefilter/embed/score/boost/sort/hydrate/serialize)을 Server-Timing 응답 헤더로 전송
+# 내부 처리 시간이 외부에 노출되므로 기본값은 개발 환경(DEBUG)에서만 사용
+NLP_SERVER_TIMING = DEBUG
+# 검색 경로 debug/info 로그를 남길 요청 비율 (0~1, warning 이상은 항상 기록)
+NLP_LOG_SAMPLE_RATE = float(os.environ.get('NLP_LOG_SAMPLE_RATE', '0.1'))
+
+# 로깅 설정 (destinations 앱 로그 레벨은 NLP_LOG_LEVEL 환경 변수로 조절)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '[{asctime}] {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'loggers': {
+        'destinations': {
+            'handlers': ['console'],
+            'level': os.environ.get('NLP_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
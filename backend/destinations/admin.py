@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Location, Like, Review
+from .models import Location, Like, Review, ReviewAnalysisJob
 
 @admin.register(Location)
 class LocationAdmin(admin.ModelAdmin):
@@ -20,4 +20,10 @@ class ReviewAdmin(admin.ModelAdmin):
     list_filter = ('rating', 'sentiment', 'created_at')
     search_fields = ('user__username', 'location__name', 'content')
     date_hierarchy = 'created_at'
-    readonly_fields = ('sentiment', 'sentiment_score', 'keywords')
\ No newline at end of file
+    readonly_fields = ('sentiment', 'sentiment_score', 'keywords')
+
+@admin.register(ReviewAnalysisJob)
+class ReviewAnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('review', 'status', 'attempts', 'enqueued_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('content_hash', 'locked_by', 'locked_at', 'error')
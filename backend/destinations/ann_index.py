@@ -0,0 +1,195 @@
+"""
+근사 최근접 이웃(ANN) 인덱스 - IVF (Inverted File) 방식
+
+k-means(구면 k-means, 코사인 기준)로 임베딩 공간을 nlist개의 셀로 나누고,
+쿼리와 가까운 nprobe개의 셀에 속한 행만 후보로 반환합니다.
+카탈로그가 커져도 후보 수는 nprobe / nlist 비율로 제한되므로 검색 지연 시간이 일정하게 유지됩니다.
+"""
+import os
+import time
+import uuid
+
+import numpy as np
+
+# k-means 할당 시 한 번에 처리하는 행 수 (메모리 사용량 제한)
+ASSIGN_CHUNK_ROWS = 16384
+
+
+def default_nlist(num_rows):
+    """행 수에 맞는 기본 셀 수 (약 4·sqrt(N), 셀당 최소 39개 행)"""
+    if num_rows <= 0:
+        return 1
+    return int(max(1, min(4 * np.sqrt(num_rows), num_rows // 39 or 1)))
+
+
+class IVFIndex:
+    """
+    순수 NumPy IVF 인덱스
+
+    Args:
+        nlist: 셀(클러스터) 수. None이면 행 수로부터 자동 결정
+        nprobe: 검색 시 탐색할 셀 수 (클수록 재현율↑, 지연 시간↑)
+        min_candidates: 최소 후보 수. nprobe개 셀의 행이 이보다 적으면 셀을 더 탐색
+    """
+
+    def __init__(self, nlist=None, nprobe=8, min_candidates=0, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_candidates = min_candidates
+        self.seed = seed
+
+        self.centroids = None
+        # 셀 순서로 정렬된 행 번호와 셀별 시작 오프셋 (CSR 형태)
+        self.list_rows = None
+        self.list_offsets = None
+        self.num_rows = 0
+        self.train_seconds = None
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def _assign(self, matrix):
+        """각 행을 가장 가까운 셀에 할당합니다."""
+        assignments = np.empty(matrix.shape[0], dtype=np.int32)
+        for start in range(0, matrix.shape[0], ASSIGN_CHUNK_ROWS):
+            chunk = np.asarray(matrix[start:start + ASSIGN_CHUNK_ROWS], dtype=np.float32)
+            assignments[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignments
+
+    def train(self, matrix, iterations=15, sample_size=100000):
+        """
+        정규화된 임베딩 행렬로 셀 중심을 학습하고 모든 행을 셀에 할당합니다.
+
+        Args:
+            matrix: 행 단위로 정규화된 (N, d) 행렬 (메모리 맵 가능)
+            iterations: k-means 반복 횟수
+            sample_size: 학습에 사용할 최대 표본 수
+        """
+        start_time = time.time()
+        num_rows = matrix.shape[0]
+        nlist = self.nlist or default_nlist(num_rows)
+        nlist = max(1, min(nlist, num_rows))
+        rng = np.random.default_rng(self.seed)
+
+        sample_rows = np.sort(rng.choice(num_rows, size=min(sample_size, num_rows), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+
+        self.centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.empty(len(sample), dtype=np.int32)
+            for start in range(0, len(sample), ASSIGN_CHUNK_ROWS):
+                chunk = sample[start:start + ASSIGN_CHUNK_ROWS]
+                assignments[start:start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+
+            sums = np.zeros_like(self.centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=nlist)
+
+            # 빈 셀은 임의의 표본으로 다시 초기화
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                sums[empty] = sample[rng.choice(len(sample), size=len(empty), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.centroids = (sums / norms).astype(np.float32)
+
+        self.nlist = nlist
+        self.add(matrix)
+        self.train_seconds = time.time() - start_time
+        return self
+
+    def add(self, matrix):
+        """모든 행을 셀에 할당하여 역색인 목록을 만듭니다."""
+        assignments = self._assign(matrix)
+        self.list_rows = np.argsort(assignments, kind='stable').astype(np.int64)
+        counts = np.bincount(assignments, minlength=self.nlist)
+        self.list_offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.list_offsets[1:])
+        self.num_rows = matrix.shape[0]
+
+    def candidates(self, query_vector, nprobe=None, min_candidates=None):
+        """
+        쿼리와 가까운 셀에 속한 행 번호를 반환합니다.
+
+        Args:
+            query_vector: 정규화된 쿼리 벡터
+            nprobe: 탐색할 셀 수 (None이면 기본값)
+            min_candidates: 최소 후보 수 (None이면 기본값)
+
+        Returns:
+            np.ndarray: 정렬된 행 번호 배열
+        """
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        if min_candidates is None:
+            min_candidates = self.min_candidates
+
+        centroid_scores = self.centroids @ query_vector
+        ranked = np.argsort(-centroid_scores)
+        sizes = np.diff(self.list_offsets)[ranked]
+
+        # 최소 후보 수를 채울 때까지 셀을 추가로 탐색
+        probes = nprobe
+        if min_candidates:
+            covered = np.cumsum(sizes)
+            needed = int(np.searchsorted(covered, min_candidates)) + 1
+            probes = max(probes, min(needed, self.nlist))
+
+        parts = [
+            self.list_rows[self.list_offsets[cell]:self.list_offsets[cell + 1]]
+            for cell in ranked[:probes]
+        ]
+        if not parts:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def search(self, matrix, query_vector, k, nprobe=None):
+        """후보 행에 대해서만 정확한 내적을 계산하여 상위 k개를 반환합니다."""
+        rows = self.candidates(query_vector, nprobe, min_candidates=k)
+        scores = np.asarray(matrix[rows], dtype=np.float32) @ query_vector
+        k = min(k, len(rows))
+        if k <= 0:
+            return rows[:0], scores[:0]
+        top = np.argpartition(-scores, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return rows[top], scores[top]
+
+    def save(self, path, generation=None):
+        """인덱스를 .npz 파일로 저장합니다. (원자적 교체)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # 여러 프로세스가 동시에 저장해도 임시 파일이 겹치지 않도록 프로세스별 이름 사용
+        tmp_path = f"{path}.{os.getpid()}-{uuid.uuid4().hex}.tmp.npz"
+        try:
+            np.savez(
+                tmp_path,
+                centroids=self.centroids,
+                list_rows=self.list_rows,
+                list_offsets=self.list_offsets,
+                num_rows=np.int64(self.num_rows),
+                generation=np.array(generation or ''),
+            )
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path, nprobe=8, min_candidates=0, generation=None):
+        """
+        저장된 인덱스를 읽습니다. 세대가 다르거나 파일이 없으면 None을 반환합니다.
+        """
+        try:
+            with np.load(path) as data:
+                if generation is not None and str(data['generation']) != generation:
+                    return None
+                index = cls(nprobe=nprobe, min_candidates=min_candidates)
+                index.centroids = data['centroids']
+                index.list_rows = data['list_rows']
+                index.list_offsets = data['list_offsets']
+                index.num_rows = int(data['num_rows'])
+                index.nlist = len(index.centroids)
+                return index
+        except (OSError, KeyError, ValueError):
+            return None
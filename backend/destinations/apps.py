@@ -1,6 +1,24 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class DestinationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'destinations'
+
+    def ready(self):
+        import destinations.signals
+
+        if getattr(settings, 'NLP_WARMUP_ON_STARTUP', False) and self._serves_requests():
+            from .warmup import model_warmup
+            model_warmup.start()
+
+    @staticmethod
+    def _serves_requests():
+        """요청을 처리하는 프로세스인지 확인합니다. (관리 명령, runserver 자동 재시작 감시 프로세스 제외)"""
+        if 'runserver' in sys.argv:
+            return os.environ.get('RUN_MAIN') == 'true'
+        return not any(arg.endswith('manage.py') or arg.endswith('django-admin') for arg in sys.argv[:1])
@@ -0,0 +1,102 @@
+"""
+마이크로 배치 처리기
+
+여러 스레드에서 동시에 들어오는 단건 요청을 짧은 시간 동안 모아 한 번의 배치로 처리하고,
+각 호출자에게는 Future로 결과를 돌려줍니다. (예: 임베딩, 감정 분석 모델 추론)
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+def completed_future(result):
+    """이미 결과가 정해진 Future를 반환합니다. (캐시 적중 등 배치 처리가 필요 없는 경우)"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+class MicroBatcher:
+    """
+    단건 요청을 모아 배치로 처리하는 백그라운드 워커
+
+    Args:
+        process_batch: 입력 목록을 받아 같은 길이의 결과 목록을 반환하는 함수
+        max_batch_size: 한 배치의 최대 크기
+        max_wait: 첫 요청 이후 추가 요청을 기다리는 최대 시간(초)
+        name: 워커 스레드 이름
+    """
+
+    def __init__(self, process_batch, max_batch_size=32, max_wait=0.005, name='micro-batcher'):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.name = name
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # 처리 통계
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item):
+        """요청을 대기열에 넣고 Future를 반환합니다."""
+        future = Future()
+        self._ensure_started()
+        self._queue.put((item, future))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """첫 요청을 기다린 뒤, max_wait 동안 최대 max_batch_size개까지 요청을 모읍니다."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # 이미 취소된 요청은 처리하지 않음
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.process_batch(items)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+            # 결과가 요청보다 적으면 남은 요청이 영원히 기다리지 않도록 오류로 완료
+            if len(results) != len(items):
+                error = RuntimeError(f"배치 처리 결과 수({len(results)})가 요청 수({len(items)})와 다릅니다.")
+                for _, future in batch[len(results):]:
+                    future.set_exception(error)
+
+    @property
+    def average_batch_size(self):
+        return self.items / self.batches if self.batches else 0.0
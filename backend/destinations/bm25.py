@@ -0,0 +1,228 @@
+"""
+BM25 키워드 검색 엔진
+
+여행지 필드(이름, 도시, 국가, 카테고리, 서브카테고리, 설명)별 단어 빈도와 문서 길이를 미리 계산해 두고,
+쿼리 시에는 일치하는 포스팅만 모아 희소 배열 연산으로 점수를 계산합니다.
+필드 가중치와 유사어 확장은 쿼리 시점에 적용합니다.
+"""
+import bisect
+import heapq
+import math
+from collections import Counter
+
+import numpy as np
+
+from .inverted_index import analyze
+from .lazy_index import LazyIndex
+
+# 필드별 가중치 (기존 키워드 검색의 이름 ×1.5, 도시/국가 ×2.0 가중치에 대응)
+FIELD_BOOSTS = {
+    'name': 1.5,
+    'city': 2.0,
+    'country': 2.0,
+    'category': 1.0,
+    'subcategories': 1.0,
+    'description': 0.5,
+}
+
+# 쿼리 단어 종류별 가중치
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.5
+SYNONYM_WEIGHT = 0.3
+
+# 접두어 확장 시 단어당 최대 토큰 수
+MAX_PREFIX_TERMS = 50
+
+# 유사 단어 사전 (검색 확장용)
+SIMILAR_WORDS = {
+    'clean': ['neat', 'tidy', 'spotless', 'immaculate', 'pristine'],
+    'cozy': ['comfortable', 'warm', 'snug', 'homely', 'intimate', 'pleasant'],
+    'excited': ['thrilling', 'exciting', 'fun', 'entertainment', 'thrill', 'adventure', 'joy', 'happy'],
+    'beautiful': ['pretty', 'scenic', 'gorgeous', 'lovely', 'stunning', 'attractive'],
+    'quiet': ['peaceful', 'calm', 'serene', 'tranquil', 'silent', 'relaxing'],
+    'historic': ['ancient', 'old', 'traditional', 'heritage', 'historical', 'classic'],
+    'modern': ['contemporary', 'new', 'trendy', 'stylish', 'innovative'],
+    'nature': ['natural', 'outdoor', 'green', 'park', 'garden', 'forest', 'mountain', 'lake', 'river'],
+    'food': ['restaurant', 'cuisine', 'dining', 'eat', 'culinary', 'gastronomy', 'delicious'],
+    'shopping': ['shop', 'store', 'mall', 'market', 'boutique', 'retail'],
+    'family': ['kid', 'child', 'children', 'friendly', 'fun'],
+    'luxury': ['luxurious', 'upscale', 'premium', 'elegant', 'fancy', 'high-end'],
+    'budget': ['cheap', 'affordable', 'inexpensive', 'economical', 'reasonable'],
+    'view': ['vista', 'panorama', 'overlook', 'scenery', 'landscape', 'scenic']
+}
+
+
+def field_text(value):
+    """JSON 필드(리스트 또는 문자열)를 검색용 문자열로 변환합니다."""
+    if not value:
+        return ''
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value if item)
+    return str(value)
+
+
+class BM25Index:
+    """
+    필드별 BM25 통계를 보관하는 인덱스
+
+    Args:
+        k1: 단어 빈도 포화 계수
+        b: 문서 길이 정규화 계수
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids = np.zeros(0, dtype=np.int64)
+        # field -> term -> (행 번호 배열, 단어 빈도 배열)
+        self.postings = {field: {} for field in FIELD_BOOSTS}
+        self.doc_lengths = {}
+        self.avg_lengths = {}
+        self.vocabulary = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, documents, k1=1.2, b=0.75):
+        """
+        여행지 문서로 인덱스를 구축합니다.
+
+        Args:
+            documents: (location_id, {field: text}) 이터러블
+        """
+        index = cls(k1=k1, b=b)
+        ids = []
+        raw_postings = {field: {} for field in FIELD_BOOSTS}
+        lengths = {field: [] for field in FIELD_BOOSTS}
+
+        for row, (location_id, fields) in enumerate(documents):
+            ids.append(location_id)
+            for field in FIELD_BOOSTS:
+                tokens = analyze(fields.get(field))
+                lengths[field].append(len(tokens))
+                for term, tf in Counter(tokens).items():
+                    rows_tfs = raw_postings[field].setdefault(term, ([], []))
+                    rows_tfs[0].append(row)
+                    rows_tfs[1].append(tf)
+
+        index.ids = np.asarray(ids, dtype=np.int64)
+        vocabulary = set()
+        for field in FIELD_BOOSTS:
+            index.postings[field] = {
+                term: (np.asarray(rows, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+                for term, (rows, tfs) in raw_postings[field].items()
+            }
+            vocabulary.update(index.postings[field])
+            index.doc_lengths[field] = np.asarray(lengths[field], dtype=np.float32)
+            index.avg_lengths[field] = float(index.doc_lengths[field].mean()) if ids else 0.0
+        index.vocabulary = sorted(vocabulary)
+        return index
+
+    def _prefix_terms(self, word):
+        """word로 시작하는 (word 자신 제외) 토큰 목록"""
+        lo = bisect.bisect_right(self.vocabulary, word)
+        hi = bisect.bisect_left(self.vocabulary, word + '\U0010ffff', lo)
+        return self.vocabulary[lo:min(hi, lo + MAX_PREFIX_TERMS)]
+
+    def expand_query(self, query):
+        """
+        쿼리를 (단어, 가중치) 목록으로 확장합니다.
+        정확한 단어 > 접두어 일치 단어 > 유사어 순으로 낮은 가중치를 부여합니다.
+        """
+        words = list(dict.fromkeys(analyze(query)))
+        weighted = {}
+        for word in words:
+            weighted[word] = max(weighted.get(word, 0.0), EXACT_WEIGHT)
+        for word in words:
+            for term in self._prefix_terms(word):
+                weighted.setdefault(term, PREFIX_WEIGHT)
+            for synonym in SIMILAR_WORDS.get(word, []):
+                for term in analyze(synonym):
+                    weighted.setdefault(term, SYNONYM_WEIGHT)
+        return list(weighted.items())
+
+    def score(self, query, allowed_mask=None):
+        """
+        쿼리에 대한 희소 점수를 계산합니다.
+
+        Returns:
+            (행 번호 배열, 점수 배열) - 점수가 0보다 큰 행만 포함
+        """
+        num_docs = len(self.ids)
+        row_parts, score_parts = [], []
+
+        for term, weight in self.expand_query(query):
+            for field, boost in FIELD_BOOSTS.items():
+                posting = self.postings[field].get(term)
+                if posting is None:
+                    continue
+                rows, tfs = posting
+                df = len(rows)
+                idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+                avg_length = self.avg_lengths[field] or 1.0
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[field][rows] / avg_length)
+                row_parts.append(rows)
+                score_parts.append(weight * boost * idf * tfs * (self.k1 + 1) / (tfs + norm))
+
+        if not row_parts:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+
+        # 희소 누적: 일치한 행만 모아 행별로 합산
+        all_rows = np.concatenate(row_parts)
+        all_scores = np.concatenate(score_parts)
+        unique_rows, inverse = np.unique(all_rows, return_inverse=True)
+        totals = np.bincount(inverse, weights=all_scores).astype(np.float32)
+
+        if allowed_mask is not None:
+            keep = allowed_mask[unique_rows]
+            unique_rows, totals = unique_rows[keep], totals[keep]
+        return unique_rows, totals
+
+    def search(self, query, top_n=10, allowed_ids=None, excluded_ids=None):
+        """
+        상위 top_n개 (위치 ID, 점수)를 반환합니다. 점수는 기존 키워드 검색과 같은 0.2~1.0 범위로 조정됩니다.
+
+        Args:
+            query: 검색 쿼리
+            top_n: 반환할 결과 수
+            allowed_ids: 검색 대상 위치 ID 배열 (None이면 전체)
+            excluded_ids: 상위 결과 선택 전에 제외할 위치 ID 배열 (점수 조정 기준에는 포함)
+        """
+        allowed_mask = None
+        if allowed_ids is not None:
+            allowed_mask = np.isin(self.ids, allowed_ids)
+
+        rows, scores = self.score(query, allowed_mask)
+        if not len(rows):
+            return []
+
+        # 제외 전 최고 점수로 조정해, 제외 여부와 관계없이 같은 여행지는 같은 점수를 갖도록 함
+        max_score = float(scores.max())
+        if excluded_ids is not None:
+            keep = ~np.isin(self.ids[rows], excluded_ids)
+            rows, scores = rows[keep], scores[keep]
+
+        top = heapq.nlargest(top_n, zip(scores.tolist(), rows.tolist()))
+
+        results = []
+        for score, row in top:
+            # 점수 정규화 후 시그모이드 형태로 0.2 ~ 1.0 범위에 분포
+            normalized_score = 0.2 + (0.8 * (score / max_score))
+            adjusted_score = 0.2 + (0.8 / (1 + 2.5 * (1 - normalized_score)))
+            results.append((int(self.ids[row]), adjusted_score))
+        return results
+
+
+def build_bm25_index():
+    """
+    검색 문서의 소문자 필드 문자열로 BM25 인덱스를 구축합니다.
+    (subcategories는 이미 문자열로 이어 붙여져 있음)
+    """
+    from .search_documents import search_documents
+
+    return BM25Index.build(search_documents.get().field_documents())
+
+
+# 싱글톤 BM25 인덱스 (여행지가 변경되면 다음 검색 시 다시 구축)
+bm25_index = LazyIndex(build_bm25_index)
@@ -0,0 +1,168 @@
+"""
+메모리 제한 LRU/TTL 캐시
+
+OrderedDict 기반으로 get/put이 O(1)이며, 항목 수와 바이트 예산(NumPy 배열은 nbytes로 계산)을
+모두 넘지 않도록 가장 오래 사용되지 않은 항목부터 제거합니다.
+여러 스레드에서 동시에 사용할 수 있으며, 적중/실패/제거 횟수를 기록합니다.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+_MISSING = object()
+
+
+def estimate_size(value):
+    """
+    캐시 값의 대략적인 메모리 크기(바이트)를 계산합니다.
+    NumPy 배열은 nbytes, 컨테이너는 원소 크기의 합, 모델 객체는 속성 값의 크기 합으로 계산합니다.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None:
+        # 모델 인스턴스 등: 중첩 객체까지 따라가지 않고 속성 값만 얕게 계산
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in attributes.values())
+    return sys.getsizeof(value)
+
+
+class BoundedCache:
+    """
+    스레드 안전한 LRU 캐시 (선택적 TTL, 바이트 예산)
+
+    Args:
+        max_entries: 최대 항목 수 (None이면 제한 없음)
+        max_bytes: 최대 바이트 수 (None이면 제한 없음)
+        ttl: 항목 유효 시간(초). None이면 만료되지 않음
+        name: 통계 출력용 이름
+        sizeof: 값 크기 계산 함수
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=None, ttl=None, name='cache', sizeof=estimate_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.name = name
+        self.sizeof = sizeof
+
+        # key -> (value, size, expires_at)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+
+        # 통계
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING, record=False) is not _MISSING
+
+    def get(self, key, default=None, record=True):
+        """값을 반환하고 가장 최근 사용 항목으로 표시합니다. 없거나 만료되었으면 default를 반환합니다."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                if record:
+                    self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            if record:
+                self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """값을 저장하고 제한을 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다."""
+        size = self.sizeof(key) + self.sizeof(value)
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            # 예산보다 큰 단일 항목은 저장하지 않음
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._data[key] = (value, size, expires_at)
+            self.current_bytes += size
+
+            while self._data and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+            ):
+                oldest_key = next(iter(self._data))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        """항목을 제거합니다. 제거된 항목이 있으면 True를 반환합니다."""
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self):
+        """모든 항목을 제거합니다."""
+        with self._lock:
+            self._data.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._data.pop(key)
+        self.current_bytes -= size
+
+    def stats(self):
+        """캐시 통계를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._data),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+def cache_from_settings(prefix, name, max_entries, max_bytes=None, ttl=None):
+    """
+    settings의 {prefix}_SIZE, {prefix}_MAX_BYTES, {prefix}_TTL 값으로 캐시를 생성합니다.
+    설정이 없으면 인자로 받은 기본값을 사용합니다.
+    """
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    try:
+        max_entries = getattr(settings, f'{prefix}_SIZE', max_entries)
+        max_bytes = getattr(settings, f'{prefix}_MAX_BYTES', max_bytes)
+        ttl = getattr(settings, f'{prefix}_TTL', ttl)
+    except ImproperlyConfigured:
+        pass
+    return BoundedCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, name=name)
@@ -0,0 +1,62 @@
+"""
+검색 결과 순위 결합 (rank fusion)
+
+여러 검색기(BM25 키워드 검색, 임베딩 검색)가 각각 만든 (위치 ID 배열, 점수 배열) 후보 목록을
+하나의 순위로 합칩니다. 모든 계산은 ID 배열 위의 NumPy 연산으로 처리합니다.
+- rrf: 역순위 결합 (Reciprocal Rank Fusion), Σ w / (k + 순위)
+- weighted: 검색기별 점수를 0~1로 정규화한 뒤 가중합
+"""
+import numpy as np
+
+FUSION_MODES = ('rrf', 'weighted')
+
+
+def _normalize_scores(scores):
+    """점수를 0~1 범위로 정규화합니다. (모든 점수가 같으면 1)"""
+    scores = np.asarray(scores, dtype=np.float32)
+    if not len(scores):
+        return scores
+    low, high = float(scores.min()), float(scores.max())
+    if high - low <= 1e-12:
+        return np.ones(len(scores), dtype=np.float32)
+    return (scores - low) / (high - low)
+
+
+def fuse_rankings(rankings, weights, mode='rrf', rrf_k=60):
+    """
+    여러 후보 목록을 하나의 순위로 결합합니다.
+
+    Args:
+        rankings: (위치 ID 배열, 점수 배열) 목록. 각 목록은 점수 내림차순
+        weights: 목록별 가중치
+        mode: 'rrf' 또는 'weighted'
+        rrf_k: RRF의 순위 완충 상수
+
+    Returns:
+        (위치 ID 배열, 결합 점수 배열) - 결합 점수 내림차순
+    """
+    if mode not in FUSION_MODES:
+        raise ValueError(f"지원하지 않는 결합 방식입니다: {mode}")
+
+    ids_parts, contribution_parts = [], []
+    for (location_ids, scores), weight in zip(rankings, weights):
+        location_ids = np.asarray(location_ids, dtype=np.int64)
+        if not len(location_ids) or not weight:
+            continue
+        if mode == 'rrf':
+            contribution = weight / (rrf_k + np.arange(1, len(location_ids) + 1, dtype=np.float32))
+        else:
+            contribution = weight * _normalize_scores(scores)
+        ids_parts.append(location_ids)
+        contribution_parts.append(contribution.astype(np.float32))
+
+    if not ids_parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    all_ids = np.concatenate(ids_parts)
+    unique_ids, inverse = np.unique(all_ids, return_inverse=True)
+    fused = np.bincount(inverse, weights=np.concatenate(contribution_parts), minlength=len(unique_ids))
+
+    # 동점이면 ID가 작은 쪽을 먼저 (결과를 결정적으로 유지)
+    order = np.lexsort((unique_ids, -fused))
+    return unique_ids[order], fused[order].astype(np.float32)
@@ -0,0 +1,185 @@
+"""
+검색 단계별 소요 시간 계측과 샘플링 로깅
+
+- span(stage): 코드 블록의 소요 시간을 현재 요청의 단계별 시간(ms)에 더하고, 프로세스 단위 히스토그램에 기록
+- 요청 단위 시간은 ServerTimingMiddleware가 Server-Timing 응답 헤더로 내보냄
+- SampledLogger: 요청마다 NLP_LOG_SAMPLE_RATE 확률로 debug/info 로그를 남김 (warning 이상은 항상 기록)
+
+단계 이름: prefilter(키워드 후보 선택), embed(쿼리 임베딩), score(유사도 계산), boost(가중치 적용),
+sort(상위 k개 선택), hydrate(Location 조회), serialize(응답 변환) 등
+"""
+import bisect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# 히스토그램 버킷 상한(ms). 마지막 버킷은 그 이상 전부
+HISTOGRAM_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_state = threading.local()
+
+
+class StageHistogram:
+    """단계 하나의 소요 시간 히스토그램 (고정 버킷, 백분위수는 버킷 상한으로 추정)"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction):
+        """백분위수가 속한 버킷의 상한 (마지막 버킷이면 최댓값)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return float(self.buckets[i]) if i < len(self.buckets) else round(self.max_ms, 3)
+        return round(self.max_ms, 3)
+
+    def stats(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'buckets': {
+                (f"le_{bucket}" if i < len(self.buckets) else 'inf'): bucket_count
+                for i, (bucket, bucket_count) in enumerate(zip(self.buckets + (None,), self.counts))
+            },
+        }
+
+
+class TimingHistograms:
+    """단계별 히스토그램 모음 (프로세스 단위)"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, ms):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = StageHistogram()
+            histogram.observe(ms)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def stats(self):
+        with self._lock:
+            return {stage: histogram.stats() for stage, histogram in sorted(self._histograms.items())}
+
+
+# 싱글톤 히스토그램
+timing_histograms = TimingHistograms()
+
+
+def _sample_rate():
+    from django.conf import settings
+    return getattr(settings, 'NLP_LOG_SAMPLE_RATE', 1.0)
+
+
+def start_request():
+    """요청 시작: 단계별 시간을 비우고 이 요청의 로그 샘플링 여부를 정합니다."""
+    _state.timings = {}
+    _state.sampled = random.random() < _sample_rate()
+
+
+def end_request():
+    """요청 종료: 이 요청의 단계별 시간(ms)을 반환하고 상태를 비웁니다."""
+    timings = getattr(_state, 'timings', None) or {}
+    _state.timings = None
+    _state.sampled = None
+    return timings
+
+
+def reset_timings():
+    """현재 스레드의 단계별 시간을 비웁니다. (요청 밖에서 검색을 여러 번 실행할 때)"""
+    _state.timings = {}
+
+
+def record(stage, seconds):
+    """단계 소요 시간을 현재 요청 시간에 더하고 히스토그램에 기록합니다."""
+    ms = seconds * 1000
+    timings = getattr(_state, 'timings', None)
+    if timings is None:
+        timings = _state.timings = {}
+    timings[stage] = round(timings.get(stage, 0.0) + ms, 3)
+    timing_histograms.observe(stage, ms)
+
+
+@contextmanager
+def span(stage):
+    """with 블록의 소요 시간을 stage 단계로 기록합니다."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start_time)
+
+
+def current_timings():
+    """현재 스레드(요청)의 단계별 소요 시간(ms)"""
+    return dict(getattr(_state, 'timings', None) or {})
+
+
+def server_timing_header(timings):
+    """단계별 시간(ms)을 Server-Timing 헤더 값으로 변환합니다. 예: "embed;dur=3.2, score;dur=1.1" """
+    return ', '.join(f"{stage};dur={ms:.3f}" for stage, ms in timings.items())
+
+
+class SampledLogger:
+    """
+    debug/info 로그를 샘플링하는 로거 래퍼
+
+    요청 안에서는 start_request에서 정한 샘플링 여부를 따르므로, 샘플링된 요청의 로그는 모두 남습니다.
+    요청 밖에서는 호출마다 NLP_LOG_SAMPLE_RATE 확률로 기록합니다.
+    """
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def _sampled(self):
+        sampled = getattr(_state, 'sampled', None)
+        if sampled is None:
+            return random.random() < _sample_rate()
+        return sampled
+
+    def debug(self, msg, *args):
+        if self.logger.isEnabledFor(logging.DEBUG) and self._sampled():
+            self.logger.debug(msg, *args)
+
+    def info(self, msg, *args):
+        if self.logger.isEnabledFor(logging.INFO) and self._sampled():
+            self.logger.info(msg, *args)
+
+    def warning(self, msg, *args):
+        self.logger.warning(msg, *args)
+
+    def error(self, msg, *args):
+        self.logger.error(msg, *args)
+
+    def exception(self, msg, *args):
+        self.logger.exception(msg, *args)
+
+
+def get_sampled_logger(name):
+    return SampledLogger(logging.getLogger(name))
@@ -0,0 +1,115 @@
+"""
+키워드 후보 생성을 위한 메모리 역색인
+
+여행지의 이름/설명/도시/국가 필드를 토큰화하여 토큰 → 위치 ID 배열(포스팅 목록)로 보관합니다.
+쿼리 단어별 포스팅 목록의 합집합만으로 후보를 만들기 때문에, 매 쿼리마다 전체 여행지 텍스트를
+이어 붙여 부분 문자열을 검사하던 O(N·|text|) 작업이 일치하는 포스팅 수에 비례하는 작업으로 줄어듭니다.
+
+기존 부분 문자열 검사와의 호환을 위해 쿼리 단어는 토큰의 접두어로도 일치합니다. (예: museum → museums)
+"""
+import bisect
+import re
+
+import numpy as np
+
+from .lazy_index import LazyIndex
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# 접두어 일치 시 한 단어가 펼칠 수 있는 최대 토큰 수 (지나치게 짧은 접두어 방지)
+MAX_PREFIX_EXPANSION = 2000
+
+
+def analyze(text):
+    """텍스트를 소문자 토큰 목록으로 분석합니다."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    토큰 → 정렬된 위치 ID 배열 역색인
+    """
+
+    def __init__(self, postings):
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.num_documents = 0
+
+    @classmethod
+    def build(cls, documents):
+        """
+        (위치 ID, 텍스트) 목록으로 역색인을 구축합니다.
+
+        Args:
+            documents: (location_id, text) 이터러블
+        """
+        postings = {}
+        num_documents = 0
+        for location_id, text in documents:
+            num_documents += 1
+            for token in set(analyze(text)):
+                postings.setdefault(token, []).append(location_id)
+
+        index = cls({
+            token: np.unique(np.asarray(ids, dtype=np.int64))
+            for token, ids in postings.items()
+        })
+        index.num_documents = num_documents
+        return index
+
+    @classmethod
+    def from_postings(cls, postings, num_documents):
+        """이미 만들어진 토큰 → 정렬된 위치 ID 배열로 역색인을 만듭니다."""
+        index = cls(postings)
+        index.num_documents = num_documents
+        return index
+
+    def expand(self, word):
+        """word와 같거나 word로 시작하는 토큰 목록을 반환합니다."""
+        lo = bisect.bisect_left(self.vocabulary, word)
+        hi = bisect.bisect_left(self.vocabulary, word + '\U0010ffff', lo)
+        return self.vocabulary[lo:min(hi, lo + MAX_PREFIX_EXPANSION)]
+
+    def lookup(self, word, prefix=True):
+        """단어에 해당하는 위치 ID 배열을 반환합니다."""
+        word = word.lower()
+        if not prefix:
+            return self.postings.get(word, np.zeros(0, dtype=np.int64))
+
+        arrays = [self.postings[token] for token in self.expand(word)]
+        if not arrays:
+            return np.zeros(0, dtype=np.int64)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+    def candidates(self, words, prefix=True):
+        """단어 중 하나라도 포함하는 여행지 ID의 합집합 (정렬된 배열)"""
+        arrays = [self.lookup(word, prefix) for word in words if word]
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return np.zeros(0, dtype=np.int64)
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+
+def keyword_document(name, description, city, country):
+    """사전 필터링 대상 텍스트 (기존 키워드 사전 필터링과 같은 필드)"""
+    return f"{name} {description or ''} {city or ''} {country or ''}"
+
+
+def build_keyword_index():
+    """
+    검색 문서에 미리 토큰화해 둔 토큰 ID로 역색인을 구축합니다. (텍스트를 다시 토큰화하지 않음)
+    """
+    from .search_documents import search_documents
+
+    catalog = search_documents.get()
+    return InvertedIndex.from_postings(catalog.token_postings(), len(catalog))
+
+
+# 싱글톤 역색인 (여행지가 변경되면 다음 조회 시 다시 구축)
+keyword_index = LazyIndex(build_keyword_index)
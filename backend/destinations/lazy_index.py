@@ -0,0 +1,91 @@
+"""
+프로세스 단위 지연 구축 색인
+
+검색에 쓰는 색인은 프로세스마다 한 번 구축해 메모리에 보관하고, 여행지가 변경되면 다음 조회 시 다시 구축합니다.
+모듈마다 구축 함수를 넘겨 LazyIndex 인스턴스(싱글톤)를 만들어 사용합니다.
+
+mark_dirty는 여행지를 저장한 프로세스에서만 호출되므로, 다른 워커는 검색 결과 캐시 저장소에
+공유되는 카탈로그 버전을 보고 구축 당시 버전에서 바뀌었으면 다시 구축합니다.
+"""
+import threading
+import time
+
+# 이 프로세스에서 생성된 모든 지연 구축 색인 (invalidate_catalog용)
+_instances = []
+
+
+def catalog_version():
+    """워커 간에 공유되는 카탈로그 버전 (읽을 수 없으면 None)"""
+    from .result_cache import get_search_cache
+
+    return get_search_cache().catalog_version()
+
+
+def invalidate_catalog():
+    """
+    여행지가 변경된 뒤 이 프로세스의 모든 색인을 무효화하고 카탈로그 버전을 올립니다.
+    버전이 바뀌면 다른 워커의 색인과 모든 워커의 이전 검색 결과 캐시도 무효화됩니다.
+    (시그널 없이 여행지를 적재/삭제한 뒤에도 호출)
+    """
+    from .result_cache import get_search_cache
+
+    for index in _instances:
+        index.mark_dirty()
+    return get_search_cache().bump_catalog_version()
+
+
+class LazyIndex:
+    """
+    구축 함수의 결과를 보관하고, 변경이 표시되면 다음 조회 시 다시 구축합니다.
+    """
+
+    def __init__(self, build):
+        """
+        Args:
+            build: 색인을 구축해 반환하는 함수 (get에 넘긴 인자를 그대로 받음)
+        """
+        self._build = build
+        self._index = None
+        self._dirty = True
+        # 색인을 구축할 때 읽은 카탈로그 버전
+        self._version = None
+        self._lock = threading.Lock()
+        self.last_build_seconds = None
+        _instances.append(self)
+
+    def mark_dirty(self):
+        """여행지 데이터가 변경되었음을 표시합니다."""
+        self._dirty = True
+
+    @property
+    def is_ready(self):
+        return self._index is not None and not self._dirty
+
+    def _is_current(self, version):
+        # 버전을 읽지 못했으면(None) 현재 색인을 계속 사용
+        return (
+            self._index is not None and not self._dirty
+            and (version is None or version == self._version)
+        )
+
+    def get(self, *args, **kwargs):
+        """
+        최신 색인을 반환합니다. 변경이 표시되었거나 다른 워커가 카탈로그 버전을 올렸으면
+        구축 함수에 인자를 넘겨 다시 구축합니다.
+        """
+        version = catalog_version()
+        if self._is_current(version):
+            return self._index
+
+        with self._lock:
+            if self._is_current(version):
+                return self._index
+
+            start_time = time.time()
+            # 구축 도중 변경이 들어오면 다음 조회에서 다시 구축하도록 먼저 플래그를 내리고
+            # 구축 전에 읽은 버전을 기록
+            self._dirty = False
+            self._version = version
+            self._index = self._build(*args, **kwargs)
+            self.last_build_seconds = time.time() - start_time
+            return self._index
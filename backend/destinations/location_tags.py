@@ -0,0 +1,155 @@
+"""
+여행지 서브카테고리/서브타입 정규화 테이블(LocationTag) 관리
+
+Location.subcategories/subtypes(JSON 목록 또는 문자열)를 (종류, 위치, 값) 행으로 풀어 저장합니다.
+(kind, value), (kind, position, value) 인덱스 덕분에 태그 필터링과 첫 번째 서브카테고리 조회가
+JSON 파싱이나 json_extract 전체 스캔 없이 SQL 인덱스 조회로 처리됩니다.
+
+여행지 저장 시(post_save 시그널) sync_location_tags로 갱신하고,
+bulk_create처럼 시그널 없이 여행지를 적재한 뒤에는 write_location_tags / rebuild_location_tags를 호출합니다.
+"""
+import json
+
+# (LocationTag.kind, Location 필드) 순서쌍
+TAG_KINDS = (('subcategory', 'subcategories'), ('subtype', 'subtypes'))
+
+# LocationTag.value 최대 길이
+MAX_VALUE_LENGTH = 255
+
+
+def tag_values(value):
+    """
+    JSON 필드 값을 태그 목록으로 변환합니다. (기존 추천 코드의 변환 규칙과 동일, 빈 값도 자리 유지)
+
+    문자열이면 JSON 목록으로 해석하고, 해석할 수 없으면 그 문자열 하나를 태그로 사용합니다.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except (TypeError, ValueError):
+            value = [value]
+    if not isinstance(value, list):
+        value = [value]
+    return value
+
+
+def location_tag_rows(location):
+    """
+    여행지의 태그 행 [(kind, position, value)]을 만듭니다.
+    position은 JSON 목록에서의 원래 위치이며, 비어 있거나 문자열이 아닌 항목은 건너뜁니다.
+
+    Args:
+        location: subcategories/subtypes 속성을 가진 객체 (마이그레이션의 과거 모델도 가능)
+    """
+    rows = []
+    for kind, field in TAG_KINDS:
+        for position, value in enumerate(tag_values(getattr(location, field))):
+            if isinstance(value, str) and value:
+                rows.append((kind, position, value[:MAX_VALUE_LENGTH]))
+    return rows
+
+
+def sync_location_tags(location):
+    """
+    여행지 하나의 태그 행을 갱신합니다. 내용이 바뀌지 않았으면 쓰지 않습니다.
+
+    Returns:
+        bool: 태그 행을 다시 썼는지 여부
+    """
+    from django.db import transaction
+    from .models import LocationTag
+
+    rows = location_tag_rows(location)
+    current = LocationTag.objects.filter(location_id=location.id).values_list('kind', 'position', 'value')
+    if sorted(current) == sorted(rows):
+        return False
+    with transaction.atomic():
+        LocationTag.objects.filter(location_id=location.id).delete()
+        LocationTag.objects.bulk_create([
+            LocationTag(location_id=location.id, kind=kind, position=position, value=value)
+            for kind, position, value in rows
+        ])
+    return True
+
+
+def write_location_tags(locations, tag_model=None, batch_size=1000):
+    """
+    여러 여행지의 태그 행을 지우고 다시 씁니다. (bulk_create로 적재한 여행지용)
+
+    Args:
+        locations: 여행지 객체 목록
+        tag_model: 태그 모델 (마이그레이션에서 과거 모델을 넘길 때 사용)
+
+    Returns:
+        int: 쓴 태그 행 수
+    """
+    from django.db import transaction
+
+    if tag_model is None:
+        from .models import LocationTag
+        tag_model = LocationTag
+
+    tags = [
+        tag_model(location_id=location.id, kind=kind, position=position, value=value)
+        for location in locations
+        for kind, position, value in location_tag_rows(location)
+    ]
+    with transaction.atomic():
+        tag_model.objects.filter(location_id__in=[location.id for location in locations]).delete()
+        tag_model.objects.bulk_create(tags, batch_size=batch_size)
+    return len(tags)
+
+
+def rebuild_location_tags(locations=None, batch_size=1000, tag_model=None):
+    """
+    여행지 쿼리셋의 태그 행을 청크 단위로 다시 만듭니다.
+
+    Args:
+        locations: Location 쿼리셋 (None이면 전체 여행지)
+        batch_size: 한 번에 처리하는 여행지 수
+        tag_model: 태그 모델 (마이그레이션에서 과거 모델을 넘길 때 사용)
+
+    Returns:
+        int: 쓴 태그 행 수
+    """
+    if tag_model is None:
+        from .models import Location, LocationTag
+        tag_model = LocationTag
+        if locations is None:
+            locations = Location.objects.all()
+
+    count = 0
+    batch = []
+    for location in locations.only('id', 'subcategories', 'subtypes').order_by('id').iterator(chunk_size=batch_size):
+        batch.append(location)
+        if len(batch) >= batch_size:
+            count += write_location_tags(batch, tag_model, batch_size)
+            batch = []
+    if batch:
+        count += write_location_tags(batch, tag_model, batch_size)
+    return count
+
+
+def first_subcategories():
+    """첫 번째 서브카테고리 값 목록 (중복 제거, 정렬). (kind, position, value) 인덱스만으로 처리"""
+    from .models import LocationTag
+
+    return list(
+        LocationTag.objects.filter(kind=LocationTag.KIND_SUBCATEGORY, position=0)
+        .order_by('value').values_list('value', flat=True).distinct()
+    )
+
+
+def first_subcategory_location_ids(value, limit=None):
+    """첫 번째 서브카테고리가 value인 여행지 ID 목록 (ID 순)"""
+    from .models import LocationTag
+
+    location_ids = (
+        LocationTag.objects.filter(kind=LocationTag.KIND_SUBCATEGORY, position=0, value=value)
+        .order_by('location_id').values_list('location_id', flat=True)
+    )
+    if limit is not None:
+        location_ids = location_ids[:limit]
+    return list(location_ids)
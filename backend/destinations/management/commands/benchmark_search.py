@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from destinations.search_benchmark import USER_PROFILES, run_benchmark
+
+
+class Command(BaseCommand):
+    help = ('ds/*.csv 카탈로그를 임시 SQLite DB에 적재하고 고정 검색어와 합성 사용자로 '
+            'search_destinations / keyword_search / recommend_destinations를 측정하여 '
+            '시나리오별 p50/p95/p99, 처리량, 최대 RSS, DB 쿼리 수를 JSON으로 출력합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv-dir', default=os.path.join(settings.BASE_DIR, 'ds'),
+                            help='TripAdvisor CSV 디렉토리')
+        parser.add_argument('--scratch-dir', default=None,
+                            help='임시 DB/캐시/임베딩 저장 디렉토리 (기본: 새 임시 디렉토리)')
+        parser.add_argument('--mode', choices=('fallback', 'advanced', 'both'), default='both',
+                            help='측정할 NLP 모드 (advanced는 고급 NLP 라이브러리가 있을 때만 실행)')
+        parser.add_argument('--rounds', type=int, default=3, help='검색어/추천 반복 횟수')
+        parser.add_argument('--top-n', type=int, default=20, help='검색 결과 수')
+        parser.add_argument('--users-per-profile', type=int, default=3,
+                            help=f"합성 사용자 유형({', '.join(USER_PROFILES)})별 사용자 수")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--cache-backend', choices=('sqlite', 'local'), default='sqlite',
+                            help='검색 결과 캐시 저장소')
+        parser.add_argument('--keep-db', action='store_true',
+                            help='임시 DB를 지우지 않고, 이미 적재되어 있으면 CSV 적재를 건너뜁니다.')
+        parser.add_argument('--output', default=None, help='JSON 보고서를 저장할 파일 경로')
+
+    def handle(self, *args, **options):
+        modes = ('fallback', 'advanced') if options['mode'] == 'both' else (options['mode'],)
+        scratch_dir = options['scratch_dir'] or tempfile.mkdtemp(prefix='search-benchmark-')
+
+        report = run_benchmark(
+            options['csv_dir'],
+            scratch_dir,
+            modes=modes,
+            rounds=max(1, options['rounds']),
+            top_n=options['top_n'],
+            users_per_profile=max(1, options['users_per_profile']),
+            seed=options['seed'],
+            cache_backend=options['cache_backend'],
+            keep_db=options['keep_db'],
+        )
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
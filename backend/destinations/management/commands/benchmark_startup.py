@@ -0,0 +1,90 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# -X importtime 출력 형식: "import time:      self [us] |  cumulative | imported package"
+IMPORTTIME_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+# 시작 시 import되면 안 되는 무거운 모듈
+HEAVY_MODULES = ('torch', 'transformers', 'sentence_transformers', 'sklearn', 'nltk')
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime 출력을 (모듈, 자체 시간(us), 누적 시간(us), 깊이) 목록으로 변환합니다.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+class Command(BaseCommand):
+    help = ('`python -X importtime manage.py check`의 시작 시간과 import 비용을 측정합니다. '
+            '무거운 NLP 모듈이 시작 시 import되거나 기준 시간을 넘으면 실패합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help='측정 반복 횟수 (최솟값을 사용)')
+        parser.add_argument('--top', type=int, default=15, help='누적 import 시간 상위 모듈 수')
+        parser.add_argument('--max-seconds', type=float, default=None,
+                            help='시작 시간 기준(초). 넘으면 오류로 종료합니다.')
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력합니다.')
+
+    def _measure(self):
+        manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+        env = dict(os.environ, NLP_WARMUP='0')
+        start_time = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', manage_py, 'check'],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        wall_seconds = time.perf_counter() - start_time
+        if completed.returncode != 0:
+            raise CommandError(f'manage.py check 실패:\n{completed.stdout}{completed.stderr[-2000:]}')
+        return wall_seconds, parse_importtime(completed.stderr)
+
+    def handle(self, *args, **options):
+        runs = [self._measure() for _ in range(max(1, options['runs']))]
+        wall_seconds, modules = min(runs, key=lambda run: run[0])
+
+        top_level_us = sum(cumulative for _, _, cumulative, depth in modules if depth == 0)
+        imported = {name for name, _, _, _ in modules}
+        heavy = sorted(name for name in imported if name in HEAVY_MODULES)
+        slowest = sorted(modules, key=lambda module: module[2], reverse=True)[:options['top']]
+
+        report = {
+            'wall_seconds': round(wall_seconds, 3),
+            'wall_seconds_all_runs': [round(run[0], 3) for run in runs],
+            'import_seconds': round(top_level_us / 1e6, 3),
+            'modules_imported': len(imported),
+            'heavy_modules_imported': heavy,
+            'slowest_imports': [
+                {'module': name, 'cumulative_ms': round(cumulative / 1000, 1), 'self_ms': round(self_us / 1000, 1)}
+                for name, self_us, cumulative, _ in slowest
+            ],
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2, ensure_ascii=False))
+        else:
+            self.stdout.write(f"시작 시간: {report['wall_seconds']}초 (측정값: {report['wall_seconds_all_runs']})")
+            self.stdout.write(f"import 시간: {report['import_seconds']}초, 모듈 {report['modules_imported']}개")
+            self.stdout.write('누적 import 시간 상위 모듈:')
+            for item in report['slowest_imports']:
+                self.stdout.write(f"  {item['cumulative_ms']:>9.1f} ms  {item['module']}")
+
+        if heavy:
+            raise CommandError(f"시작 시 무거운 모듈이 import되었습니다: {', '.join(heavy)}")
+        if options['max_seconds'] is not None and wall_seconds > options['max_seconds']:
+            raise CommandError(
+                f"시작 시간 {wall_seconds:.3f}초가 기준 {options['max_seconds']}초를 넘었습니다."
+            )
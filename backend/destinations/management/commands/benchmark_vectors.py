@@ -0,0 +1,135 @@
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from destinations.nlp_utils import nlp_processor
+from destinations.quantization import CompressedMatrix
+from destinations.search_index import destination_index
+from destinations.vector_store import normalize_rows
+
+
+def exact_top_k(matrix, query_vector, k):
+    scores = np.asarray(matrix, dtype=np.float32) @ query_vector
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+class Command(BaseCommand):
+    help = ('여행지 임베딩 압축 방식(float16 / int8 / PCA)별 메모리, 지연 시간, '
+            '압축 전(float32) 대비 recall@k와 속도 비(speedup, 1보다 작으면 float32보다 느림)를 비교하는 보고서를 출력합니다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=200, help='측정에 사용할 쿼리 수')
+        parser.add_argument('--k', type=int, default=10, help='recall 계산 기준 상위 k')
+        parser.add_argument('--pca-dims', type=str, default='128,64', help='비교할 PCA 차원 목록 (쉼표 구분)')
+        parser.add_argument('--rerank', type=str, default='0,100,200',
+                            help='원본 행렬로 다시 계산할 상위 후보 수 목록 (쉼표 구분)')
+        parser.add_argument('--rows', type=int, default=None,
+                            help='카탈로그 임베딩에 잡음을 더해 이 행 수까지 늘려 측정합니다. (대규모 카탈로그 시뮬레이션)')
+        parser.add_argument('--row-noise', type=float, default=0.05,
+                            help='--rows로 늘린 행에 더하는 잡음 크기')
+        parser.add_argument('--query-noise', type=float, default=0.05,
+                            help='쿼리로 사용할 카탈로그 임베딩에 더하는 잡음 크기')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력합니다.')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        k = options['k']
+
+        self.stdout.write('여행지 임베딩 행렬을 준비하는 중...')
+        index = destination_index.get(nlp_processor.encode_texts, store=nlp_processor.get_embedding_store())
+        matrix = np.asarray(index.matrix, dtype=np.float32)
+        if len(matrix) <= k:
+            self.stdout.write(self.style.WARNING('여행지가 너무 적어 측정할 수 없습니다.'))
+            return
+
+        if options['rows'] and options['rows'] > len(matrix):
+            base_rows = rng.integers(0, len(matrix), size=options['rows'] - len(matrix))
+            extra = matrix[base_rows] + rng.normal(0, options['row_noise'], size=(len(base_rows), matrix.shape[1])).astype(np.float32)
+            matrix = np.vstack([matrix, normalize_rows(extra).astype(np.float32)])
+
+        query_rows = rng.choice(len(matrix), size=min(options['queries'], len(matrix)), replace=False)
+        noise = rng.normal(0, options['query_noise'], size=(len(query_rows), matrix.shape[1])).astype(np.float32)
+        queries = normalize_rows(matrix[query_rows] + noise).astype(np.float32)
+
+        # 기준: 압축하지 않은 float32 행렬의 정확한 상위 k개
+        truth = []
+        latencies = []
+        for query_vector in queries:
+            start_time = time.perf_counter()
+            truth.append(exact_top_k(matrix, query_vector, k))
+            latencies.append(time.perf_counter() - start_time)
+
+        reports = [{
+            'config': 'float32',
+            'rerank': 0,
+            'build_seconds': 0.0,
+            'memory_mb': round(matrix.nbytes / 1e6, 2),
+            'compression_ratio': 1.0,
+            f'recall@{k}': 1.0,
+            'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+            'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3),
+            'speedup': 1.0,
+        }]
+        baseline_p50 = float(np.percentile(latencies, 50))
+
+        configs = [(kind, None) for kind in ('float16', 'int8')]
+        for dimension in [int(d) for d in options['pca_dims'].split(',') if d.strip()]:
+            if dimension < matrix.shape[1]:
+                configs += [('float16', dimension), ('int8', dimension)]
+        reranks = [int(r) for r in options['rerank'].split(',') if r.strip()]
+
+        for kind, dimension in configs:
+            start_time = time.perf_counter()
+            compressed = CompressedMatrix.build(matrix, kind, dimension)
+            build_seconds = time.perf_counter() - start_time
+
+            for rerank in reranks:
+                hits = 0
+                latencies = []
+                for query_vector, expected in zip(queries, truth):
+                    start_time = time.perf_counter()
+                    scores = compressed.dot(query_vector)
+                    candidates = max(k, rerank)
+                    top = np.argpartition(-scores, candidates - 1)[:candidates]
+                    if rerank:
+                        exact = matrix[top] @ query_vector
+                        top = top[np.argsort(-exact)[:k]]
+                    else:
+                        top = top[np.argsort(-scores[top])[:k]]
+                    latencies.append(time.perf_counter() - start_time)
+                    hits += len(np.intersect1d(top, expected))
+
+                reports.append({
+                    'config': compressed.tag,
+                    'rerank': rerank,
+                    'build_seconds': round(build_seconds, 3),
+                    'memory_mb': round(compressed.nbytes / 1e6, 2),
+                    'compression_ratio': round(matrix.nbytes / compressed.nbytes, 2),
+                    f'recall@{k}': round(hits / (len(queries) * k), 4),
+                    'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+                    'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3),
+                    'speedup': round(baseline_p50 / float(np.percentile(latencies, 50)), 2),
+                })
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'rows': len(matrix),
+                'dimension': matrix.shape[1],
+                'queries': len(queries),
+                'results': reports,
+            }, indent=2))
+            return
+
+        self.stdout.write(f'행 {len(matrix)}개, 차원 {matrix.shape[1]}, 쿼리 {len(queries)}개')
+        self.stdout.write(f"{'config':<18}{'rerank':>7}{'MB':>10}{'ratio':>7}{'recall@' + str(k):>11}"
+                          f"{'p50 ms':>9}{'p95 ms':>9}{'speedup':>9}")
+        for report in reports:
+            self.stdout.write(
+                f"{report['config']:<18}{report['rerank']:>7}{report['memory_mb']:>10.2f}"
+                f"{report['compression_ratio']:>7.2f}{report[f'recall@{k}']:>11.4f}"
+                f"{report['p50_ms']:>9.3f}{report['p95_ms']:>9.3f}{report['speedup']:>9.2f}"
+            )
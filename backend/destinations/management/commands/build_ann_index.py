@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from destinations.ann_index import IVFIndex
+from destinations.nlp_utils import nlp_processor
+from destinations.search_index import destination_index, ann_index_path
+
+
+class Command(BaseCommand):
+    help = '여행지 임베딩의 근사 최근접 이웃(IVF) 인덱스를 구축하고, 정확 검색 대비 재현율/지연 시간 보고서를 출력합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nlist', type=int, default=getattr(settings, 'NLP_ANN_NLIST', None),
+                            help='셀(클러스터) 수 (기본값: 약 4·sqrt(N))')
+        parser.add_argument('--iterations', type=int, default=15, help='k-means 반복 횟수')
+        parser.add_argument('--nprobe', type=str, default='1,2,4,8,16,32,64',
+                            help='보고서에서 비교할 nprobe 값 목록 (쉼표 구분)')
+        parser.add_argument('--queries', type=int, default=200, help='보고서에 사용할 쿼리 수')
+        parser.add_argument('--k', type=int, default=10, help='재현율 계산 기준 상위 k')
+        parser.add_argument('--no-report', action='store_true', help='재현율/지연 시간 보고서를 생략합니다.')
+
+    def handle(self, *args, **options):
+        store = nlp_processor.get_embedding_store()
+
+        self.stdout.write('여행지 임베딩 행렬을 준비하는 중...')
+        destination_index.mark_dirty()
+        index = destination_index.get(nlp_processor.encode_texts, store=store)
+        matrix = index.matrix
+        self.stdout.write(f'여행지 {len(index)}개, 차원 {index.dimension}')
+
+        if len(index) == 0:
+            self.stdout.write(self.style.WARNING('여행지가 없어 인덱스를 구축하지 않습니다.'))
+            return
+
+        ann = IVFIndex(
+            nlist=options['nlist'],
+            nprobe=getattr(settings, 'NLP_ANN_NPROBE', 8),
+            min_candidates=getattr(settings, 'NLP_ANN_MIN_CANDIDATES', 2000),
+        ).train(matrix, iterations=options['iterations'])
+        self.stdout.write(self.style.SUCCESS(
+            f'IVF 인덱스 학습 완료: nlist={ann.nlist} (소요 시간: {ann.train_seconds:.2f}초)'
+        ))
+
+        path = ann_index_path(store)
+        if path:
+            with store.write_lock():
+                ann.save(path, generation=store.generation)
+            self.stdout.write(f'인덱스 저장: {path}')
+        else:
+            self.stdout.write(self.style.WARNING('NLP_EMBEDDING_STORE_DIR이 설정되지 않아 인덱스를 저장하지 않습니다.'))
+
+        # 현재 프로세스의 인덱스에도 반영
+        if getattr(settings, 'NLP_ANN_ENABLED', False):
+            index.ann = ann
+
+        if not options['no_report']:
+            nprobes = [int(value) for value in options['nprobe'].split(',') if value.strip()]
+            self.report(matrix, ann, nprobes, options['queries'], options['k'])
+
+    def report(self, matrix, ann, nprobes, num_queries, k):
+        """카탈로그 벡터를 쿼리로 사용하여 정확 검색 대비 재현율과 지연 시간을 측정합니다."""
+        rng = np.random.default_rng(0)
+        query_rows = rng.choice(matrix.shape[0], size=min(num_queries, matrix.shape[0]), replace=False)
+        # 카탈로그 벡터에 약간의 잡음을 더해 실제 쿼리처럼 사용
+        queries = np.asarray(matrix[query_rows], dtype=np.float32)
+        queries += rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        exact_results = []
+        exact_times = []
+        for query in queries:
+            start = time.perf_counter()
+            scores = matrix @ query
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            exact_times.append(time.perf_counter() - start)
+            exact_results.append(set(top.tolist()))
+
+        self.stdout.write('')
+        self.stdout.write(f'{"nprobe":>8} {"recall@" + str(k):>10} {"후보 수":>10} {"p50(ms)":>10} {"p95(ms)":>10}')
+        self.stdout.write(
+            f'{"exact":>8} {1.0:>10.3f} {matrix.shape[0]:>10} '
+            f'{np.percentile(exact_times, 50) * 1000:>10.2f} {np.percentile(exact_times, 95) * 1000:>10.2f}'
+        )
+
+        for nprobe in nprobes:
+            if nprobe > ann.nlist:
+                continue
+            times, recalls, candidate_counts = [], [], []
+            for query, expected in zip(queries, exact_results):
+                start = time.perf_counter()
+                rows, _ = ann.search(matrix, query, k, nprobe=nprobe)
+                times.append(time.perf_counter() - start)
+                recalls.append(len(expected & set(rows.tolist())) / len(expected))
+                candidate_counts.append(len(ann.candidates(query, nprobe, min_candidates=k)))
+            self.stdout.write(
+                f'{nprobe:>8} {np.mean(recalls):>10.3f} {int(np.mean(candidate_counts)):>10} '
+                f'{np.percentile(times, 50) * 1000:>10.2f} {np.percentile(times, 95) * 1000:>10.2f}'
+            )
@@ -0,0 +1,64 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from destinations.search_benchmark import read_catalog
+from destinations.synthetic_data import clear_synthetic_data, generate
+
+
+class Command(BaseCommand):
+    help = ('ds/*.csv의 실제 여행지를 재표본추출/변형한 합성 여행지와, 좋아요/리뷰 수가 멱법칙을 따르는 '
+            '합성 사용자를 현재 DB에 생성합니다. (대규모 성능 테스트용, 같은 시드면 같은 데이터)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--locations', type=int, default=100000, help='생성할 합성 여행지 수')
+        parser.add_argument('--users', type=int, default=10000, help='생성할 합성 사용자 수')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000, help='bulk_create 청크(트랜잭션) 크기')
+        parser.add_argument('--csv-dir', default=os.path.join(settings.BASE_DIR, 'ds'), help='원본 CSV 디렉토리')
+        parser.add_argument('--like-exponent', type=float, default=1.8,
+                            help='사용자별 좋아요 수 Zipf 지수 (1보다 커야 하며 클수록 활동이 적음)')
+        parser.add_argument('--review-exponent', type=float, default=2.2, help='사용자별 리뷰 수 Zipf 지수')
+        parser.add_argument('--popularity-exponent', type=float, default=1.0, help='여행지 인기도 Zipf 지수')
+        parser.add_argument('--max-likes', type=int, default=500, help='사용자당 최대 좋아요 수')
+        parser.add_argument('--max-reviews', type=int, default=200, help='사용자당 최대 리뷰 수')
+        parser.add_argument('--skip-search-documents', action='store_true',
+                            help='합성 여행지의 검색 문서를 만들지 않습니다. (첫 검색 시 생성)')
+        parser.add_argument('--clear', action='store_true',
+                            help='생성 전에 이전에 만든 합성 여행지/사용자를 삭제합니다.')
+
+    def handle(self, *args, **options):
+        from destinations.models import Location
+        from destinations.synthetic_data import SYNTHETIC_LOCATION_ID_START
+
+        if options['like_exponent'] <= 1 or options['review_exponent'] <= 1:
+            raise CommandError('좋아요/리뷰 Zipf 지수는 1보다 커야 합니다.')
+
+        if options['clear']:
+            self.stdout.write('이전 합성 데이터를 삭제하는 중...')
+            clear_synthetic_data()
+        elif Location.objects.filter(id__gte=SYNTHETIC_LOCATION_ID_START).exists():
+            raise CommandError('이미 합성 여행지가 있습니다. --clear로 삭제한 뒤 다시 생성하세요.')
+
+        templates, num_files = read_catalog(options['csv_dir'])
+        if not templates:
+            raise CommandError(f"{options['csv_dir']}에서 여행지 행을 찾을 수 없습니다.")
+        self.stdout.write(f'원본 여행지 {len(templates)}개 (CSV {num_files}개)')
+
+        summary = generate(
+            templates,
+            locations=options['locations'],
+            users=options['users'],
+            seed=options['seed'],
+            batch_size=max(1, options['batch_size']),
+            like_exponent=options['like_exponent'],
+            review_exponent=options['review_exponent'],
+            popularity_exponent=options['popularity_exponent'],
+            max_likes=options['max_likes'],
+            max_reviews=options['max_reviews'],
+            build_documents=not options['skip_search_documents'],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(json.dumps(summary, ensure_ascii=False)))
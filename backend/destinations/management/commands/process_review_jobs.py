@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from destinations.review_jobs import (
+    claim_jobs, enqueue_missing_analyses, make_worker_id, process_jobs, queue_stats,
+)
+
+
+class Command(BaseCommand):
+    help = 'DB 작업 큐의 리뷰 분석(감정 분석/키워드 추출) 작업을 묶음으로 처리하는 워커를 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=32, help='한 번에 가져올 작업 수')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='대기열이 비었을 때 다시 확인하는 간격(초)')
+        parser.add_argument('--lease', type=int, default=300,
+                            help='처리 중 작업의 임대 시간(초). 지나면 다른 워커가 다시 가져감')
+        parser.add_argument('--max-attempts', type=int, default=3, help='실패로 표시하기 전 최대 시도 횟수')
+        parser.add_argument('--once', action='store_true', help='대기열을 비운 뒤 종료합니다.')
+        parser.add_argument('--enqueue-missing', action='store_true',
+                            help='분석 결과가 없거나 내용과 맞지 않는 기존 리뷰를 먼저 대기열에 넣습니다.')
+        parser.add_argument('--stats', action='store_true', help='대기열 상태만 출력하고 종료합니다.')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self._write_stats()
+            return
+
+        if options['enqueue_missing']:
+            count = enqueue_missing_analyses()
+            self.stdout.write(f'기존 리뷰 {count}개를 대기열에 넣었습니다.')
+
+        worker_id = make_worker_id()
+        self.stdout.write(f'리뷰 분석 워커 시작: {worker_id}')
+        self._write_stats()
+
+        try:
+            while True:
+                jobs = claim_jobs(worker_id, options['batch_size'], options['lease'])
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                start_time = time.time()
+                result = process_jobs(jobs, worker_id, options['max_attempts'])
+                elapsed = time.time() - start_time
+                self.stdout.write(
+                    f"작업 {len(jobs)}개 처리: 분석 {result['analyzed']}, 건너뜀 {result['skipped']}, "
+                    f"실패 {result['failed']} ({elapsed:.2f}초, {len(jobs) / elapsed if elapsed > 0 else 0:.1f} jobs/sec)"
+                )
+        except KeyboardInterrupt:
+            self.stdout.write('워커를 종료합니다.')
+
+        self._write_stats()
+
+    def _write_stats(self):
+        stats = queue_stats()
+        self.stdout.write(
+            f"대기열: 대기 {stats['depth']}, 처리 중 {stats['running']}, 실패 {stats['failed']}, "
+            f"완료 {stats['done']}, 지연 {stats['lag_seconds']}초"
+        )
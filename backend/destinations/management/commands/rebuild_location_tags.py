@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from destinations.lazy_index import invalidate_catalog
+from destinations.location_tags import rebuild_location_tags
+
+
+class Command(BaseCommand):
+    help = ('여행지 서브카테고리/서브타입 태그 행(LocationTag)을 다시 만듭니다. '
+            'bulk_create나 QuerySet.update 등 시그널 없이 여행지를 변경한 뒤 실행하세요.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 처리하는 여행지 수')
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        count = rebuild_location_tags(batch_size=options['batch_size'])
+        # 실행 중인 서버 워커가 태그 색인을 다시 구축하도록 카탈로그 버전을 올림
+        invalidate_catalog()
+        self.stdout.write(self.style.SUCCESS(
+            f'태그 행 {count}개를 만들었습니다. (소요 시간: {time.time() - start_time:.2f}초)'
+        ))
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from destinations.search_documents import ensure_documents, rebuild_documents
+
+
+class Command(BaseCommand):
+    help = ('여행지 검색 문서(SearchDocument)를 다시 만듭니다. '
+            'QuerySet.update 등 시그널 없이 여행지를 변경한 뒤 실행하세요.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--missing-only', action='store_true', help='문서가 없는 여행지만 만듭니다.')
+        parser.add_argument('--batch-size', type=int, default=1000, help='한 번에 쓰는 문서 수')
+
+    def handle(self, *args, **options):
+        start_time = time.time()
+        if options['missing_only']:
+            count = ensure_documents()
+        else:
+            count = rebuild_documents(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'검색 문서 {count}개를 만들었습니다. (소요 시간: {time.time() - start_time:.2f}초)'
+        ))
@@ -0,0 +1,36 @@
+"""
+요청별 검색 단계 소요 시간을 Server-Timing 응답 헤더로 내보내는 미들웨어
+"""
+import time
+
+from .instrumentation import end_request, server_timing_header, start_request, timing_histograms
+
+
+class ServerTimingMiddleware:
+    """
+    요청마다 단계별 시간을 초기화하고, 응답에 기록된 단계가 있으면
+    Server-Timing 헤더(단계별 시간 + total)를 추가합니다. (settings.NLP_SERVER_TIMING)
+
+    스트리밍 응답은 헤더가 본문보다 먼저 전송되므로 본문 생성 전까지의 단계만 포함됩니다.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from django.conf import settings
+
+        start_request()
+        start_time = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = end_request()
+
+        if timings:
+            total_ms = (time.perf_counter() - start_time) * 1000
+            timing_histograms.observe('total', total_ms)
+            if getattr(settings, 'NLP_SERVER_TIMING', settings.DEBUG):
+                timings['total'] = round(total_ms, 3)
+                response['Server-Timing'] = server_timing_header(timings)
+        return response
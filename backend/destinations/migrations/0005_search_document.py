@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_search_documents(apps, schema_editor):
+    """기존 여행지의 검색 문서를 만듭니다."""
+    from destinations.search_documents import rebuild_documents
+
+    Location = apps.get_model('destinations', 'Location')
+    SearchDocument = apps.get_model('destinations', 'SearchDocument')
+    rebuild_documents(Location.objects.all(), document_model=SearchDocument)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('destinations', '0004_review_analysis_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('location', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='destinations.location')),
+                ('embedding_text', models.TextField()),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('category', models.CharField(blank=True, default='', max_length=255)),
+                ('city', models.CharField(blank=True, default='', max_length=255)),
+                ('country', models.CharField(blank=True, default='', max_length=255)),
+                ('subcategories', models.TextField(blank=True, default='')),
+                ('tokens', models.TextField(blank=True, default='')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_location_tags(apps, schema_editor):
+    """기존 여행지의 서브카테고리/서브타입을 태그 행으로 풉니다."""
+    from destinations.location_tags import rebuild_location_tags
+
+    Location = apps.get_model('destinations', 'Location')
+    LocationTag = apps.get_model('destinations', 'LocationTag')
+    rebuild_location_tags(Location.objects.all(), tag_model=LocationTag)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('destinations', '0005_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocationTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('subcategory', '서브카테고리'), ('subtype', '서브타입')], max_length=12)),
+                ('position', models.PositiveSmallIntegerField()),
+                ('value', models.CharField(max_length=255)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='destinations.location')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'value'], name='destination_kind_cc933e_idx'), models.Index(fields=['kind', 'position', 'value'], name='destination_kind_af2f61_idx')],
+                'constraints': [models.UniqueConstraint(fields=('location', 'kind', 'position'), name='unique_location_tag_position')],
+            },
+        ),
+        migrations.RunPython(build_location_tags, migrations.RunPython.noop),
+    ]
@@ -104,6 +104,9 @@ class Review(models.Model):
     # 리뷰에서 추출된 키워드 저장
     keywords = models.JSONField(null=True, blank=True)  # JSON 형식으로 저장된 키워드 목록
     
+    # 현재 저장된 분석 결과가 어떤 내용으로 계산되었는지 (내용 해시). 내용이 같으면 다시 분석하지 않음
+    analysis_hash = models.CharField(max_length=64, null=True, blank=True)
+    
     class Meta:
         ordering = ['-created_at']
     
@@ -111,13 +114,96 @@ class Review(models.Model):
         return f"{self.user.username}'s review on {self.location.name}"
     
     def save(self, *args, **kwargs):
-        # 리뷰 저장 시 감정 분석 수행
-        if self.content:
-            from .review_utils import analyze_review
-            analysis_result = analyze_review(self.content)
-            
-            self.sentiment = analysis_result['sentiment']
-            self.sentiment_score = analysis_result['sentiment_score']
-            self.keywords = analysis_result['keywords']
+        # 리뷰 저장 시 감정 분석 수행 (설정에 따라 작업 큐에 넣거나, 결과를 기다리거나, 저장 후 비동기로 채움)
+        # 내용이 바뀌지 않았으면 (예: 별점만 수정) 다시 분석하지 않음
+        from .review_utils import review_content_hash, start_review_analysis
+        
+        pending_analysis = None
+        needs_analysis = bool(self.content) and self.analysis_hash != review_content_hash(self.content)
+        if needs_analysis:
+            pending_analysis = start_review_analysis(self)
         
         super().save(*args, **kwargs)
+        
+        if pending_analysis is not None:
+            from .review_utils import finish_review_analysis
+            finish_review_analysis(self, pending_analysis)
+
+# 리뷰 분석 작업 (DB 기반 작업 큐, 리뷰당 최대 하나)
+class ReviewAnalysisJob(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, '대기'),
+        (STATUS_RUNNING, '처리 중'),
+        (STATUS_DONE, '완료'),
+        (STATUS_FAILED, '실패'),
+    )
+    
+    review = models.OneToOneField(Review, on_delete=models.CASCADE, related_name='analysis_job')
+    content_hash = models.CharField(max_length=64)  # 분석할 리뷰 내용의 해시
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    enqueued_at = models.DateTimeField(default=timezone.now)  # 마지막으로 대기열에 들어간 시각 (지연 시간 계산용)
+    locked_by = models.CharField(max_length=64, null=True, blank=True)  # 처리 중인 워커
+    locked_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'enqueued_at']),
+        ]
+    
+    def __str__(self):
+        return f"Analysis job for review {self.review_id} ({self.status})"
+
+# 여행지 검색 문서 (검색용으로 미리 분석해 둔 여행지 텍스트, 여행지당 하나)
+class SearchDocument(models.Model):
+    location = models.OneToOneField(Location, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    embedding_text = models.TextField()  # 임베딩에 사용하는 표준 텍스트 (build_destination_text)
+    
+    # 소문자로 변환한 필드 문자열 (서브카테고리는 공백으로 이어 붙임)
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True, default='')
+    category = models.CharField(max_length=255, blank=True, default='')
+    city = models.CharField(max_length=255, blank=True, default='')
+    country = models.CharField(max_length=255, blank=True, default='')
+    subcategories = models.TextField(blank=True, default='')
+    
+    # 이름/설명/도시/국가를 토큰화하고 불용어를 제거한 토큰 (공백 구분, 중복 제거)
+    tokens = models.TextField(blank=True, default='')
+    
+    source_hash = models.CharField(max_length=64)  # 위 필드를 만든 원본 값의 해시 (변경이 없으면 갱신하지 않음)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Search document for location {self.location_id}"
+
+# 여행지 서브카테고리/서브타입 정규화 테이블 (JSON 필드의 목록 항목당 한 행, 여행지 저장 시 갱신)
+class LocationTag(models.Model):
+    KIND_SUBCATEGORY = 'subcategory'
+    KIND_SUBTYPE = 'subtype'
+    KIND_CHOICES = (
+        (KIND_SUBCATEGORY, '서브카테고리'),
+        (KIND_SUBTYPE, '서브타입'),
+    )
+    
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='tags')
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    position = models.PositiveSmallIntegerField()  # JSON 목록에서의 위치 (0이면 첫 번째 서브카테고리)
+    value = models.CharField(max_length=255)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'kind', 'position'], name='unique_location_tag_position'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'value']),  # 태그 값으로 여행지 찾기, 태그별 여행지 수
+            models.Index(fields=['kind', 'position', 'value']),  # 첫 번째 서브카테고리 목록/필터
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}[{self.position}] {self.value} ({self.location_id})"
@@ -1,77 +1,57 @@
+import importlib.util
+import logging
 import os
 import re
 from collections import Counter
 import time
 import functools
 
-# 라이브러리 가용성 확인
-NLP_ADVANCED = False
-try:
-    from transformers import pipeline
-    import torch
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    from sentence_transformers import SentenceTransformer, util
-    NLP_ADVANCED = True
-    print("고급 NLP 기능이 활성화되었습니다.")
-except ImportError:
-    print("고급 NLP 라이브러리가 설치되지 않았습니다. 기본 검색 기능만 사용 가능합니다.")
+import numpy as np
 
-try:
+from .cache import cache_from_settings
+from .instrumentation import SampledLogger, record, reset_timings, span
+from .query_normalization import QueryKeyStats, canonicalize_query
+from .result_cache import get_search_cache, hydrate_results
+
+logger = logging.getLogger(__name__)
+# 검색 경로(요청마다 실행되는 코드)의 debug/info 로그는 샘플링하여 기록
+search_log = SampledLogger(logger)
+
+# 라이브러리 설치 여부 확인 (무거운 모듈은 실제로 사용할 때 import)
+def _module_available(name):
+    return importlib.util.find_spec(name) is not None
+
+
+NLP_ADVANCED = all(
+    _module_available(name) for name in ('transformers', 'torch', 'sklearn', 'sentence_transformers')
+)
+NLTK_AVAILABLE = _module_available('nltk')
+
+# 기본 불용어 (NLTK 불용어 데이터가 없을 때 사용)
+DEFAULT_STOP_WORDS = {'a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what',
+                      'when', 'where', 'how', 'all', 'with', 'for', 'in', 'to', 'at', 'by',
+                      'from', 'on', 'off'}
+
+
+def _nltk_resource_available(resource_path):
+    """NLTK 리소스가 로컬에 있는지 확인합니다. (다운로드하지 않음)"""
     import nltk
-    from nltk.tokenize import word_tokenize
-    from nltk.corpus import stopwords
-    
-    # NLTK 데이터 다운로드 (처음 실행 시 필요)
-    nltk_resources = ['punkt', 'stopwords']
-    for resource in nltk_resources:
-        try:
-            nltk.data.find(f'tokenizers/{resource}')
-        except LookupError:
-            print(f"NLTK {resource} 다운로드 중...")
-            nltk.download(resource)
-    
-    # 추가 리소스 다운로드
     try:
-        nltk.download('punkt')
-    except:
-        pass
-    
-    NLTK_AVAILABLE = True
-    print("NLTK 기능이 활성화되었습니다.")
-except ImportError:
-    NLTK_AVAILABLE = False
-    print("NLTK 라이브러리가 설치되지 않았습니다. 기본 토큰화 기능을 사용합니다.")
+        nltk.data.find(resource_path)
+        return True
+    except LookupError:
+        return False
+
 
 # 모델 캐싱 디렉토리 설정
 os.environ['TRANSFORMERS_CACHE'] = './models/transformers_cache'
 os.environ['TORCH_HOME'] = './models/torch_cache'
 
-# 간단한 LRU 캐시 구현
-class LRUCache:
-    def __init__(self, capacity=100):
-        self.cache = {}
-        self.capacity = capacity
-        self.timestamps = {}
-    
-    def get(self, key):
-        if key in self.cache:
-            self.timestamps[key] = time.time()
-            return self.cache[key]
-        return None
-    
-    def put(self, key, value):
-        if len(self.cache) >= self.capacity:
-            # 가장 오래된 항목 제거
-            oldest_key = min(self.timestamps, key=self.timestamps.get)
-            del self.cache[oldest_key]
-            del self.timestamps[oldest_key]
-        
-        self.cache[key] = value
-        self.timestamps[key] = time.time()
+# 검색 결과 캐시 (워커 간 공유, (위치 ID, 점수) 배열로 저장)
+search_cache = get_search_cache()
 
-# 검색 결과 캐시
-search_cache = LRUCache(capacity=500)
+# 키워드 사전 필터링을 적용할 최소 후보 수 (이보다 적으면 전체 여행지를 대상으로 검색)
+KEYWORD_MIN_CANDIDATES = 50
 
 class NLPProcessor:
     def __init__(self):
@@ -81,29 +61,83 @@ class NLPProcessor:
         # 문장 임베딩 모델 초기화
         self.sentence_model = None
         
-        # 불용어 설정
-        self.stop_words = set(['a', 'an', 'the', 'and', 'or', 'but', 'if', 'because', 'as', 'what', 
-                              'when', 'where', 'how', 'all', 'with', 'for', 'in', 'to', 'at', 'by', 
-                              'from', 'on', 'off']) if not NLTK_AVAILABLE else set(stopwords.words('english'))
+        # 불용어와 토큰화 함수 (처음 사용할 때 결정)
+        self._stop_words = None
+        self._word_tokenize = None
+        self._tokenizer_checked = False
         
         # 모델 로드 플래그
         self.models_loaded = False
         
-        # 임베딩 캐시
-        self.embedding_cache = {}
+        # 임베딩 캐시 (항목 수 + 바이트 예산 제한)
+        self.embedding_cache = cache_from_settings(
+            'NLP_EMBEDDING_CACHE', 'embedding', max_entries=20000, max_bytes=64 * 1024 * 1024
+        )
         
         # 감정 분석 캐시
-        self.sentiment_cache = {}
+        self.sentiment_cache = cache_from_settings(
+            'NLP_SENTIMENT_CACHE', 'sentiment', max_entries=20000, max_bytes=16 * 1024 * 1024
+        )
+        
+        # 여행지 임베딩 영속 저장소 (메모리 맵)
+        self.embedding_store = None
+        
+        # 단건 임베딩/감정 분석 요청용 마이크로 배치 처리기와 마지막 배치 임베딩 통계
+        self.embedding_batcher = None
+        self.sentiment_batcher = None
+        self.last_encode_stats = {}
+        
+        # 원본 검색어와 표준형 검색어의 서로 다른 키 수 (정규화 효과 확인용)
+        self.query_key_stats = QueryKeyStats()
         
         # 성능 최적화를 위한 설정
         self.use_lightweight_model = True
     
+    @property
+    def stop_words(self):
+        """불용어 집합 (NLTK 불용어 데이터가 로컬에 있으면 사용)"""
+        if self._stop_words is None:
+            stop_words = DEFAULT_STOP_WORDS
+            if NLTK_AVAILABLE and _nltk_resource_available('corpora/stopwords'):
+                from nltk.corpus import stopwords
+                stop_words = set(stopwords.words('english'))
+            self._stop_words = stop_words
+        return self._stop_words
+    
+    @property
+    def word_tokenize(self):
+        """NLTK 토큰화 함수 (punkt 데이터가 로컬에 없으면 None)"""
+        if not self._tokenizer_checked:
+            if NLTK_AVAILABLE and _nltk_resource_available('tokenizers/punkt'):
+                from nltk.tokenize import word_tokenize
+                self._word_tokenize = word_tokenize
+            self._tokenizer_checked = True
+        return self._word_tokenize
+    
+    @property
+    def sentence_model_name(self):
+        """문장 임베딩 모델 이름"""
+        if self.use_lightweight_model:
+            # 더 가벼운 모델 사용
+            return "sentence-transformers/paraphrase-MiniLM-L3-v2"
+        return "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    
     def load_models(self):
-        """모델을 로드합니다. 처음 사용할 때만 호출됩니다."""
+        """모델을 로드합니다. 처음 사용할 때(또는 예열 시) 한 번만 호출됩니다."""
+        global NLP_ADVANCED
         if self.models_loaded or not NLP_ADVANCED:
             return
         
-        print("NLP 모델 로딩 중...")
+        try:
+            from transformers import pipeline
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            # 설치는 되어 있지만 import할 수 없는 경우 기본 검색 기능으로 전환
+            logger.warning("고급 NLP 라이브러리를 불러올 수 없습니다: %s", e)
+            NLP_ADVANCED = False
+            return
+        
+        logger.info("NLP 모델 로딩 중...")
         start_time = time.time()
         
         # 감정 분석 모델 로드 - 모델 명시적 지정
@@ -114,83 +148,113 @@ class NLPProcessor:
         )
         
         # 문장 임베딩 모델 로드 (경량 다국어 지원 모델)
-        if self.use_lightweight_model:
-            # 더 가벼운 모델 사용
-            model_name = "sentence-transformers/paraphrase-MiniLM-L3-v2"
-        else:
-            model_name = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
-            
-        self.sentence_model = SentenceTransformer(model_name)
+        self.sentence_model = SentenceTransformer(self.sentence_model_name)
         
         self.models_loaded = True
-        print(f"NLP 모델 로딩 완료! (소요 시간: {time.time() - start_time:.2f}초)")
+        logger.info("NLP 모델 로딩 완료! (소요 시간: %.2f초)", time.time() - start_time)
+    
+    def _keyword_sentiment(self, text, positive_words, negative_words, neutral_result):
+        """긍정/부정 단어 수로 감정을 판단합니다. 동률이면 neutral_result를 반환합니다."""
+        text_lower = text.lower()
+        positive_count = sum(1 for word in positive_words if word in text_lower)
+        negative_count = sum(1 for word in negative_words if word in text_lower)
+        
+        if positive_count > negative_count:
+            return ("POSITIVE", 0.8)
+        if negative_count > positive_count:
+            return ("NEGATIVE", 0.8)
+        return neutral_result
     
-    def analyze_sentiment(self, text):
-        """텍스트의 감정을 분석합니다."""
+    def analyze_sentiment(self, text, timeout=None):
+        """
+        텍스트의 감정을 분석합니다.
+        
+        Args:
+            text: 분석할 텍스트
+            timeout: 모델 추론 결과를 기다리는 최대 시간(초). 초과하면 concurrent.futures.TimeoutError
+        """
+        return self.analyze_sentiment_async(text).result(timeout=timeout)
+    
+    def analyze_sentiment_async(self, text):
+        """
+        텍스트의 감정 분석 결과를 Future로 반환합니다.
+        모델 추론이 필요한 요청은 감정 분석 배치 워커에서 다른 요청과 함께 배치로 처리됩니다.
+        """
+        from .batching import completed_future
+        
         # 캐시 확인
-        if text in self.sentiment_cache:
-            return self.sentiment_cache[text]
+        cached = self.sentiment_cache.get(text)
+        if cached is not None:
+            return completed_future(cached)
             
         if not NLP_ADVANCED:
             # 간단한 감정 분석 (키워드 기반)
             positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'happy', 'love', 'enjoy', 'fun', 'beautiful']
             negative_words = ['bad', 'terrible', 'awful', 'horrible', 'sad', 'hate', 'dislike', 'boring', 'ugly', 'disappointed']
-            
-            text_lower = text.lower()
-            positive_count = sum(1 for word in positive_words if word in text_lower)
-            negative_count = sum(1 for word in negative_words if word in text_lower)
-            
-            if positive_count > negative_count:
-                result = ("POSITIVE", 0.8)
-            elif negative_count > positive_count:
-                result = ("NEGATIVE", 0.8)
-            else:
-                result = ("NEUTRAL", 0.5)
+            result = self._keyword_sentiment(text, positive_words, negative_words, ("NEUTRAL", 0.5))
                 
             # 결과 캐싱
-            self.sentiment_cache[text] = result
-            return result
+            self.sentiment_cache.put(text, result)
+            return completed_future(result)
         
         if not self.models_loaded:
             self.load_models()
         
+        # 짧은 텍스트는 간단한 방법으로 처리하고, 판단할 수 없으면 모델 사용
+        if len(text.split()) < 5:
+            positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'happy', 'love', 'enjoy', 'fun', 'beautiful', 'clean']
+            negative_words = ['bad', 'terrible', 'awful', 'horrible', 'sad', 'hate', 'dislike', 'boring', 'ugly', 'disappointed', 'dirty']
+            result = self._keyword_sentiment(text, positive_words, negative_words, None)
+            if result is not None:
+                self.sentiment_cache.put(text, result)
+                return completed_future(result)
+        
+        # 모델 추론은 배치 워커에 맡기고, 결과가 나오면 캐싱 (오류 시 중립)
+        from concurrent.futures import Future
+        
+        future = Future()
+        
+        def on_done(model_future):
+            try:
+                result = model_future.result()
+            except Exception as e:
+                logger.warning("감정 분석 중 오류 발생: %s", e)
+                result = ("NEUTRAL", 0.5)
+            self.sentiment_cache.put(text, result)
+            future.set_result(result)
+        
         try:
-            # 짧은 텍스트는 간단한 방법으로 처리
-            if len(text.split()) < 5:
-                text_lower = text.lower()
-                positive_words = ['good', 'great', 'excellent', 'amazing', 'wonderful', 'happy', 'love', 'enjoy', 'fun', 'beautiful', 'clean']
-                negative_words = ['bad', 'terrible', 'awful', 'horrible', 'sad', 'hate', 'dislike', 'boring', 'ugly', 'disappointed', 'dirty']
-                
-                positive_count = sum(1 for word in positive_words if word in text_lower)
-                negative_count = sum(1 for word in negative_words if word in text_lower)
-                
-                if positive_count > negative_count:
-                    result = ("POSITIVE", 0.8)
-                elif negative_count > positive_count:
-                    result = ("NEGATIVE", 0.8)
-                else:
-                    # 모델 사용
-                    model_result = self.sentiment_analyzer(text)
-                    result = (model_result[0]['label'], model_result[0]['score'])
-            else:
-                # 긴 텍스트는 모델 사용
-                model_result = self.sentiment_analyzer(text)
-                result = (model_result[0]['label'], model_result[0]['score'])
-                
-            # 결과 캐싱
-            self.sentiment_cache[text] = result
-            return result
+            self.get_sentiment_batcher().submit(text).add_done_callback(on_done)
         except Exception as e:
-            print(f"감정 분석 중 오류 발생: {str(e)}")
-            result = ("NEUTRAL", 0.5)
-            self.sentiment_cache[text] = result
-            return result
+            logger.warning("감정 분석 중 오류 발생: %s", e)
+            future.set_result(("NEUTRAL", 0.5))
+        return future
+    
+    def _classify_sentiment_batch(self, texts):
+        """감정 분석 모델로 여러 텍스트를 한 번에 분류합니다."""
+        outputs = self.sentiment_analyzer(list(texts), batch_size=len(texts), truncation=True)
+        return [(output['label'], output['score']) for output in outputs]
+    
+    def get_sentiment_batcher(self):
+        """동시에 들어온 감정 분석 요청을 모아 배치로 추론하는 마이크로 배치 처리기를 반환합니다."""
+        if self.sentiment_batcher is None:
+            from django.conf import settings
+            from .batching import MicroBatcher
+            
+            self.sentiment_batcher = MicroBatcher(
+                self._classify_sentiment_batch,
+                max_batch_size=getattr(settings, 'NLP_SENTIMENT_BATCH_SIZE', 16),
+                max_wait=getattr(settings, 'NLP_SENTIMENT_MAX_WAIT', 0.01),
+                name='sentiment-batcher',
+            )
+        return self.sentiment_batcher
     
     def get_embedding(self, text):
         """텍스트의 임베딩 벡터를 반환합니다."""
         # 캐시 확인
-        if text in self.embedding_cache:
-            return self.embedding_cache[text]
+        cached = self.embedding_cache.get(text)
+        if cached is not None:
+            return cached
             
         if not NLP_ADVANCED:
             # 간단한 임베딩 대체 (단어 빈도 기반)
@@ -198,23 +262,23 @@ class NLPProcessor:
             word_counts = Counter(words)
             # 단어 빈도를 벡터로 변환 (간단한 대체 방법)
             result = word_counts
-            self.embedding_cache[text] = result
+            self.embedding_cache.put(text, result)
             return result
         
         if not self.models_loaded:
             self.load_models()
         
         try:
-            # 짧은 텍스트도 항상 Sentence-Transformers 모델 사용
-            result = self.sentence_model.encode(text, convert_to_numpy=True)
+            # 동시에 들어온 단건 요청과 함께 배치로 임베딩
+            result = self.get_embedding_batcher().submit(text).result()
                 
             # 결과 캐싱
-            self.embedding_cache[text] = result
+            self.embedding_cache.put(text, result)
             return result
         except Exception as e:
-            print(f"임베딩 생성 중 오류 발생: {str(e)}")
+            logger.warning("임베딩 생성 중 오류 발생: %s", e)
             result = np.zeros(384)  # 기본 임베딩 차원 (MiniLM 모델)
-            self.embedding_cache[text] = result
+            self.embedding_cache.put(text, result)
             return result
     
     def calculate_similarity(self, text1, text2):
@@ -231,6 +295,7 @@ class NLPProcessor:
             embedding2 = self.get_embedding(text2)
             
             # 코사인 유사도 계산
+            from sentence_transformers import util
             similarity = util.cos_sim(embedding1, embedding2)
             
             # 짧은 쿼리에 대한 유사도 점수 향상
@@ -255,7 +320,7 @@ class NLPProcessor:
             
             return float(similarity[0][0])  # 텐서에서 스칼라 값으로 변환
         except Exception as e:
-            print(f"유사도 계산 중 오류 발생: {str(e)}")
+            logger.warning("유사도 계산 중 오류 발생: %s", e)
             # 기본 유사도 계산으로 폴백
             return self.calculate_similarity_fallback(text1, text2)
     
@@ -285,13 +350,14 @@ class NLPProcessor:
     def preprocess_text(self, text):
         """텍스트 전처리: 토큰화, 불용어 제거 등"""
         try:
-            if NLTK_AVAILABLE:
+            word_tokenize = self.word_tokenize
+            if word_tokenize is not None:
                 # NLTK 사용 시 오류 처리 강화
                 try:
                     tokens = word_tokenize(text.lower())
                     tokens = [t for t in tokens if t not in self.stop_words and t.isalpha()]
                 except Exception as e:
-                    print(f"NLTK 토큰화 중 오류 발생: {str(e)}, 기본 토큰화로 대체합니다.")
+                    logger.warning("NLTK 토큰화 중 오류 발생: %s, 기본 토큰화로 대체합니다.", e)
                     # 기본 토큰화로 폴백
                     text = re.sub(r'[^\w\s]', '', text.lower())
                     tokens = [t for t in text.split() if t not in self.stop_words]
@@ -302,341 +368,827 @@ class NLPProcessor:
             
             return tokens
         except Exception as e:
-            print(f"텍스트 전처리 중 오류 발생: {str(e)}")
+            logger.warning("텍스트 전처리 중 오류 발생: %s", e)
             # 가장 기본적인 방법으로 폴백
             return text.lower().split()
     
-    def search_destinations(self, query, destinations, top_n=10):
+    def encode_texts(self, texts):
+        """여행지 텍스트 목록을 (N, d) float32 행렬로 임베딩합니다. (인덱스 구축용, 캐시 미사용)"""
+        return self.encode_many(texts, use_cache=False)
+    
+    def _encode_batches(self, texts):
+        """
+        텍스트를 길이순으로 정렬하여 패딩이 최소화되도록 배치를 나눠 임베딩합니다.
+        
+        배치 크기는 NLP_ENCODE_BATCH_SIZE 이하이면서, (배치 크기 × 배치 내 최대 길이)가
+        NLP_ENCODE_MAX_BATCH_CHARS를 넘지 않도록 조정됩니다.
+        
+        Returns:
+            (입력 순서와 정렬된 (N, d) float32 행렬, 배치 수)
+        """
+        from django.conf import settings
+        
+        max_batch_size = getattr(settings, 'NLP_ENCODE_BATCH_SIZE', 64)
+        max_batch_chars = getattr(settings, 'NLP_ENCODE_MAX_BATCH_CHARS', 32768)
+        # 모델 최대 길이를 넘는 부분은 잘리므로 비용 계산에서도 제한
+        max_text_chars = getattr(settings, 'NLP_ENCODE_MAX_TEXT_CHARS', 1024)
+        
+        result = None
+        num_batches = 0
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        
+        def flush(batch):
+            nonlocal result, num_batches
+            vectors = self.sentence_model.encode(
+                [texts[i] for i in batch], batch_size=len(batch),
+                convert_to_numpy=True, show_progress_bar=False
+            )
+            if result is None:
+                result = np.zeros((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[batch] = vectors
+            num_batches += 1
+        
+        batch = []
+        batch_max = 0
+        for i in order:
+            cost = min(len(texts[i]), max_text_chars) or 1
+            new_max = max(batch_max, cost)
+            if batch and (len(batch) + 1 > max_batch_size or (len(batch) + 1) * new_max > max_batch_chars):
+                flush(batch)
+                batch, new_max = [], cost
+            batch.append(i)
+            batch_max = new_max
+        if batch:
+            flush(batch)
+        
+        if result is None:
+            result = np.zeros((0, 384), dtype=np.float32)
+        return result, num_batches
+    
+    def encode_many(self, texts, use_cache=True):
+        """
+        여러 텍스트를 한 번에 임베딩합니다.
+        
+        캐시에 없는 텍스트만 모아 중복을 제거한 뒤 길이순 배치로 임베딩하고,
+        처리량(texts/sec)을 last_encode_stats에 기록합니다.
+        
+        Args:
+            texts: 임베딩할 텍스트 목록
+            use_cache: 임베딩 캐시 조회/저장 여부
+            
+        Returns:
+            np.ndarray: 입력 순서와 정렬된 (N, d) float32 행렬
+        """
+        if not self.models_loaded:
+            self.load_models()
+        
+        start_time = time.time()
+        cached = {}
+        if use_cache:
+            for text in dict.fromkeys(texts):
+                vector = self.embedding_cache.get(text)
+                if vector is not None:
+                    cached[text] = vector
+        misses = list(dict.fromkeys(text for text in texts if text not in cached))
+        
+        vectors, num_batches = self._encode_batches(misses) if misses else (None, 0)
+        
+        elapsed = time.time() - start_time
+        self.last_encode_stats = {
+            'texts': len(misses),
+            'batches': num_batches,
+            'seconds': round(elapsed, 3),
+            'texts_per_sec': round(len(misses) / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        if len(misses) > 1:
+            search_log.info("임베딩 생성: %d개 텍스트, %d개 배치, %s texts/sec",
+                            len(misses), num_batches, self.last_encode_stats['texts_per_sec'])
+        
+        if vectors is not None:
+            miss_rows = {text: row for row, text in enumerate(misses)}
+            if use_cache:
+                for text, row in miss_rows.items():
+                    # 배치 행렬의 뷰 대신 복사본을 저장하여 배치 전체가 메모리에 남지 않도록 함
+                    self.embedding_cache.put(text, vectors[row].copy())
+        
+        if not texts:
+            return np.zeros((0, vectors.shape[1] if vectors is not None else 384), dtype=np.float32)
+        
+        dimension = vectors.shape[1] if vectors is not None else len(next(iter(cached.values())))
+        result = np.empty((len(texts), dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            result[i] = cached[text] if text in cached else vectors[miss_rows[text]]
+        return result
+    
+    def get_embedding_batcher(self):
+        """단건 임베딩 요청을 모아 배치로 처리하는 마이크로 배치 처리기를 반환합니다."""
+        if self.embedding_batcher is None:
+            from django.conf import settings
+            from .batching import MicroBatcher
+            
+            self.embedding_batcher = MicroBatcher(
+                lambda batch: list(self._encode_batches(batch)[0]),
+                max_batch_size=getattr(settings, 'NLP_ENCODE_BATCH_SIZE', 64),
+                max_wait=getattr(settings, 'NLP_ENCODE_MAX_WAIT', 0.005),
+                name='embedding-batcher',
+            )
+        return self.embedding_batcher
+    
+    def cache_stats(self):
+        """검색/임베딩/감정 분석 캐시 통계를 반환합니다."""
+        stats = {
+            cache.name: cache.stats()
+            for cache in (search_cache, self.embedding_cache, self.sentiment_cache)
+        }
+        stats['query_keys'] = self.query_key_stats.stats()
+        return stats
+    
+    def get_embedding_store(self):
+        """
+        여행지 임베딩 영속 저장소를 반환합니다. (NLP_EMBEDDING_STORE_DIR 미설정 시 None)
+        """
+        from django.conf import settings
+        
+        directory = getattr(settings, 'NLP_EMBEDDING_STORE_DIR', None)
+        if not directory:
+            return None
+        
+        if self.embedding_store is None:
+            from .vector_store import EmbeddingStore
+            self.embedding_store = EmbeddingStore(directory, model_name=self.sentence_model_name)
+        return self.embedding_store
+    
+    def search_engine(self):
+        """설정된 검색 엔진 이름 ('matrix', 'hybrid', 'legacy')"""
+        from django.conf import settings
+        return getattr(settings, 'NLP_SEARCH_ENGINE', 'matrix')
+    
+    def use_matrix_search(self):
+        """임베딩 행렬 기반 검색 엔진 사용 여부"""
+        return NLP_ADVANCED and self.search_engine() == 'matrix'
+    
+    def use_hybrid_search(self):
+        """키워드(BM25) + 임베딩 결합 검색 엔진 사용 여부"""
+        return NLP_ADVANCED and self.search_engine() == 'hybrid'
+    
+    def _is_full_catalog(self, destinations):
+        """검색 대상이 필터 없는 전체 여행지 QuerySet인지 확인합니다."""
+        from django.db.models import QuerySet
+        from .models import Location
+        
+        return (
+            isinstance(destinations, QuerySet)
+            and destinations.model is Location
+            and not destinations.query.where
+            and not destinations.query.is_sliced
+        )
+    
+    def _destination_ids(self, destinations):
+        """
+        검색 대상 여행지의 ID 배열을 반환합니다.
+        전체 여행지(필터 없는 QuerySet)인 경우 None을 반환하여 전체 카탈로그를 사용합니다.
+        """
+        from django.db.models import QuerySet
+        
+        if self._is_full_catalog(destinations):
+            return None
+        if isinstance(destinations, QuerySet):
+            location_ids = destinations.values_list('id', flat=True)
+        else:
+            location_ids = [dest.id for dest in destinations]
+        
+        return np.fromiter(location_ids, dtype=np.int64)
+    
+    def _destination_rows(self, index, destinations):
+        """검색 대상 여행지를 인덱스 행 번호로 변환합니다. (전체 여행지인 경우 None)"""
+        location_ids = self._destination_ids(destinations)
+        if location_ids is None:
+            return None
+        return index.rows_for_ids(np.sort(location_ids))
+    
+    def keyword_candidate_ids(self, query_words, min_candidates=KEYWORD_MIN_CANDIDATES):
+        """
+        역색인으로 쿼리 단어를 포함하는 여행지 ID를 찾습니다.
+        후보가 min_candidates개 미만이면 None을 반환하여 전체 목록을 사용하게 합니다.
+        """
+        from .inverted_index import keyword_index
+        
+        if not query_words:
+            return None
+        
+        candidate_ids = keyword_index.get().candidates(query_words)
+        if len(candidate_ids) < min_candidates:
+            return None
+        return candidate_ids
+    
+    def _keyword_candidate_rows(self, index, query_words, allowed_rows):
+        """키워드 후보를 인덱스 행 번호로 변환하고 검색 대상과 교집합을 구합니다."""
+        with span('prefilter'):
+            candidate_ids = self.keyword_candidate_ids(query_words)
+            if candidate_ids is None:
+                return allowed_rows
+            
+            rows = index.rows_for_ids(candidate_ids)
+            if allowed_rows is not None:
+                rows = np.intersect1d(rows, allowed_rows)
+                if len(rows) < KEYWORD_MIN_CANDIDATES:
+                    return allowed_rows
+            return rows
+    
+    def _rank_destinations_matrix(self, query, destinations, top_n, exclude_ids=None):
+        """
+        임베딩 행렬과 행렬-벡터 곱 한 번으로 여행지 순위를 계산합니다.
+        키워드 후보가 top_n개보다 적으면 나머지 여행지의 상위 결과로 뒤를 채웁니다.
+        exclude_ids의 여행지는 상위 k개 선택 단계에서 마스크로 제외합니다.
+        """
+        from .search_index import destination_index
+        
+        index = destination_index.get(self.encode_texts, store=self.get_embedding_store())
+        
+        with span('sentiment'):
+            sentiment, _ = self.analyze_sentiment(query)
+        with span('embed'):
+            query_vector = self.get_embedding(query)
+        allowed_rows = self._destination_rows(index, destinations)
+        return self._rank_matrix_query(
+            index, query, query_vector, sentiment, allowed_rows, top_n, excluded=index.exclusion_mask(exclude_ids)
+        )
+    
+    def _rank_matrix_query(self, index, query, query_vector, sentiment, allowed_rows, top_n, similarities=None,
+                           excluded=None):
+        """
+        쿼리 하나의 순위 [(위치 ID, 점수)]를 계산합니다.
+        similarities를 지정하면 배치 검색에서 미리 계산한 유사도 열을 사용합니다.
+        excluded를 지정하면 해당 행(불리언 마스크)을 제외한 상위 top_n개를 선택합니다.
+        """
+        query_words = set(self.preprocess_text(query))
+        short_query = len(query.split()) < 3
+        candidate_rows = self._keyword_candidate_rows(index, query_words, allowed_rows)
+        
+        rows, top_scores = index.search(
+            query_vector, query_words, sentiment, short_query, top_n,
+            allowed_rows=candidate_rows, similarities=similarities, excluded=excluded
+        )
+        
+        if candidate_rows is not allowed_rows and len(rows) < top_n:
+            # 키워드 후보 뒤에 나머지 여행지를 이어 붙여, 깊은 페이지도 결과가 끊기지 않도록 함
+            remaining_rows = np.arange(len(index)) if allowed_rows is None else allowed_rows
+            remaining_rows = np.setdiff1d(remaining_rows, candidate_rows, assume_unique=True)
+            if len(remaining_rows):
+                extra_rows, extra_scores = index.search(
+                    query_vector, query_words, sentiment, short_query, top_n - len(rows),
+                    allowed_rows=remaining_rows, similarities=similarities, excluded=excluded
+                )
+                rows = np.concatenate([rows, extra_rows])
+                top_scores = np.concatenate([top_scores, extra_scores])
+        
+        return list(zip(index.ids[rows].tolist(), np.asarray(top_scores, dtype=np.float64).tolist()))
+    
+    def _rank_destinations_matrix_batch(self, queries, destinations, top_n):
+        """
+        여러 쿼리의 순위를 한 번에 계산합니다.
+        쿼리 임베딩은 한 번의 배치로, 유사도는 여행지 행렬과의 행렬-행렬 곱 한 번으로 계산합니다.
+        """
+        from .search_index import destination_index
+        
+        index = destination_index.get(self.encode_texts, store=self.get_embedding_store())
+        
+        # 감정 분석을 모두 먼저 제출해 배치 워커가 한 번에 추론하도록 함
+        sentiment_futures = [self.analyze_sentiment_async(query) for query in queries]
+        with span('embed'):
+            query_vectors = self.encode_many(queries)
+        with span('score'):
+            similarities = index.similarity_batch(query_vectors)
+        allowed_rows = self._destination_rows(index, destinations)
+        
+        rankings = []
+        for i, (query, future) in enumerate(zip(queries, sentiment_futures)):
+            sentiment, _ = future.result()
+            rankings.append(self._rank_matrix_query(
+                index, query, query_vectors[i], sentiment, allowed_rows, top_n, similarities=similarities[:, i]
+            ))
+        return rankings
+    
+    def rank_depth(self):
+        """검색어당 한 번 계산해 캐시하는 순위 목록의 길이 (settings.NLP_SEARCH_RANK_DEPTH)"""
+        from django.conf import settings
+        return getattr(settings, 'NLP_SEARCH_RANK_DEPTH', 1000)
+    
+    def canonical_query(self, query, record=False):
+        """
+        검색어를 표준형으로 변환합니다. (검색 결과/쿼리 임베딩/감정 분석 캐시 키로 사용)
+        
+        토큰 정렬은 settings.NLP_QUERY_SORT_TOKENS를 따르며, None이면 어순이 점수에 영향을 주지 않는
+        BM25 검색(고급 NLP 비활성)에서만 정렬합니다.
+        """
+        from django.conf import settings
+        
+        sort_tokens = getattr(settings, 'NLP_QUERY_SORT_TOKENS', None)
+        if sort_tokens is None:
+            sort_tokens = not NLP_ADVANCED
+        canonical = canonicalize_query(query, self.stop_words, sort_tokens)
+        if record:
+            self.query_key_stats.record(query, canonical)
+        return canonical
+    
+    def search_cache_key(self, query):
+        """검색 결과 캐시 키 (결과 수와 무관하게 표준형 검색어당 하나)"""
+        return f"rank{self.rank_depth()}:{self.canonical_query(query)}"
+    
+    def search_destinations(self, query, destinations, top_n=10, offset=0, exclude_ids=None):
         """
         쿼리와 가장 유사한 여행지를 찾습니다.
         
+        전체 여행지 검색은 검색어당 상위 NLP_SEARCH_RANK_DEPTH개의 순위를 한 번만 계산해 캐시하고,
+        결과 수(top_n)와 시작 위치(offset)가 달라도 그 순위 목록을 잘라서 반환합니다.
+        
+        제외할 여행지(exclude_ids)가 있어도 캐시 키는 같습니다. 캐시된 순위에서 제외한 뒤 결과가 부족할 때만
+        제외 마스크를 적용한 순위를 다시 계산합니다. (이 순위는 캐시하지 않음)
+        
         Args:
             query: 검색 쿼리
             destinations: 여행지 목록 (Location 객체)
             top_n: 반환할 결과 수
+            offset: 건너뛸 결과 수 (페이지네이션)
+            exclude_ids: 결과에서 제외할 위치 ID 목록 (예: 이미 좋아요한 여행지)
             
         Returns:
             유사도 점수와 함께 정렬된 여행지 목록
         """
         try:
             start_time = time.time()
-            print(f"NLP 검색 쿼리: {query}")
+            search_log.info("NLP 검색 쿼리: %s", query)
             
-            # 캐시 키 생성 (쿼리 + 결과 수)
-            cache_key = f"{query}:{top_n}"
-            cached_results = search_cache.get(cache_key)
-            if cached_results:
-                print(f"캐시에서 결과 반환 (쿼리: {query})")
-                return cached_results
+            # 표기만 다른 검색어가 같은 캐시 항목과 같은 임베딩/감정 분석 결과를 쓰도록 표준형으로 검색
+            query = self.canonical_query(query, record=True)
+            exclude_ids = self._exclusion_ids(exclude_ids)
             
-            # 쿼리 길이에 따른 처리 방식 로깅 (간소화)
-            query_words_count = len(query.split())
-            if query_words_count < 3:
-                print(f"짧은 쿼리 감지 ({query_words_count}개 단어)")
+            with span('cache'):
+                cache_key, rank_n = self._ranking_plan(query, destinations, top_n, offset)
+                ranking = search_cache.get_ranking(cache_key) if cache_key else None
+            if ranking is not None:
+                search_log.debug("캐시에서 결과 반환 (쿼리: %s)", query)
+            elif cache_key:
+                ranking = self.rank_destinations(query, destinations, rank_n)
+                search_cache.put_ranking(cache_key, ranking)
             
-            # 쿼리 감정 분석
-            sentiment, confidence = self.analyze_sentiment(query)
-            print(f"쿼리 감정 분석 결과: {sentiment}")
+            page = None
+            if ranking is not None:
+                page = self._exclude_from_ranking(ranking, exclude_ids)[offset:offset + top_n]
+                # 제외 후 캐시된 순위 목록만으로 결과가 부족하면 제외 마스크를 적용해 다시 계산
+                if exclude_ids is not None and len(page) < top_n and len(ranking) >= rank_n:
+                    page = None
+            if page is None:
+                page = self.rank_destinations(query, destinations, offset + top_n, exclude_ids)[offset:]
             
-            # 쿼리 전처리
-            query_words = set(self.preprocess_text(query))
-            
-            # 전체 여행지 처리 (제한 없음)
-            total_destinations = len(destinations)
-            print(f"전체 {total_destinations}개 여행지 처리 시작")
+            with span('hydrate'):
+                final_results = hydrate_results(page)
+            search_log.info("검색 완료: %d개 반환 (소요 시간: %.3f초)", len(final_results), time.time() - start_time)
+            return final_results
+        except Exception:
+            logger.exception("여행지 검색 중 오류 발생")
+            # 오류 발생 시 키워드 검색으로 폴백
+            return self.keyword_search(query, destinations, top_n, offset, exclude_ids)
+    
+    def search_destinations_batch(self, queries, destinations, top_n=10, offset=0):
+        """
+        여러 검색어를 한 번에 검색합니다.
+        
+        캐시에 없는 검색어만 모아 임베딩 배치 한 번과 행렬-행렬 곱 한 번으로 순위를 계산하고,
+        모든 결과의 Location은 in_bulk 한 번으로 조회합니다.
+        
+        Args:
+            queries: 검색어 목록
+            destinations: 여행지 목록 (Location 객체)
+            top_n: 검색어별 반환할 결과 수
+            offset: 건너뛸 결과 수
             
-            # 초기 키워드 필터링으로 관련성 높은 여행지 먼저 선별
-            # 짧은 쿼리의 경우 항상 키워드 필터링 활성화
-            filtered_destinations = []
+        Returns:
+            검색어 순서와 같은 [(Location, 점수)] 목록의 목록
+        """
+        from .models import Location
+        
+        try:
+            start_time = time.time()
+            canonical_queries = [self.canonical_query(query, record=True) for query in queries]
             
-            # 데이터베이스 수준에서 초기 필터링 시도
-            if len(query_words) > 0:
-                print("키워드 기반 사전 필터링 적용")
-                for dest in destinations:
-                    dest_text = f"{dest.name} {dest.description or ''}".lower()
-                    
-                    # 도시와 국가 정보도 검색 텍스트에 포함
-                    if dest.city:
-                        dest_text += f" {dest.city}".lower()
-                    if dest.country:
-                        dest_text += f" {dest.country}".lower()
-                    
-                    # 최소 하나의 키워드가 포함된 여행지만 선택
-                    if any(word in dest_text for word in query_words):
-                        filtered_destinations.append(dest)
-                
-                # 충분한 결과가 없으면 원래 목록 사용
-                if len(filtered_destinations) < max(50, top_n * 2):  # 최소 50개 또는 요청 결과의 2배
-                    print(f"필터링 결과가 부족함 ({len(filtered_destinations)}개), 원래 목록 사용")
-                    # 전체 목록 사용
-                    filtered_destinations = destinations
-                    print(f"전체 {len(filtered_destinations)}개 여행지 처리")
+            # 캐시 조회 (같은 표준형 검색어는 한 번만 계산)
+            rankings = {}
+            misses = []
+            for query in dict.fromkeys(canonical_queries):
+                cache_key, rank_n = self._ranking_plan(query, destinations, top_n, offset)
+                ranking = search_cache.get_ranking(cache_key) if cache_key else None
+                if ranking is not None:
+                    rankings[query] = ranking
                 else:
-                    print(f"필터링으로 {len(filtered_destinations)}개 여행지 선별")
-            else:
-                # 전체 목록 사용
-                filtered_destinations = destinations
-                print(f"전체 {len(filtered_destinations)}개 여행지 처리")
+                    misses.append((query, cache_key, rank_n))
             
-            # 처리 시간 측정 시작
-            process_start_time = time.time()
+            if misses:
+                miss_queries = [query for query, _, _ in misses]
+                rank_n = misses[0][2]
+                for (query, cache_key, _), ranking in zip(misses, self.rank_destinations_batch(miss_queries, destinations, rank_n)):
+                    rankings[query] = ranking
+                    if cache_key:
+                        search_cache.put_ranking(cache_key, ranking)
             
-            results = []
-            for i, dest in enumerate(filtered_destinations):
-                # 진행 상황 로깅 (5000개마다) - 로그 빈도 감소
-                if i > 0 and i % 5000 == 0:
-                    elapsed = time.time() - process_start_time
-                    print(f"진행 상황: {i}/{len(filtered_destinations)} 처리 완료 ({elapsed:.2f}초 소요)")
-                
-                # 여행지 정보 결합
-                dest_text = f"{dest.name} {dest.description or ''}"
-                
-                # 도시와 국가 정보 추가 (가중치 증가를 위해 반복 추가)
-                if dest.city:
-                    # 도시 정보를 3번 반복하여 가중치 증가
-                    dest_text += f" {dest.city} {dest.city} {dest.city}"
-                if dest.country:
-                    # 국가 정보를 3번 반복하여 가중치 증가
-                    dest_text += f" {dest.country} {dest.country} {dest.country}"
-                
-                # subcategory와 subtype 추가 (간소화)
-                if dest.subcategories:
-                    if isinstance(dest.subcategories, list):
-                        dest_text += " " + " ".join(dest.subcategories[:5])  # 처음 5개만 사용
-                    elif isinstance(dest.subcategories, str):
-                        dest_text += " " + dest.subcategories
-                
-                if dest.subtypes:
-                    if isinstance(dest.subtypes, list):
-                        dest_text += " " + " ".join(dest.subtypes[:5])  # 처음 5개만 사용
-                    elif isinstance(dest.subtypes, str):
-                        dest_text += " " + dest.subtypes
-                
-                # 유사도 계산
-                similarity = self.calculate_similarity(query, dest_text)
-                
-                # 짧은 쿼리(3단어 미만)의 경우 추가 가중치 부여
-                if len(query.split()) < 3:
-                    # 쿼리 단어가 여행지 이름에 직접 포함된 경우 가중치 증가
-                    if any(word in dest.name.lower() for word in query_words):
-                        similarity *= 1.5  # 50% 가중치 증가
-                    
-                    # 쿼리 단어가 도시 이름에 직접 포함된 경우 가중치 크게 증가
-                    if dest.city and any(word in dest.city.lower() for word in query_words):
-                        similarity *= 2.0  # 100% 가중치 증가
-                    
-                    # 쿼리 단어가 국가 이름에 직접 포함된 경우 가중치 크게 증가
-                    if dest.country and any(word in dest.country.lower() for word in query_words):
-                        similarity *= 2.0  # 100% 가중치 증가
+            # 모든 검색어의 결과를 한 번의 쿼리로 조회
+            pages = [rankings[query][offset:offset + top_n] for query in canonical_queries]
+            with span('hydrate'):
+                locations = Location.objects.in_bulk(list({loc_id for page in pages for loc_id, _ in page}))
+                results = [
+                    [(locations[loc_id], score) for loc_id, score in page if loc_id in locations]
+                    for page in pages
+                ]
+            search_log.info("배치 검색 완료: 검색어 %d개 (계산 %d개, 소요 시간: %.3f초)",
+                            len(queries), len(misses), time.time() - start_time)
+            return results
+        except Exception:
+            logger.exception("배치 검색 중 오류 발생")
+            # 오류 발생 시 검색어별 키워드 검색으로 폴백
+            return [self.keyword_search(query, destinations, top_n, offset) for query in queries]
+    
+    def rank_destinations_batch(self, queries, destinations, top_n):
+        """여러 검색어의 순위 [(위치 ID, 점수)] 목록을 계산합니다. (임베딩 행렬 검색은 한 번의 패스로 처리)"""
+        if self.use_matrix_search():
+            return self._rank_destinations_matrix_batch(queries, destinations, top_n)
+        return [self.rank_destinations(query, destinations, top_n) for query in queries]
+    
+    def _exclusion_ids(self, exclude_ids):
+        """제외할 위치 ID 목록을 정렬된 ID 배열로 변환합니다. (없으면 None)"""
+        if exclude_ids is None:
+            return None
+        exclude_ids = np.unique(np.fromiter(exclude_ids, dtype=np.int64))
+        return exclude_ids if len(exclude_ids) else None
+    
+    @staticmethod
+    def _exclude_from_ranking(ranking, exclude_ids):
+        """순위 목록 [(위치 ID, 점수)]에서 제외할 여행지를 뺍니다."""
+        if exclude_ids is None or not ranking:
+            return ranking
+        ranked_ids = np.fromiter((loc_id for loc_id, _ in ranking), dtype=np.int64, count=len(ranking))
+        keep = np.flatnonzero(~np.isin(ranked_ids, exclude_ids, assume_unique=True))
+        return [ranking[i] for i in keep.tolist()]
+    
+    def _ranking_plan(self, query, destinations, top_n, offset):
+        """
+        (캐시 키, 계산할 순위 길이)를 반환합니다.
+        캐시 결과는 전체 여행지 기준이므로 일부 여행지 검색이나 순위 목록 밖의 페이지는 캐시하지 않습니다. (키 None)
+        """
+        rank_depth = self.rank_depth()
+        if self._is_full_catalog(destinations) and offset + top_n <= rank_depth:
+            return f"rank{rank_depth}:{query}", rank_depth
+        return None, offset + top_n
+    
+    def stream_search(self, query, destinations, top_n=10, offset=0):
+        """
+        검색 결과를 단계별로 내보내는 제너레이터 (스트리밍 응답용)
+        
+        1. 'keyword': BM25 키워드 검색 결과 (모델 로딩/임베딩 전에 바로 계산 가능)
+        2. 'dense': 임베딩 점수를 카탈로그 분할(NLP_STREAM_PARTITIONS) 단위로 계산하며 갱신한 중간 순위
+        3. 'final': search_destinations와 같은 최종 순위 (캐시에 저장)
+        캐시에 순위가 있으면 'final'만 내보냅니다.
+        
+        Yields:
+            (단계 이름, [(Location, 점수)])
+        """
+        query = self.canonical_query(query, record=True)
+        reset_timings()
+        try:
+            cache_key, rank_n = self._ranking_plan(query, destinations, top_n, offset)
+            ranking = search_cache.get_ranking(cache_key) if cache_key else None
+            if ranking is None:
+                if NLP_ADVANCED:
+                    keyword_ranking = self._rank_keyword(query, destinations, offset + top_n)
+                    yield 'keyword', hydrate_results(keyword_ranking[offset:offset + top_n])
                     
-                    # 쿼리 단어가 여행지 설명에 포함된 경우 가중치 약간 증가
-                    elif any(word in dest_text.lower() for word in query_words):
-                        similarity *= 1.3  # 30% 가중치 증가
-                
-                # 감정 기반 가중치 적용
-                if sentiment == "POSITIVE":
-                    # 긍정적인 쿼리는 "Fun & Games", "Entertainment" 등의 카테고리에 가중치 부여
-                    positive_categories = ["Fun & Games", "Entertainment", "Spas & Wellness", "Food & Drink"]
-                    for cat in positive_categories:
-                        if cat in dest_text:
-                            similarity *= 1.2  # 20% 가중치 증가
-                elif sentiment == "NEGATIVE":
-                    # 부정적인 쿼리는 "Nature & Parks", "Museums" 등 조용한 카테고리에 가중치 부여
-                    negative_categories = ["Nature & Parks", "Museums", "Sights & Landmarks"]
-                    for cat in negative_categories:
-                        if cat in dest_text:
-                            similarity *= 1.2  # 20% 가중치 증가
-                
-                # 쿼리 키워드가 제목에 직접 포함된 경우 가중치 부여
-                if any(word in dest.name.lower() for word in query_words):
-                    similarity *= 1.5  # 50% 가중치 증가
+                    if self.use_matrix_search():
+                        for partial in self._iter_dense_partitions(query, destinations, offset + top_n):
+                            yield 'dense', hydrate_results(partial[offset:offset + top_n])
                 
-                results.append((dest, similarity))
+                ranking = self.rank_destinations(query, destinations, rank_n)
+                if cache_key:
+                    search_cache.put_ranking(cache_key, ranking)
             
-            # 유사도 기준으로 정렬
-            results.sort(key=lambda x: x[1], reverse=True)
-            
-            # 처리 시간 측정 종료
-            process_end_time = time.time()
-            process_duration = process_end_time - process_start_time
-            
-            print(f"검색 완료: 전체 {len(results)}개 결과 중 상위 {top_n}개 반환")
-            print(f"처리 시간: 총 {time.time() - start_time:.2f}초 (데이터 처리: {process_duration:.2f}초)")
-            
-            # 상위 5개 결과 로깅 (간소화)
-            top_results = [dest.name for dest, _ in results[:5]]
-            print(f"상위 검색 결과: {', '.join(top_results)}")
-            
-            # 짧은 쿼리의 경우 유사도 점수가 0.03 이상인 결과만 반환 (기준 낮춤: 0.05 -> 0.03)
-            if len(query.split()) < 3:
-                filtered_results = [(dest, sim) for dest, sim in results if sim >= 0.03]
-                # 결과가 너무 적으면 원래 결과 사용
-                if len(filtered_results) < top_n:
-                    print(f"유사도 필터링 결과가 부족함 ({len(filtered_results)}개), 원래 결과 사용")
-                    final_results = results[:top_n]
-                else:
-                    print(f"유사도 필터링으로 {len(filtered_results)}개 결과 선별")
-                    final_results = filtered_results[:top_n]
-            else:
-                final_results = results[:top_n]
-            
-            # 결과 캐싱
-            search_cache.put(cache_key, final_results)
-            
-            return final_results
+            yield 'final', hydrate_results(ranking[offset:offset + top_n])
         except Exception as e:
-            print(f"여행지 검색 중 오류 발생: {str(e)}")
-            # 오류 발생 시 키워드 검색으로 폴백
-            return self.keyword_search(query, destinations, top_n)
+            logger.warning("스트리밍 검색 중 오류 발생: %s", e)
+            # 오류 발생 시 키워드 검색 결과를 최종 결과로 사용
+            yield 'final', self.keyword_search(query, destinations, top_n, offset)
     
-    def keyword_search(self, query, destinations, top_n=10):
-        """키워드 기반 간단한 검색 (폴백 메서드)"""
+    def _iter_dense_partitions(self, query, destinations, top_n):
+        """
+        임베딩 점수를 카탈로그 분할 단위로 계산하며, 분할마다 지금까지의 상위 top_n개 [(위치 ID, 점수)]를 내보냅니다.
+        키워드 후보가 충분하면 최종 순위와 같게 후보 안에서만 계산합니다.
+        """
+        from django.conf import settings
+        from .search_index import destination_index
+        
+        index = destination_index.get(self.encode_texts, store=self.get_embedding_store())
+        
+        sentiment, _ = self.analyze_sentiment(query)
+        query_words = set(self.preprocess_text(query))
+        with span('embed'):
+            query_vector = self.get_embedding(query)
+        short_query = len(query.split()) < 3
+        
+        allowed_rows = self._destination_rows(index, destinations)
+        candidate_rows = self._keyword_candidate_rows(index, query_words, allowed_rows)
+        if candidate_rows is None:
+            candidate_rows = np.arange(len(index))
+        
+        partitions = max(1, getattr(settings, 'NLP_STREAM_PARTITIONS', 4))
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for partition_rows in np.array_split(candidate_rows, partitions):
+            if not len(partition_rows):
+                continue
+            rows, scores = index.search(
+                query_vector, query_words, sentiment, short_query, top_n,
+                allowed_rows=partition_rows
+            )
+            # 지금까지의 상위 결과와 합쳐 다시 상위 top_n개 선택
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, np.asarray(scores, dtype=np.float32)])
+            order = np.argsort(-best_scores, kind='stable')[:top_n]
+            best_rows, best_scores = best_rows[order], best_scores[order]
+            yield list(zip(index.ids[best_rows].tolist(), best_scores.astype(np.float64).tolist()))
+    
+    def rank_destinations(self, query, destinations, top_n, exclude_ids=None):
+        """
+        쿼리에 대한 여행지 순위를 계산합니다.
+        exclude_ids(정렬된 위치 ID 배열)의 여행지는 상위 top_n개 선택 전에 제외합니다.
+        
+        Returns:
+            [(위치 ID, 점수)] - 점수 내림차순, 최대 top_n개
+        """
+        stage_start = time.perf_counter()
+        
+        # 고급 NLP 기능이 없으면 BM25 키워드 검색 사용
+        if not NLP_ADVANCED:
+            ranking = self._rank_keyword(query, destinations, top_n, exclude_ids)
+        
+        # 키워드 + 임베딩 후보를 순위 결합 (단계별 소요 시간은 내부에서 기록)
+        elif self.use_hybrid_search():
+            return self._rank_destinations_hybrid(query, destinations, top_n, exclude_ids)
+        
+        # 임베딩 행렬 기반 검색 (벡터화된 점수 계산 + 상위 k개 선택)
+        elif self.use_matrix_search():
+            ranking = self._rank_destinations_matrix(query, destinations, top_n, exclude_ids)
+        
+        else:
+            if exclude_ids is not None:
+                excluded = set(exclude_ids.tolist())
+                destinations = [dest for dest in destinations if dest.id not in excluded]
+            results = self._search_destinations_legacy(query, destinations, top_n)
+            ranking = [(dest.id, similarity) for dest, similarity in results]
+        
+        record('rank', time.perf_counter() - stage_start)
+        return ranking
+    
+    def _rank_destinations_hybrid(self, query, destinations, top_n, exclude_ids=None):
+        """
+        BM25 키워드 검색과 임베딩 검색에서 각각 상위 top_n개 후보를 구한 뒤,
+        settings의 결합 방식(NLP_HYBRID_FUSION: 'rrf' 또는 'weighted')과 가중치로 하나의 순위로 결합합니다.
+        
+        임베딩 점수가 근사값(압축 행렬 또는 ANN 후보)이면 결합된 상위 목록만 원본 행렬로 다시 계산해 재결합합니다.
+        결합 점수는 최대 가능 점수로 나누어 0~1 범위로 반환합니다.
+        exclude_ids의 여행지는 두 검색기의 상위 후보 선택 단계에서 제외합니다.
+        임베딩 단계가 실패하면 키워드 후보만으로 결합합니다.
+        """
+        from django.conf import settings
+        from .bm25 import bm25_index
+        from .fusion import fuse_rankings
+        from .search_index import destination_index
+        
+        mode = getattr(settings, 'NLP_HYBRID_FUSION', 'rrf')
+        weights = getattr(settings, 'NLP_HYBRID_WEIGHTS', {'lexical': 1.0, 'dense': 1.0})
+        rrf_k = getattr(settings, 'NLP_HYBRID_RRF_K', 60)
+        fusion_weights = (weights.get('lexical', 1.0), weights.get('dense', 1.0))
+        
+        allowed_ids = self._destination_ids(destinations)
+        
+        # 1. 키워드 후보
+        stage_start = time.perf_counter()
+        lexical = bm25_index.get().search(query, top_n, allowed_ids=allowed_ids, excluded_ids=exclude_ids)
+        lexical = (
+            np.fromiter((loc_id for loc_id, _ in lexical), dtype=np.int64, count=len(lexical)),
+            np.fromiter((score for _, score in lexical), dtype=np.float32, count=len(lexical)),
+        )
+        record('lexical', time.perf_counter() - stage_start)
+        
+        # 2. 임베딩 후보
+        stage_start = time.perf_counter()
+        index = None
+        dense = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
         try:
-            start_time = time.time()
-            query_lower = query.lower()
-            query_words = set(query_lower.split())
-            
-            # 전체 여행지 처리 (제한 없음)
-            total_destinations = len(destinations)
-            print(f"키워드 검색: 전체 {total_destinations}개 여행지 처리")
-            
-            # 유사 단어 사전 (검색 확장용)
-            similar_words = {
-                'clean': ['neat', 'tidy', 'spotless', 'immaculate', 'pristine'],
-                'cozy': ['comfortable', 'warm', 'snug', 'homely', 'intimate', 'pleasant'],
-                'excited': ['thrilling', 'exciting', 'fun', 'entertainment', 'thrill', 'adventure', 'joy', 'happy'],
-                'beautiful': ['pretty', 'scenic', 'gorgeous', 'lovely', 'stunning', 'attractive'],
-                'quiet': ['peaceful', 'calm', 'serene', 'tranquil', 'silent', 'relaxing'],
-                'historic': ['ancient', 'old', 'traditional', 'heritage', 'historical', 'classic'],
-                'modern': ['contemporary', 'new', 'trendy', 'stylish', 'innovative'],
-                'nature': ['natural', 'outdoor', 'green', 'park', 'garden', 'forest', 'mountain', 'lake', 'river'],
-                'food': ['restaurant', 'cuisine', 'dining', 'eat', 'culinary', 'gastronomy', 'delicious'],
-                'shopping': ['shop', 'store', 'mall', 'market', 'boutique', 'retail'],
-                'family': ['kid', 'child', 'children', 'friendly', 'fun'],
-                'luxury': ['luxurious', 'upscale', 'premium', 'elegant', 'fancy', 'high-end'],
-                'budget': ['cheap', 'affordable', 'inexpensive', 'economical', 'reasonable'],
-                'view': ['vista', 'panorama', 'overlook', 'scenery', 'landscape', 'scenic']
-            }
-            
-            # 검색어 확장 (유사 단어 포함)
-            expanded_query_words = set(query_words)
-            for word in query_words:
-                if word in similar_words:
-                    expanded_query_words.update(similar_words[word])
+            index = destination_index.get(self.encode_texts, store=self.get_embedding_store())
+            with span('embed'):
+                query_vector = index.normalize_query(self.get_embedding(query))
+            allowed_rows = None if allowed_ids is None else index.rows_for_ids(np.sort(allowed_ids))
+            rows = index.candidate_rows(query_vector, set(), top_n, allowed_rows)
+            with span('score'):
+                similarities = index.similarity(query_vector, rows)
+            dense_rows, dense_scores = index.top_k(similarities, top_n, rows, index.exclusion_mask(exclude_ids))
+            dense = (index.ids[dense_rows], dense_scores)
+        except Exception as e:
+            index = None
+            logger.warning("결합 검색의 임베딩 단계 오류, 키워드 후보만 사용합니다: %s", e)
+        record('dense', time.perf_counter() - stage_start)
+        
+        # 3. 순위 결합
+        stage_start = time.perf_counter()
+        fused_ids, fused_scores = fuse_rankings([lexical, dense], fusion_weights, mode, rrf_k)
+        fused_ids, fused_scores = fused_ids[:top_n], fused_scores[:top_n]
+        record('fusion', time.perf_counter() - stage_start)
+        
+        # 4. 결합된 상위 목록만 원본 행렬로 재계산 (임베딩 점수가 근사값인 경우)
+        if index is not None and len(fused_ids) and (index.compressed is not None or index.ann is not None):
+            stage_start = time.perf_counter()
+            shortlist_rows = index.rows_for_ids(np.sort(fused_ids))
+            exact_scores = index.similarity(query_vector, shortlist_rows, exact=True)
+            order = np.argsort(-exact_scores, kind='stable')
+            in_shortlist = np.isin(lexical[0], fused_ids)
+            fused_ids, fused_scores = fuse_rankings(
+                [(lexical[0][in_shortlist], lexical[1][in_shortlist]),
+                 (index.ids[shortlist_rows][order], exact_scores[order])],
+                fusion_weights, mode, rrf_k,
+            )
+            record('rerank', time.perf_counter() - stage_start)
+        
+        if mode == 'rrf':
+            max_score = sum(fusion_weights) / (rrf_k + 1)
+        else:
+            max_score = sum(fusion_weights)
+        if max_score > 0:
+            fused_scores = fused_scores / max_score
+        return list(zip(fused_ids.tolist(), fused_scores.astype(np.float64).tolist()))
+    
+    def _search_destinations_legacy(self, query, destinations, top_n):
+        """여행지마다 유사도를 계산하는 기존 검색 방식 (NLP_SEARCH_ENGINE = 'legacy')"""
+        start_time = time.time()
+        
+        # 쿼리 길이에 따른 처리 방식 로깅 (간소화)
+        query_words_count = len(query.split())
+        if query_words_count < 3:
+            search_log.debug("짧은 쿼리 감지 (%d개 단어)", query_words_count)
+        
+        # 쿼리 감정 분석
+        with span('sentiment'):
+            sentiment, confidence = self.analyze_sentiment(query)
+        search_log.debug("쿼리 감정 분석 결과: %s", sentiment)
+        
+        # 쿼리 전처리
+        query_words = set(self.preprocess_text(query))
+        
+        # 전체 여행지 처리 (제한 없음)
+        total_destinations = len(destinations)
+        search_log.debug("전체 %d개 여행지 처리 시작", total_destinations)
+        
+        # 초기 키워드 필터링으로 관련성 높은 여행지 먼저 선별
+        # 짧은 쿼리의 경우 항상 키워드 필터링 활성화
+        filtered_destinations = []
+        
+        # 역색인 기반 사전 필터링 (쿼리 단어를 포함하는 여행지 ID 합집합)
+        with span('prefilter'):
+            candidate_ids = self.keyword_candidate_ids(query_words)
+            if candidate_ids is not None:
+                candidate_set = set(candidate_ids.tolist())
+                filtered_destinations = [dest for dest in destinations if dest.id in candidate_set]
+                search_log.debug("필터링으로 %d개 여행지 선별", len(filtered_destinations))
             
-            print(f"검색어 확장: {query_words} → {expanded_query_words}")
+            # 충분한 결과가 없으면 원래 목록 사용
+            if len(filtered_destinations) < KEYWORD_MIN_CANDIDATES:
+                search_log.debug("필터링 결과가 부족함 (%d개), 전체 %d개 여행지 처리",
+                                 len(filtered_destinations), total_destinations)
+                filtered_destinations = destinations
+        
+        # 처리 시간 측정 시작
+        process_start_time = time.time()
+        
+        from .search_documents import search_documents
+        from .search_index import build_destination_text
+        catalog = search_documents.get()
+        
+        results = []
+        for i, dest in enumerate(filtered_destinations):
+            # 진행 상황 로깅 (5000개마다, debug 레벨)
+            if i > 0 and i % 5000 == 0:
+                search_log.debug("진행 상황: %d/%d 처리 완료 (%.2f초 소요)",
+                                 i, len(filtered_destinations), time.time() - process_start_time)
             
-            # 처리 시간 측정 시작
-            process_start_time = time.time()
+            # 미리 만들어 둔 검색 문서 사용 (문서가 아직 없는 여행지만 직접 조합)
+            document = catalog.document(dest.id)
+            if document is not None:
+                dest_text, dest_text_lower = document.embedding_text, document.text_lower
+                name_lower, city_lower, country_lower = document.name, document.city, document.country
+            else:
+                dest_text = build_destination_text(dest)
+                dest_text_lower = dest_text.lower()
+                name_lower = dest.name.lower()
+                city_lower = (dest.city or '').lower()
+                country_lower = (dest.country or '').lower()
             
-            results = []
-            raw_scores = []  # 정규화를 위한 원시 점수 저장
+            # 유사도 계산
+            similarity = self.calculate_similarity(query, dest_text)
             
-            for i, dest in enumerate(destinations):
-                # 진행 상황 로깅 (1000개마다)
-                if i > 0 and i % 1000 == 0:
-                    elapsed = time.time() - process_start_time
-                    print(f"진행 상황: {i}/{len(destinations)} 처리 완료 ({elapsed:.2f}초 소요)")
-                
-                # 여행지 정보 결합
-                dest_text = f"{dest.name} {dest.description or ''}".lower()
-                
-                # 카테고리 정보 추가
-                if dest.category:
-                    dest_text += f" {dest.category}".lower()
-                
-                # 도시와 국가 정보 추가 (가중치 증가를 위해 반복 추가)
-                city_match = False
-                country_match = False
-                
-                if dest.city:
-                    city_lower = dest.city.lower()
-                    # 도시 정보를 3번 반복하여 가중치 증가
-                    dest_text += f" {city_lower} {city_lower} {city_lower}"
-                    # 도시 일치 여부 확인
-                    city_match = any(word in city_lower for word in query_words)
-                
-                if dest.country:
-                    country_lower = dest.country.lower()
-                    # 국가 정보를 3번 반복하여 가중치 증가
-                    dest_text += f" {country_lower} {country_lower} {country_lower}"
-                    # 국가 일치 여부 확인
-                    country_match = any(word in country_lower for word in query_words)
-                
-                # 서브카테고리 정보 추가
-                if dest.subcategories:
-                    if isinstance(dest.subcategories, list):
-                        dest_text += " " + " ".join([s.lower() for s in dest.subcategories])
-                    elif isinstance(dest.subcategories, str):
-                        dest_text += " " + dest.subcategories.lower()
-                
-                # 1. 정확한 단어 매칭 (높은 점수)
-                exact_match_count = sum(1 for word in query_words if f" {word} " in f" {dest_text} ")
-                
-                # 2. 부분 문자열 매칭 (중간 점수)
-                partial_match_count = sum(1 for word in query_words if word in dest_text)
-                
-                # 3. 확장 단어 매칭 (낮은 점수)
-                expanded_match_count = sum(1 for word in expanded_query_words if word in dest_text)
-                
-                # 종합 점수 계산 (가중치 적용)
-                score = 0
-                if exact_match_count > 0:
-                    score += exact_match_count * 0.6  # 정확한 매칭에 가장 높은 가중치
-                if partial_match_count > 0:
-                    score += partial_match_count * 0.3  # 부분 매칭에 중간 가중치
-                if expanded_match_count > 0:
-                    score += expanded_match_count * 0.1  # 확장 단어 매칭에 낮은 가중치
-                
-                # 제목에 키워드가 있으면 가중치 부여
-                if any(word in dest.name.lower() for word in query_words):
-                    score *= 1.5  # 50% 가중치 증가
+            # 짧은 쿼리(3단어 미만)의 경우 추가 가중치 부여
+            if len(query.split()) < 3:
+                # 쿼리 단어가 여행지 이름에 직접 포함된 경우 가중치 증가
+                if any(word in name_lower for word in query_words):
+                    similarity *= 1.5  # 50% 가중치 증가
                 
-                # 도시 이름에 키워드가 있으면 가중치 크게 부여
-                if city_match:
-                    score *= 2.0  # 100% 가중치 증가
+                # 쿼리 단어가 도시 이름에 직접 포함된 경우 가중치 크게 증가
+                if city_lower and any(word in city_lower for word in query_words):
+                    similarity *= 2.0  # 100% 가중치 증가
                 
-                # 국가 이름에 키워드가 있으면 가중치 크게 부여
-                if country_match:
-                    score *= 2.0  # 100% 가중치 증가
+                # 쿼리 단어가 국가 이름에 직접 포함된 경우 가중치 크게 증가
+                if country_lower and any(word in country_lower for word in query_words):
+                    similarity *= 2.0  # 100% 가중치 증가
                 
-                # 점수가 있는 결과만 추가
-                if score > 0:
-                    raw_scores.append((dest, score))
+                # 쿼리 단어가 여행지 설명에 포함된 경우 가중치 약간 증가
+                elif any(word in dest_text_lower for word in query_words):
+                    similarity *= 1.3  # 30% 가중치 증가
             
-            # 점수 정규화 및 분포 개선
-            if raw_scores:
-                # 최대 점수 찾기
-                max_score = max(score for _, score in raw_scores)
-                
-                # 점수 정규화 및 분포 개선 (로그 스케일 적용)
-                for dest, score in raw_scores:
-                    # 로그 스케일 적용 (점수 분포 개선)
-                    normalized_score = 0.2 + (0.8 * (score / max_score))
-                    
-                    # 시그모이드 함수로 점수 분포 부드럽게 조정
-                    # 0.5를 중심으로 분포 (0.2 ~ 1.0 범위)
-                    adjusted_score = 0.2 + (0.8 / (1 + 2.5 * (1 - normalized_score)))
-                    
-                    results.append((dest, adjusted_score))
+            # 감정 기반 가중치 적용
+            if sentiment == "POSITIVE":
+                # 긍정적인 쿼리는 "Fun & Games", "Entertainment" 등의 카테고리에 가중치 부여
+                positive_categories = ["Fun & Games", "Entertainment", "Spas & Wellness", "Food & Drink"]
+                for cat in positive_categories:
+                    if cat in dest_text:
+                        similarity *= 1.2  # 20% 가중치 증가
+            elif sentiment == "NEGATIVE":
+                # 부정적인 쿼리는 "Nature & Parks", "Museums" 등 조용한 카테고리에 가중치 부여
+                negative_categories = ["Nature & Parks", "Museums", "Sights & Landmarks"]
+                for cat in negative_categories:
+                    if cat in dest_text:
+                        similarity *= 1.2  # 20% 가중치 증가
             
-            # 점수 기준으로 정렬
-            results.sort(key=lambda x: x[1], reverse=True)
+            # 쿼리 키워드가 제목에 직접 포함된 경우 가중치 부여
+            if any(word in name_lower for word in query_words):
+                similarity *= 1.5  # 50% 가중치 증가
             
-            # 처리 시간 측정 종료
-            process_end_time = time.time()
-            process_duration = process_end_time - process_start_time
+            results.append((dest, similarity))
+        
+        # 처리 시간 측정 종료 (유사도 계산과 가중치 적용을 한 루프에서 처리하므로 score 단계로 기록)
+        process_end_time = time.time()
+        process_duration = process_end_time - process_start_time
+        record('score', process_duration)
+        
+        # 유사도 기준으로 정렬
+        with span('sort'):
+            results.sort(key=lambda x: x[1], reverse=True)
+        
+        search_log.debug("검색 완료: 전체 %d개 결과 중 상위 %d개 반환", len(results), top_n)
+        search_log.debug("처리 시간: 총 %.2f초 (데이터 처리: %.2f초)", time.time() - start_time, process_duration)
+        
+        # 상위 5개 결과 로깅 (간소화)
+        search_log.debug("상위 검색 결과: %s", ', '.join(dest.name for dest, _ in results[:5]))
+        
+        # 짧은 쿼리의 경우 유사도 점수가 0.03 이상인 결과만 반환 (기준 낮춤: 0.05 -> 0.03)
+        if len(query.split()) < 3:
+            filtered_results = [(dest, sim) for dest, sim in results if sim >= 0.03]
+            # 결과가 너무 적으면 원래 결과 사용
+            if len(filtered_results) < top_n:
+                search_log.debug("유사도 필터링 결과가 부족함 (%d개), 원래 결과 사용", len(filtered_results))
+                final_results = results[:top_n]
+            else:
+                search_log.debug("유사도 필터링으로 %d개 결과 선별", len(filtered_results))
+                final_results = filtered_results[:top_n]
+        else:
+            final_results = results[:top_n]
+        
+        return final_results
+    
+    def _rank_keyword(self, query, destinations, top_n, exclude_ids=None):
+        """BM25 키워드 검색 순위 [(위치 ID, 점수)]"""
+        from .bm25 import bm25_index
+        with span('lexical'):
+            return bm25_index.get().search(
+                query, top_n, allowed_ids=self._destination_ids(destinations), excluded_ids=exclude_ids
+            )
+    
+    def keyword_search(self, query, destinations, top_n=10, offset=0, exclude_ids=None):
+        """키워드 기반 BM25 검색 (폴백 메서드)"""
+        try:
+            start_time = time.time()
+            ranking = self._rank_keyword(query, destinations, offset + top_n, self._exclusion_ids(exclude_ids))
             
-            print(f"키워드 검색 완료: {len(results)} 결과 찾음")
-            print(f"처리 시간: 총 {time.time() - start_time:.2f}초 (데이터 처리: {process_duration:.2f}초)")
+            # 상위 결과만 한 번의 쿼리로 조회
+            with span('hydrate'):
+                results = hydrate_results(ranking[offset:])
             
-            return results[:top_n]
-        except Exception as e:
-            print(f"키워드 검색 중 오류 발생: {str(e)}")
+            search_log.info("키워드 검색 완료: %d개 결과 (소요 시간: %.3f초)", len(results), time.time() - start_time)
+            return results
+        except Exception:
+            logger.exception("키워드 검색 중 오류 발생")
             # 최후의 폴백: 무작위 결과 반환
+            # 검색어로 순서를 고정해 페이지(offset)끼리 겹치지 않게 하고, 제외할 여행지는 뺌
             import random
-            random_results = [(dest, 0.1) for dest in random.sample(list(destinations), min(top_n, len(destinations)))]
-            return random_results
+            exclude_ids = self._exclusion_ids(exclude_ids)
+            excluded = set(exclude_ids.tolist()) if exclude_ids is not None else set()
+            candidates = [dest for dest in destinations if dest.id not in excluded]
+            random.Random(query).shuffle(candidates)
+            return [(dest, 0.1) for dest in candidates[offset:offset + top_n]]
 
 # 싱글톤 인스턴스 생성
 nlp_processor = NLPProcessor() 
\ No newline at end of file
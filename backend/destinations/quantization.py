@@ -0,0 +1,263 @@
+"""
+압축 벡터 표현 (float16 / int8 양자화 / PCA 차원 축소)
+
+정규화된 여행지 임베딩 행렬을 더 작은 표현으로 변환하고, 압축된 행렬 위에서 바로 쿼리와의 내적을 계산합니다.
+- float16: 메모리 1/2, 점수 오차 매우 작음
+- int8: 차원별 스케일로 양자화, 메모리 1/4 (스케일은 쿼리 쪽에 곱해 계산)
+- PCA: 카탈로그로 학습한 주성분으로 차원을 줄임 (float16/int8과 함께 사용 가능)
+
+압축 점수로 후보를 고른 뒤 원본(float32) 행렬로 상위 후보만 다시 계산하면 순위 손실을 거의 없앨 수 있습니다.
+
+압축의 목적은 메모리 절감입니다. 압축 행렬은 블록 단위로 float32로 풀어 점수를 계산하므로,
+float16은 float32보다 항상 느리고 int8은 메모리 대역폭이 병목인 대규모 카탈로그에서만 빨라집니다.
+(지연 시간은 `manage.py benchmark_vectors`로 float32와 비교)
+"""
+import glob
+import os
+import uuid
+
+import numpy as np
+
+# 압축 행렬을 float32로 변환하며 점수를 계산할 때 한 번에 처리하는 행 수 (변환 버퍼가 CPU 캐시에 머물 정도)
+SCORE_CHUNK_ROWS = 512
+
+# float16 → float32 비트 변환: 지수/가수를 float32 위치로 옮긴 뒤 2^(127-15)를 곱함 (비정규 수 포함 정확)
+FLOAT16_EXPONENT_SCALE = np.float32(2.0 ** 112)
+
+# 압축/투영 시 한 번에 처리하는 행 수 (임시 메모리 제한)
+BUILD_CHUNK_ROWS = 32768
+
+COMPRESSION_KINDS = ('float16', 'int8')
+
+
+def decode_float16(codes, out, sign):
+    """
+    float16 블록을 미리 할당한 uint32 버퍼(float32로 볼 수 있음)에 float32로 풉니다.
+    numpy의 float16 → float32 변환(astype)보다 빠르며 결과는 같습니다. (무한대/NaN은 없다고 가정)
+
+    Args:
+        codes: (n, d) float16 배열
+        out: (n, d) uint32 버퍼
+        sign: 부호 비트용 (n, d) uint32 작업 버퍼
+
+    Returns:
+        out을 float32로 본 배열
+    """
+    np.copyto(out, codes.view(np.uint16), casting='unsafe')
+    # float16 부호 비트를 float32 부호 위치로 이동 (곱셈 뒤에 붙임)
+    np.bitwise_and(out, np.uint32(0x8000), out=sign)
+    np.left_shift(sign, np.uint32(16), out=sign)
+    np.bitwise_and(out, np.uint32(0x7fff), out=out)
+    np.left_shift(out, np.uint32(13), out=out)
+    values = out.view(np.float32)
+    np.multiply(values, FLOAT16_EXPONENT_SCALE, out=values)
+    np.bitwise_or(out, sign, out=out)
+    return values
+
+
+class PCAProjection:
+    """
+    카탈로그 임베딩으로 학습한 PCA 투영
+
+    x·q = (x - μ)·q + μ·q ≈ P(x - μ)·Pq + μ·q 로 근사하므로,
+    행렬에는 P(x - μ)만 저장하고 쿼리마다 Pq와 상수 μ·q를 계산합니다.
+    """
+
+    def __init__(self, mean, components):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+
+    @property
+    def dimension(self):
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, matrix, dimension, sample_size=50000, seed=0):
+        """표본 행으로 평균과 상위 dimension개 주성분을 학습합니다."""
+        num_rows = matrix.shape[0]
+        rng = np.random.default_rng(seed)
+        sample_rows = np.sort(rng.choice(num_rows, size=min(sample_size, num_rows), replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+
+        mean = sample.mean(axis=0)
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        return cls(mean, vt[:min(dimension, vt.shape[0])])
+
+    def transform(self, matrix):
+        """행렬을 주성분 공간으로 투영합니다. (청크 단위)"""
+        result = np.empty((matrix.shape[0], self.dimension), dtype=np.float32)
+        for start in range(0, matrix.shape[0], BUILD_CHUNK_ROWS):
+            chunk = np.asarray(matrix[start:start + BUILD_CHUNK_ROWS], dtype=np.float32)
+            result[start:start + len(chunk)] = (chunk - self.mean) @ self.components.T
+        return result
+
+    def project_query(self, query_vector):
+        """(투영된 쿼리, 상수항 μ·q)"""
+        return self.components @ query_vector, float(self.mean @ query_vector)
+
+
+class CompressedMatrix:
+    """
+    압축된 임베딩 행렬
+
+    Args:
+        codes: 압축된 행렬 (float16 또는 int8)
+        kind: 'float16' 또는 'int8'
+        scales: int8의 차원별 스케일 (float16이면 None)
+        pca: PCAProjection (차원 축소를 사용하지 않으면 None)
+    """
+
+    def __init__(self, codes, kind, scales=None, pca=None):
+        if kind not in COMPRESSION_KINDS:
+            raise ValueError(f"지원하지 않는 압축 방식입니다: {kind}")
+        self.codes = codes
+        self.kind = kind
+        self.scales = scales
+        self.pca = pca
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self):
+        extra = self.scales.nbytes if self.scales is not None else 0
+        if self.pca is not None:
+            extra += self.pca.components.nbytes + self.pca.mean.nbytes
+        return self.codes.nbytes + extra
+
+    @property
+    def tag(self):
+        """압축 설정을 나타내는 이름 (파일 이름에 사용)"""
+        return f"{self.kind}-pca{self.pca.dimension}" if self.pca is not None else self.kind
+
+    @classmethod
+    def build(cls, matrix, kind, pca_dimension=None):
+        """
+        정규화된 (N, d) 행렬을 압축합니다.
+
+        Args:
+            matrix: 행 단위로 정규화된 float32 행렬 (메모리 맵 가능)
+            kind: 'float16' 또는 'int8'
+            pca_dimension: PCA로 줄일 차원 수 (None이면 차원 축소 없음)
+        """
+        pca = None
+        if pca_dimension and pca_dimension < matrix.shape[1] and matrix.shape[0] > 1:
+            pca = PCAProjection.fit(matrix, pca_dimension)
+            source = pca.transform(matrix)
+        else:
+            source = matrix
+
+        if kind == 'float16':
+            codes = np.empty(source.shape, dtype=np.float16)
+            for start in range(0, source.shape[0], BUILD_CHUNK_ROWS):
+                codes[start:start + BUILD_CHUNK_ROWS] = source[start:start + BUILD_CHUNK_ROWS]
+            return cls(codes, kind, pca=pca)
+
+        # 차원별 최대 절댓값을 127에 맞추는 대칭 양자화
+        max_abs = np.zeros(source.shape[1], dtype=np.float32)
+        for start in range(0, source.shape[0], BUILD_CHUNK_ROWS):
+            chunk = np.abs(np.asarray(source[start:start + BUILD_CHUNK_ROWS], dtype=np.float32))
+            np.maximum(max_abs, chunk.max(axis=0), out=max_abs)
+        scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+
+        codes = np.empty(source.shape, dtype=np.int8)
+        for start in range(0, source.shape[0], BUILD_CHUNK_ROWS):
+            chunk = np.asarray(source[start:start + BUILD_CHUNK_ROWS], dtype=np.float32)
+            codes[start:start + len(chunk)] = np.clip(np.rint(chunk / scales), -127, 127)
+        return cls(codes, kind, scales=scales, pca=pca)
+
+    def dot(self, query_vector, rows=None):
+        """
+        압축된 행렬과 정규화된 쿼리 벡터의 근사 내적(코사인 유사도)을 계산합니다.
+
+        Args:
+            query_vector: 정규화된 float32 쿼리 벡터 (원래 차원)
+            rows: 계산할 행 번호 배열 (None이면 전체)
+        """
+        offset = 0.0
+        query = query_vector
+        if self.pca is not None:
+            query, offset = self.pca.project_query(query_vector)
+        if self.scales is not None:
+            # x ≈ codes * scales 이므로 x·q ≈ codes·(scales * q)
+            query = query * self.scales
+        query = np.asarray(query, dtype=np.float32)
+
+        codes = self.codes if rows is None else self.codes[rows]
+        scores = np.empty(codes.shape[0], dtype=np.float32)
+        # 블록마다 새 배열을 만들지 않고 같은 버퍼에 풀어 행렬-벡터 곱 한 번으로 계산
+        buffer_shape = (min(SCORE_CHUNK_ROWS, codes.shape[0]), codes.shape[1])
+        buffer = np.empty(buffer_shape, dtype=np.uint32)
+        sign = np.empty(buffer_shape, dtype=np.uint32) if self.kind == 'float16' else None
+        for start in range(0, codes.shape[0], SCORE_CHUNK_ROWS):
+            chunk = codes[start:start + SCORE_CHUNK_ROWS]
+            block = buffer[:len(chunk)]
+            if self.kind == 'float16':
+                values = decode_float16(chunk, block, sign[:len(chunk)])
+            else:
+                values = block.view(np.float32)
+                np.copyto(values, chunk, casting='unsafe')
+            np.matmul(values, query, out=scores[start:start + len(chunk)])
+        if offset:
+            scores += np.float32(offset)
+        return scores
+
+    def save(self, path_prefix, generation=None):
+        """
+        압축 행렬을 저장합니다. 코드 행렬은 .npy(메모리 맵으로 열 수 있음), 나머지는 .npz에 저장합니다.
+
+        코드 파일은 저장할 때마다 새 이름으로 쓰고, 그 이름과 행 수를 담은 메타 파일을 마지막에 교체합니다.
+        읽는 쪽은 메타 파일이 가리키는 코드 파일만 열므로 새 코드와 이전 메타가 짝지어지지 않습니다.
+        """
+        directory = os.path.dirname(path_prefix)
+        os.makedirs(directory or '.', exist_ok=True)
+        # 여러 프로세스가 동시에 저장해도 파일이 겹치지 않도록 프로세스별 이름 사용
+        token = f"{os.getpid()}-{uuid.uuid4().hex}"
+        codes_name = f"{os.path.basename(path_prefix)}.codes-{token}.npy"
+        codes_path = os.path.join(directory, codes_name)
+        meta_tmp = f"{path_prefix}.meta.{token}.tmp.npz"
+        try:
+            np.save(codes_path, self.codes)
+            np.savez(
+                meta_tmp,
+                kind=np.array(self.kind),
+                scales=self.scales if self.scales is not None else np.zeros(0, dtype=np.float32),
+                pca_mean=self.pca.mean if self.pca is not None else np.zeros(0, dtype=np.float32),
+                pca_components=self.pca.components if self.pca is not None else np.zeros((0, 0), dtype=np.float32),
+                generation=np.array(generation or ''),
+                codes_file=np.array(codes_name),
+                rows=np.int64(len(self.codes)),
+            )
+            os.replace(meta_tmp, f"{path_prefix}.meta.npz")
+        except Exception:
+            for path in (codes_path, meta_tmp):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+        # 이전 코드 파일 정리 (이미 메모리 맵으로 연 프로세스는 계속 읽을 수 있음)
+        for path in glob.glob(f"{glob.escape(path_prefix)}.codes-*.npy"):
+            if os.path.basename(path) != codes_name:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @classmethod
+    def load(cls, path_prefix, generation=None):
+        """저장된 압축 행렬을 메모리 맵으로 엽니다. 세대가 다르거나 파일이 없거나 맞지 않으면 None을 반환합니다."""
+        try:
+            with np.load(f"{path_prefix}.meta.npz") as meta:
+                if generation is not None and str(meta['generation']) != generation:
+                    return None
+                kind = str(meta['kind'])
+                scales = meta['scales'] if meta['scales'].size else None
+                pca = PCAProjection(meta['pca_mean'], meta['pca_components']) if meta['pca_mean'].size else None
+                codes_name = str(meta['codes_file'])
+                rows = int(meta['rows'])
+            codes = np.load(os.path.join(os.path.dirname(path_prefix), codes_name), mmap_mode='r')
+            if len(codes) != rows:
+                return None
+            return cls(codes, kind, scales=scales, pca=pca)
+        except (OSError, KeyError, ValueError):
+            return None
@@ -0,0 +1,95 @@
+"""
+검색어 정규화
+
+표기만 다른 검색어("Paris museum", "paris  museum", "Museum Paris!")가 같은 캐시 키를 쓰도록
+검색어를 표준형으로 변환합니다.
+- 유니코드 NFKC 정규화와 대소문자 통합(casefold)
+- 구두점 제거 및 공백 정리
+- 불용어 제거 (부정어는 감정 분석에 영향을 주므로 유지)
+- 선택적으로 토큰 정렬 (어순이 점수에 영향을 주지 않는 검색 방식용)
+
+원본 검색어와 표준형의 서로 다른 키 수를 집계하여 정규화가 캐시 적중률에 주는 효과를 확인할 수 있습니다.
+"""
+import re
+import threading
+import unicodedata
+
+# 단어 문자와 아포스트로피(don't 등)를 제외한 문자는 구분자로 처리
+SEPARATOR_PATTERN = re.compile(r"[^\w']+")
+
+# 불용어 목록에 있어도 제거하지 않는 부정어 (예: "not crowded"의 감정이 바뀌지 않도록)
+NEGATION_WORDS = {'no', 'not', 'nor', 'never', 'none', 'without'}
+
+# 서로 다른 키를 집계할 최대 수 (넘으면 새 키는 세지 않음)
+MAX_TRACKED_KEYS = 100000
+
+
+def _is_negation(token):
+    return token in NEGATION_WORDS or token.endswith("n't")
+
+
+def canonicalize_query(query, stop_words=(), sort_tokens=False):
+    """
+    검색어를 표준형으로 변환합니다.
+
+    Args:
+        query: 원본 검색어
+        stop_words: 제거할 불용어 집합
+        sort_tokens: 토큰을 정렬할지 여부 (어순과 무관한 bag-of-words 검색용)
+
+    Returns:
+        str: 공백 하나로 구분된 표준형 검색어. 모든 단어가 불용어이면 불용어를 제거하지 않은 형태
+    """
+    text = unicodedata.normalize('NFKC', query or '').replace('’', "'").casefold()
+    tokens = [token.strip("'") for token in SEPARATOR_PATTERN.split(text)]
+    tokens = [token for token in tokens if token]
+
+    kept = [token for token in tokens if token not in stop_words or _is_negation(token)]
+    if not kept:
+        kept = tokens
+    if sort_tokens:
+        kept = sorted(kept)
+    return ' '.join(kept)
+
+
+class QueryKeyStats:
+    """
+    원본 검색어와 표준형 검색어의 서로 다른 키 수 집계 (프로세스 단위)
+
+    distinct_raw 대비 distinct_canonical이 작을수록 정규화로 합쳐진 캐시 항목이 많다는 뜻입니다.
+    """
+
+    def __init__(self, max_keys=MAX_TRACKED_KEYS):
+        self.max_keys = max_keys
+        self.lookups = 0
+        self._raw_keys = set()
+        self._canonical_keys = set()
+        self._lock = threading.Lock()
+
+    def record(self, raw, canonical):
+        with self._lock:
+            self.lookups += 1
+            if len(self._raw_keys) < self.max_keys:
+                self._raw_keys.add(raw)
+            if len(self._canonical_keys) < self.max_keys:
+                self._canonical_keys.add(canonical)
+
+    def reset(self):
+        with self._lock:
+            self.lookups = 0
+            self._raw_keys.clear()
+            self._canonical_keys.clear()
+
+    def stats(self):
+        with self._lock:
+            distinct_raw = len(self._raw_keys)
+            distinct_canonical = len(self._canonical_keys)
+            return {
+                'name': 'query_keys',
+                'lookups': self.lookups,
+                'distinct_raw': distinct_raw,
+                'distinct_canonical': distinct_canonical,
+                # 정규화로 줄어든 키 비율
+                'key_reduction': round(1 - distinct_canonical / distinct_raw, 4) if distinct_raw else 0.0,
+                'saturated': distinct_raw >= self.max_keys,
+            }
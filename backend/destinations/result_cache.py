@@ -0,0 +1,338 @@
+"""
+프로세스 간 공유 검색 결과 캐시
+
+검색 결과를 ORM 객체 대신 (위치 ID, 점수) 배열로 압축하여 저장소에 보관하고,
+조회 시 in_bulk 한 번으로 Location을 다시 읽어 옵니다.
+같은 노드의 여러 워커가 하나의 SQLite 파일을 공유하므로 워커 수와 관계없이 캐시 적중률이 유지되고,
+어느 워커가 요청을 처리하든 같은 결과를 돌려줍니다.
+
+캐시 키에는 카탈로그 버전이 포함되며, 여행지가 변경되면 버전이 올라가 이전 결과는 더 이상 조회되지 않습니다.
+저장소는 get/set/delete/get_version/incr_version 인터페이스를 구현하면 교체할 수 있습니다. (예: Redis)
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from .cache import BoundedCache
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION_KEY = 'catalog_version'
+
+
+def encode_results(location_ids, scores):
+    """(위치 ID, 점수) 배열을 바이트로 직렬화합니다. (int64 ID 배열 + float32 점수 배열)"""
+    return (
+        np.asarray(location_ids, dtype=np.int64).tobytes()
+        + np.asarray(scores, dtype=np.float32).tobytes()
+    )
+
+
+def decode_results(payload):
+    """encode_results로 직렬화된 바이트를 (ID 배열, 점수 배열)로 복원합니다."""
+    count = len(payload) // 12
+    location_ids = np.frombuffer(payload, dtype=np.int64, count=count)
+    scores = np.frombuffer(payload, dtype=np.float32, count=count, offset=count * 8)
+    return location_ids, scores
+
+
+class ResultCacheBackend:
+    """
+    검색 결과 캐시 저장소 인터페이스
+    값은 바이트이며, 버전은 저장소를 공유하는 모든 프로세스에서 같은 값을 보여야 합니다.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def get_version(self, name):
+        raise NotImplementedError
+
+    def incr_version(self, name):
+        raise NotImplementedError
+
+
+class LocalResultCacheBackend(ResultCacheBackend):
+    """프로세스 메모리 저장소 (단일 워커 또는 개발 환경용)"""
+
+    def __init__(self, max_entries=500, max_bytes=None, ttl=None):
+        self._cache = BoundedCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl, name='search')
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl=None):
+        # 유효 시간은 캐시 생성 시 설정한 값을 사용
+        self._cache.put(key, value)
+
+    def delete(self, key):
+        return self._cache.invalidate(key)
+
+    def clear(self):
+        self._cache.clear()
+
+    def get_version(self, name):
+        return self._versions.get(name, 0)
+
+    def incr_version(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+
+class SQLiteResultCacheBackend(ResultCacheBackend):
+    """
+    SQLite 파일 저장소 (같은 노드의 워커 간 공유)
+
+    Args:
+        path: SQLite 파일 경로
+        max_entries: 최대 항목 수. 초과 시 오래된 항목부터 제거
+        cleanup_interval: 정리 작업을 수행할 set 호출 간격
+    """
+
+    def __init__(self, path, max_entries=5000, cleanup_interval=100):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.cleanup_interval = cleanup_interval
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, created_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS entries_created_at ON entries (created_at)')
+            connection.execute('CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value, expires_at FROM entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return bytes(value)
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO entries (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)',
+            (key, sqlite3.Binary(value), now + ttl if ttl else None, now),
+        )
+        self._writes += 1
+        if self._writes % self.cleanup_interval == 0:
+            self.cleanup()
+
+    def cleanup(self):
+        """만료된 항목을 지우고, 최대 항목 수를 넘는 오래된 항목을 제거합니다."""
+        connection = self._connection()
+        connection.execute('DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))
+        if self.max_entries:
+            connection.execute(
+                'DELETE FROM entries WHERE key IN ('
+                'SELECT key FROM entries ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+    def delete(self, key):
+        cursor = self._connection().execute('DELETE FROM entries WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def clear(self):
+        self._connection().execute('DELETE FROM entries')
+
+    def get_version(self, name):
+        row = self._connection().execute('SELECT value FROM versions WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def incr_version(self, name):
+        connection = self._connection()
+        connection.execute(
+            'INSERT INTO versions (name, value) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + 1',
+            (name,),
+        )
+        return self.get_version(name)
+
+
+def hydrate_results(ranking):
+    """
+    [(위치 ID, 점수)] 목록을 in_bulk 한 번으로 [(Location, 점수)]로 변환합니다. (삭제된 여행지는 제외)
+    """
+    from .models import Location
+
+    locations = Location.objects.in_bulk([location_id for location_id, _ in ranking])
+    return [
+        (locations[location_id], score)
+        for location_id, score in ranking
+        if location_id in locations
+    ]
+
+
+class SearchResultCache:
+    """
+    검색 결과 캐시
+
+    검색 결과 [(Location, 점수)]를 (ID, 점수) 배열로 저장하고, 조회 시 in_bulk로 Location을 복원합니다.
+    저장소 오류는 검색을 중단시키지 않고 캐시 미스로 처리합니다.
+
+    Args:
+        backend: ResultCacheBackend 구현
+        ttl: 항목 유효 시간(초)
+    """
+
+    name = 'search'
+
+    def __init__(self, backend, ttl=None):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _versioned_key(self, key):
+        return f"v{self.backend.get_version(CATALOG_VERSION_KEY)}:{key}"
+
+    def get_ranking(self, key):
+        """캐시된 순위를 [(위치 ID, 점수)] 형태로 반환합니다. 없으면 None (Location을 조회하지 않음)"""
+        try:
+            payload = self.backend.get(self._versioned_key(key))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("검색 결과 캐시 조회 오류: %s", e)
+            return None
+
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        location_ids, scores = decode_results(payload)
+        return list(zip(location_ids.tolist(), scores.tolist()))
+
+    def get(self, key):
+        """캐시된 검색 결과를 [(Location, 점수)] 형태로 반환합니다. 없으면 None"""
+        ranking = self.get_ranking(key)
+        if ranking is None:
+            return None
+        # 캐시 이후 삭제된 여행지는 제외
+        return hydrate_results(ranking)
+
+    def put_ranking(self, key, ranking):
+        """순위 [(위치 ID, 점수)]를 저장합니다."""
+        try:
+            payload = encode_results(
+                [location_id for location_id, _ in ranking],
+                [score for _, score in ranking],
+            )
+            self.backend.set(self._versioned_key(key), payload, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("검색 결과 캐시 저장 오류: %s", e)
+
+    def put(self, key, results):
+        """검색 결과 [(Location, 점수)]를 저장합니다."""
+        self.put_ranking(key, [(location.id, score) for location, score in results])
+
+    def invalidate(self, key):
+        """항목을 제거합니다. 제거된 항목이 있으면 True를 반환합니다."""
+        try:
+            return bool(self.backend.delete(self._versioned_key(key)))
+        except Exception as e:
+            self.errors += 1
+            logger.warning("검색 결과 캐시 삭제 오류: %s", e)
+            return False
+
+    def bump_catalog_version(self):
+        """카탈로그 버전을 올려 이전 검색 결과를 모두 무효화합니다."""
+        try:
+            return self.backend.incr_version(CATALOG_VERSION_KEY)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("카탈로그 버전 갱신 오류: %s", e)
+            return None
+
+    def catalog_version(self):
+        """저장소를 공유하는 모든 워커에서 같은 카탈로그 버전을 반환합니다. 읽을 수 없으면 None"""
+        try:
+            return self.backend.get_version(CATALOG_VERSION_KEY)
+        except Exception:
+            return None
+
+    def stats(self):
+        """현재 프로세스의 캐시 통계를 반환합니다."""
+        lookups = self.hits + self.misses
+        version = self.catalog_version()
+        return {
+            'name': self.name,
+            'backend': type(self.backend).__name__,
+            'catalog_version': version,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'errors': self.errors,
+        }
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """프로세스 단위 검색 결과 캐시 싱글톤을 반환합니다."""
+    global _search_cache
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = search_cache_from_settings()
+    return _search_cache
+
+
+def search_cache_from_settings():
+    """
+    settings의 NLP_SEARCH_CACHE_BACKEND('sqlite' 또는 'local')에 따라 검색 결과 캐시를 생성합니다.
+    """
+    from django.conf import settings
+
+    backend_name = getattr(settings, 'NLP_SEARCH_CACHE_BACKEND', 'local')
+    max_entries = getattr(settings, 'NLP_SEARCH_CACHE_SIZE', 500)
+    ttl = getattr(settings, 'NLP_SEARCH_CACHE_TTL', 600)
+
+    if backend_name == 'sqlite':
+        backend = SQLiteResultCacheBackend(settings.NLP_SEARCH_CACHE_PATH, max_entries=max_entries)
+    else:
+        backend = LocalResultCacheBackend(
+            max_entries=max_entries,
+            max_bytes=getattr(settings, 'NLP_SEARCH_CACHE_MAX_BYTES', None),
+            ttl=ttl,
+        )
+    return SearchResultCache(backend, ttl=ttl)
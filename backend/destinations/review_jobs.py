@@ -0,0 +1,176 @@
+"""
+리뷰 분석 작업 큐 (DB 기반)
+
+리뷰가 저장되면 (리뷰 ID, 내용 해시) 작업 행을 넣고, process_review_jobs 워커 프로세스가
+작업을 묶음으로 가져와 감정 분석/키워드 추출 결과를 bulk_update로 기록합니다.
+외부 브로커 없이 DB 테이블만 사용하므로 단일 서버에서도 재시작 후 작업이 유실되지 않습니다.
+"""
+import logging
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from .models import Review, ReviewAnalysisJob
+from .nlp_utils import nlp_processor
+from .review_utils import extract_keywords, review_content_hash
+
+logger = logging.getLogger(__name__)
+
+
+def make_worker_id():
+    """워커 식별자 (호스트:프로세스:임의값)"""
+    return f"{socket.gethostname()[:32]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def enqueue_review_analysis(review):
+    """리뷰 분석 작업을 대기열에 넣습니다. 리뷰당 작업은 하나이며, 이미 있으면 새 내용으로 갱신합니다."""
+    ReviewAnalysisJob.objects.update_or_create(
+        review=review,
+        defaults={
+            'content_hash': review_content_hash(review.content),
+            'status': ReviewAnalysisJob.STATUS_PENDING,
+            'attempts': 0,
+            'error': None,
+            'enqueued_at': timezone.now(),
+            'locked_by': None,
+            'locked_at': None,
+            'finished_at': None,
+        },
+    )
+
+
+def enqueue_missing_analyses():
+    """분석 결과가 현재 내용과 맞지 않는(또는 없는) 리뷰를 모두 대기열에 넣습니다. 넣은 수를 반환합니다."""
+    count = 0
+    reviews = Review.objects.only('id', 'content', 'analysis_hash').iterator(chunk_size=1000)
+    for review in reviews:
+        if review.content and review.analysis_hash != review_content_hash(review.content):
+            enqueue_review_analysis(review)
+            count += 1
+    return count
+
+
+def _claimable(lease_seconds):
+    """가져갈 수 있는 작업: 대기 중이거나, 임대 시간이 지난(워커가 종료된) 처리 중 작업"""
+    expired = timezone.now() - timedelta(seconds=lease_seconds)
+    return Q(status=ReviewAnalysisJob.STATUS_PENDING) | Q(
+        status=ReviewAnalysisJob.STATUS_RUNNING, locked_at__lt=expired
+    )
+
+
+def claim_jobs(worker_id, batch_size=32, lease_seconds=300):
+    """
+    오래 기다린 순서로 작업을 최대 batch_size개 가져와 처리 중으로 표시합니다.
+    다른 워커가 먼저 가져간 작업은 조건부 UPDATE로 걸러집니다.
+    """
+    claimable = _claimable(lease_seconds)
+    candidate_ids = list(
+        ReviewAnalysisJob.objects.filter(claimable)
+        .order_by('enqueued_at')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not candidate_ids:
+        return []
+
+    now = timezone.now()
+    ReviewAnalysisJob.objects.filter(claimable, id__in=candidate_ids).update(
+        status=ReviewAnalysisJob.STATUS_RUNNING,
+        locked_by=worker_id,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(
+        ReviewAnalysisJob.objects.filter(id__in=candidate_ids, locked_by=worker_id, locked_at=now)
+        .select_related('review')
+    )
+
+
+def process_jobs(jobs, worker_id, max_attempts=3):
+    """
+    가져온 작업을 처리합니다.
+    이미 현재 내용으로 분석된 리뷰는 건너뛰고, 나머지는 감정 분석을 한 번에 제출해 배치로 추론합니다.
+
+    Returns:
+        dict: analyzed(분석), skipped(건너뜀), failed(실패) 작업 수
+    """
+    to_analyze = []
+    skipped_ids = []
+    for job in jobs:
+        review = job.review
+        if not review.content or review.analysis_hash == review_content_hash(review.content):
+            skipped_ids.append(job.id)
+        else:
+            to_analyze.append(job)
+
+    analyzed_ids = []
+    try:
+        if to_analyze:
+            # 모든 감정 분석을 먼저 제출해 배치 워커가 한 번에 추론하도록 함
+            futures = [nlp_processor.analyze_sentiment_async(job.review.content) for job in to_analyze]
+            reviews = []
+            for job, future in zip(to_analyze, futures):
+                review = job.review
+                sentiment, confidence = future.result()
+                review.sentiment = sentiment
+                review.sentiment_score = float(confidence)
+                review.keywords = extract_keywords(review.content)
+                review.analysis_hash = review_content_hash(review.content)
+                reviews.append(review)
+            Review.objects.bulk_update(
+                reviews, ['sentiment', 'sentiment_score', 'keywords', 'analysis_hash'], batch_size=500
+            )
+            analyzed_ids = [job.id for job in to_analyze]
+    except Exception as e:
+        _fail_jobs(to_analyze, worker_id, max_attempts, str(e))
+        logger.exception("리뷰 분석 작업 처리 중 오류 발생: %s", e)
+
+    # 처리 도중 내용이 바뀌어 다시 대기열에 들어간 작업(locked_by 초기화)은 완료로 표시하지 않음
+    ReviewAnalysisJob.objects.filter(
+        id__in=analyzed_ids + skipped_ids,
+        locked_by=worker_id,
+        status=ReviewAnalysisJob.STATUS_RUNNING,
+    ).update(status=ReviewAnalysisJob.STATUS_DONE, finished_at=timezone.now(), error=None)
+
+    return {
+        'analyzed': len(analyzed_ids),
+        'skipped': len(skipped_ids),
+        'failed': len(jobs) - len(analyzed_ids) - len(skipped_ids),
+    }
+
+
+def _fail_jobs(jobs, worker_id, max_attempts, error):
+    """실패한 작업을 재시도 대기 상태로 되돌리고, 시도 횟수를 넘으면 실패로 표시합니다."""
+    for job in jobs:
+        status = (
+            ReviewAnalysisJob.STATUS_FAILED if job.attempts >= max_attempts
+            else ReviewAnalysisJob.STATUS_PENDING
+        )
+        ReviewAnalysisJob.objects.filter(
+            id=job.id, locked_by=worker_id, status=ReviewAnalysisJob.STATUS_RUNNING
+        ).update(status=status, error=error[:2000], locked_by=None, locked_at=None)
+
+
+def queue_stats():
+    """
+    대기열 상태: 상태별 작업 수와 가장 오래 기다린 작업의 대기 시간(초)
+    """
+    counts = {status: 0 for status, _ in ReviewAnalysisJob.STATUS_CHOICES}
+    for row in ReviewAnalysisJob.objects.values('status').annotate(count=Count('id')).order_by():
+        counts[row['status']] = row['count']
+
+    oldest = ReviewAnalysisJob.objects.filter(
+        status=ReviewAnalysisJob.STATUS_PENDING
+    ).aggregate(oldest=Min('enqueued_at'))['oldest']
+    lag_seconds = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+
+    return {
+        'depth': counts[ReviewAnalysisJob.STATUS_PENDING],
+        'running': counts[ReviewAnalysisJob.STATUS_RUNNING],
+        'failed': counts[ReviewAnalysisJob.STATUS_FAILED],
+        'done': counts[ReviewAnalysisJob.STATUS_DONE],
+        'lag_seconds': round(lag_seconds, 3),
+    }
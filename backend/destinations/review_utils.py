@@ -1,7 +1,24 @@
+import hashlib
+import logging
 import re
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from .nlp_utils import nlp_processor
 
+logger = logging.getLogger(__name__)
+
+# 비동기로 완료된 리뷰 분석 결과를 DB에 기록하는 스레드
+_analysis_writer = None
+_analysis_writer_lock = threading.Lock()
+
+# 리뷰 분석을 작업 큐에 맡겼음을 나타내는 표시
+QUEUED = object()
+
+def review_content_hash(content):
+    """리뷰 내용의 해시 (분석 결과가 현재 내용으로 계산되었는지 확인용)"""
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
 def analyze_review(review_text):
     """
     리뷰 텍스트를 분석하여 감정과 키워드를 추출합니다.
@@ -24,6 +41,84 @@ def analyze_review(review_text):
         'keywords': keywords
     }
 
+def start_review_analysis(review):
+    """
+    리뷰의 키워드를 추출하고 감정 분석을 시작합니다.
+    
+    settings.REVIEW_ANALYSIS_MODE에 따라 처리합니다.
+    - 'queue': 저장 후 분석 작업을 DB 작업 큐에 넣음 (process_review_jobs 워커가 처리)
+    - 'sync': REVIEW_ANALYSIS_TIMEOUT초까지 기다린 뒤, 끝나지 않았으면 저장 후 비동기로 채움
+    - 'async': 기다리지 않고 저장한 뒤 비동기로 채움
+    
+    Returns:
+        QUEUED, Future 또는 None: 저장 후 finish_review_analysis로 전달할 미완료 분석
+    """
+    from django.conf import settings
+    
+    mode = getattr(settings, 'REVIEW_ANALYSIS_MODE', 'queue')
+    if mode == 'queue':
+        return QUEUED
+    
+    review.keywords = extract_keywords(review.content)
+    future = nlp_processor.analyze_sentiment_async(review.content)
+    
+    timeout = getattr(settings, 'REVIEW_ANALYSIS_TIMEOUT', 2.0) if mode == 'sync' else 0
+    try:
+        sentiment, confidence = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        review.sentiment = None
+        review.sentiment_score = None
+        return future
+    
+    review.sentiment = sentiment
+    review.sentiment_score = float(confidence)
+    review.analysis_hash = review_content_hash(review.content)
+    return None
+
+def _get_analysis_writer():
+    global _analysis_writer
+    if _analysis_writer is None:
+        with _analysis_writer_lock:
+            if _analysis_writer is None:
+                _analysis_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='review-analysis-writer')
+    return _analysis_writer
+
+def _write_review_sentiment(review_id, content, future):
+    from django.db import close_old_connections
+    from .models import Review
+    
+    try:
+        sentiment, confidence = future.result()
+        # 그 사이 리뷰 내용이 수정되었으면 기록하지 않음 (새 분석이 기록함)
+        Review.objects.filter(pk=review_id, content=content).update(
+            sentiment=sentiment, sentiment_score=float(confidence),
+            analysis_hash=review_content_hash(content),
+        )
+    except Exception:
+        logger.exception("리뷰 감정 분석 결과 저장 중 오류 발생 (review_id=%s)", review_id)
+    finally:
+        close_old_connections()
+
+def finish_review_analysis(review, pending):
+    """
+    저장된 리뷰의 미완료 분석을 마무리합니다.
+    작업 큐 모드면 분석 작업을 큐에 넣고, 아니면 트랜잭션 커밋 후 감정 분석이 끝나는 대로 결과를 기록합니다.
+    """
+    from django.db import transaction
+    
+    if pending is QUEUED:
+        from .review_jobs import enqueue_review_analysis
+        enqueue_review_analysis(review)
+        return
+    
+    future = pending
+    review_id, content = review.pk, review.content
+    
+    def on_done(done_future):
+        _get_analysis_writer().submit(_write_review_sentiment, review_id, content, done_future)
+    
+    transaction.on_commit(lambda: future.add_done_callback(on_done))
+
 def extract_keywords(text, top_n=5):
     """
     텍스트에서 중요한 키워드를 추출합니다.
@@ -71,20 +166,9 @@ def find_similar_destinations(keywords, user_id, limit=10, exclude_location_ids=
     # 모든 여행지 가져오기
     all_locations = Location.objects.all()
     
-    # 사용자가 이미 좋아요한 여행지 ID 목록
-    liked_location_ids = Like.objects.filter(user_id=user_id).values_list('location_id', flat=True)
-    
-    # 제외할 여행지 ID 목록이 None이면 빈 리스트로 초기화
-    if exclude_location_ids is None:
-        exclude_location_ids = []
-    
-    # NLP 검색 수행
-    search_results = nlp_processor.search_destinations(query, all_locations, top_n=limit+len(liked_location_ids)+len(exclude_location_ids))
+    # 사용자가 이미 좋아요한 여행지와 제외할 여행지 ID 집합
+    excluded_ids = set(Like.objects.filter(user_id=user_id).values_list('location_id', flat=True))
+    excluded_ids.update(exclude_location_ids or [])
     
-    # 이미 좋아요한 여행지와 제외할 여행지 제외
-    filtered_results = []
-    for loc, similarity in search_results:
-        if loc.id not in liked_location_ids and loc.id not in exclude_location_ids:
-            filtered_results.append((loc, similarity))
-            
-    return filtered_results[:limit] 
\ No newline at end of file
+    # NLP 검색 수행 (제외할 여행지는 상위 결과 선택 단계에서 빠지고, 캐시 키는 제외 목록과 무관)
+    return nlp_processor.search_destinations(query, all_locations, top_n=limit, exclude_ids=excluded_ids)
\ No newline at end of file
@@ -0,0 +1,450 @@
+"""
+검색/추천 성능 벤치마크
+
+ds/*.csv(TripAdvisor 데이터)를 임시 SQLite DB에 적재하고, 고정된 검색어 목록과 합성 사용자로
+search_destinations / keyword_search / recommend_destinations를 반복 실행하여
+시나리오별 지연 시간 백분위수(p50/p95/p99), 처리량, 최대 RSS, DB 쿼리 수를 측정합니다.
+
+커밋 사이의 결과를 비교할 수 있도록 검색어와 합성 사용자는 시드로 고정되며, 결과는 JSON으로 출력합니다.
+관리 명령(`python manage.py benchmark_search`)이 이 모듈을 사용합니다.
+"""
+import csv
+import glob
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# 고정 검색어 목록 (짧은/긴 검색어, 긍정/부정 표현, 도시/국가 이름, 표기만 다른 중복 포함)
+QUERY_CORPUS = (
+    'museum',
+    'beach',
+    'paris',
+    'tokyo temple',
+    'hiking trail',
+    'Paris museum',
+    'paris  MUSEUM!',
+    'quiet park in the city',
+    'fun things to do with kids',
+    'romantic dinner with a view',
+    'best street food market',
+    'historic castle tour',
+    'not crowded beach',
+    'boring tourist trap',
+    'amazing waterfall hike',
+    'art gallery modern',
+    'night market seoul',
+    'wine tasting vineyard',
+    'spa and wellness retreat',
+    'scuba diving coral reef',
+    'famous landmark sunset view',
+    'local cooking class',
+    'shopping mall downtown',
+    'zoo aquarium family',
+    'mountain cable car',
+    'old town walking tour',
+    'theme park roller coaster',
+    'botanical garden flowers',
+    'live music jazz bar',
+    'ancient ruins archaeology',
+)
+
+# 합성 사용자 유형: (좋아요 수, 리뷰 수, 회원가입 선택 태그 사용 여부, 최근 본 여행지 수)
+USER_PROFILES = {
+    'new_with_tags': (0, 0, True, 0),
+    'light': (3, 0, False, 0),
+    'moderate': (8, 4, False, 0),
+    'heavy': (30, 15, False, 0),
+    'recently_viewed': (3, 1, False, 5),
+}
+
+# CSV 열 → Location 필드
+CSV_FIELDS = {
+    'name': 'name',
+    'description': 'description',
+    'category': 'category',
+    'type': 'type',
+    'address': 'address',
+    'addressObj/city': 'city',
+    'addressObj/state': 'state',
+    'addressObj/country': 'country',
+    'addressObj/postalcode': 'postal_code',
+    'addressObj/street1': 'street1',
+    'addressObj/street2': 'street2',
+    'localAddress': 'local_address',
+    'localName': 'local_name',
+    'locationString': 'location_string',
+    'image': 'image',
+    'website': 'website',
+    'email': 'email',
+}
+
+BENCHMARK_USER_PREFIX = 'bench_'
+
+
+def _float_or_none(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except ValueError:
+        return None
+
+
+def read_catalog(csv_dir):
+    """
+    CSV 파일들에서 Location 객체 목록을 만듭니다. (같은 ID는 마지막 파일의 행 사용)
+
+    Returns:
+        (Location 목록, 읽은 파일 수)
+    """
+    from .models import Location
+
+    paths = sorted(glob.glob(os.path.join(csv_dir, '*.csv')))
+    locations = {}
+    for path in paths:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            subcategory_columns = [c for c in reader.fieldnames if c.startswith('subcategories/')]
+            subtype_columns = [c for c in reader.fieldnames if c.startswith('subtype/')]
+            for row in reader:
+                try:
+                    location_id = int(float(row.get('id') or ''))
+                except ValueError:
+                    continue
+                if not row.get('name'):
+                    continue
+                fields = {field: (row.get(column) or None) for column, field in CSV_FIELDS.items()}
+                locations[location_id] = Location(
+                    id=location_id,
+                    latitude=_float_or_none(row.get('latitude')),
+                    longitude=_float_or_none(row.get('longitude')),
+                    subcategories=[row[c] for c in subcategory_columns if row.get(c)],
+                    subtypes=[row[c] for c in subtype_columns if row.get(c)],
+                    **fields,
+                )
+    return list(locations.values()), len(paths)
+
+
+def load_catalog(csv_dir, batch_size=500):
+    """CSV 카탈로그를 현재 DB에 적재하고 검색 문서와 태그 행을 만듭니다. (기존 여행지는 삭제)"""
+    from .location_tags import rebuild_location_tags
+    from .models import Location
+    from .search_documents import rebuild_documents
+
+    locations, num_files = read_catalog(csv_dir)
+    Location.objects.all().delete()
+    Location.objects.bulk_create(locations, batch_size=batch_size)
+    rebuild_documents()
+    rebuild_location_tags()
+    return len(locations), num_files
+
+
+def create_users(users_per_profile, seed=0):
+    """
+    USER_PROFILES별 합성 사용자를 만듭니다. 좋아요/리뷰는 bulk_create로 만들어 감정 분석 작업을 만들지 않고,
+    리뷰의 감정/키워드는 시드로 정한 값을 직접 채웁니다.
+
+    Returns:
+        [(유형 이름, 사용자, 최근 본 여행지 목록)]
+    """
+    from django.contrib.auth import get_user_model
+    from .models import Like, Location, Review, SearchDocument
+
+    rng = random.Random(seed)
+    User = get_user_model()
+    User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).delete()
+
+    location_ids = list(Location.objects.order_by('id').values_list('id', flat=True))
+    tokens = dict(SearchDocument.objects.values_list('location_id', 'tokens'))
+    tag_counts = {}
+    for subcategories in Location.objects.values_list('subcategories', flat=True):
+        for tag in (subcategories or [])[:1]:
+            tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    popular_tags = sorted(tag_counts, key=tag_counts.get, reverse=True)[:10]
+
+    users = []
+    likes, reviews = [], []
+    for profile, (num_likes, num_reviews, use_tags, num_viewed) in USER_PROFILES.items():
+        for i in range(users_per_profile):
+            user = User.objects.create(
+                username=f"{BENCHMARK_USER_PREFIX}{profile}_{i}",
+                email=f"{BENCHMARK_USER_PREFIX}{profile}_{i}@example.com",
+                selected_tags=rng.sample(popular_tags, min(3, len(popular_tags))) if use_tags else None,
+            )
+            picked = rng.sample(location_ids, min(len(location_ids), num_likes + num_reviews + num_viewed))
+            liked, reviewed, viewed = (
+                picked[:num_likes],
+                picked[num_likes:num_likes + num_reviews],
+                picked[num_likes + num_reviews:],
+            )
+            likes += [Like(user=user, location_id=location_id) for location_id in liked]
+            for location_id in reviewed:
+                rating = rng.randint(1, 5)
+                words = (tokens.get(location_id) or '').split()
+                reviews.append(Review(
+                    user=user,
+                    location_id=location_id,
+                    content=' '.join(words[:20]) or 'nice place',
+                    rating=rating,
+                    sentiment='POSITIVE' if rating >= 3 else 'NEGATIVE',
+                    sentiment_score=rating / 5,
+                    keywords=words[:5],
+                ))
+            # 프런트엔드가 보내는 최근 본 여행지 형식 (여행지 요약 dict 목록)
+            viewed = list(Location.objects.filter(id__in=viewed).values(
+                'id', 'name', 'country', 'subcategories', 'subtypes'
+            ))
+            users.append((profile, user, viewed))
+
+    Like.objects.bulk_create(likes)
+    Review.objects.bulk_create(reviews)
+    return users
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def summarize(latencies, query_counts, elapsed, stages=None):
+    """시나리오 측정값을 보고서 항목으로 변환합니다."""
+    latencies_ms = np.asarray(latencies, dtype=np.float64) * 1000
+    report = {
+        'calls': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 3) if len(latencies) else None,
+        'p95_ms': round(float(np.percentile(latencies_ms, 95)), 3) if len(latencies) else None,
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 3) if len(latencies) else None,
+        'mean_ms': round(float(latencies_ms.mean()), 3) if len(latencies) else None,
+        'throughput_per_sec': round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        'db_queries_total': int(sum(query_counts)),
+        'db_queries_per_call': round(sum(query_counts) / len(query_counts), 2) if query_counts else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    if stages:
+        report['stages'] = {
+            stage: {key: values[key] for key in ('count', 'p50_ms', 'p95_ms', 'mean_ms')}
+            for stage, values in stages.items()
+        }
+    return report
+
+
+def run_scenario(calls):
+    """
+    호출 목록을 차례로 실행하며 호출별 지연 시간과 DB 쿼리 수, 단계별 소요 시간을 측정합니다.
+
+    Args:
+        calls: 인자 없는 함수 목록
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from .instrumentation import reset_timings, timing_histograms
+
+    timing_histograms.reset()
+    latencies, query_counts = [], []
+    start_time = time.perf_counter()
+    for call in calls:
+        reset_timings()
+        with CaptureQueriesContext(connection) as queries:
+            call_start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - call_start)
+        query_counts.append(len(queries))
+    elapsed = time.perf_counter() - start_time
+    return summarize(latencies, query_counts, elapsed, timing_histograms.stats())
+
+
+def _recommend_call(profile_user, viewed):
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from .views import recommend_destinations
+
+    factory = APIRequestFactory()
+
+    def call():
+        request = factory.post('/api/destinations/recommend/', {'recently_viewed': viewed}, format='json')
+        force_authenticate(request, user=profile_user)
+        response = recommend_destinations(request)
+        if response.status_code != 200:
+            raise RuntimeError(f"추천 API 응답 코드 {response.status_code}")
+    return call
+
+
+@contextmanager
+def nlp_mode(advanced, scratch_dir, cache_backend):
+    """
+    벤치마크 동안 NLP 모드와 검색 결과 캐시/임베딩 저장소를 임시로 바꾸고, 모든 인덱스를 다시 만들게 합니다.
+    """
+    from django.conf import settings
+    from . import nlp_utils
+    from .bm25 import bm25_index
+    from .inverted_index import keyword_index
+    from .result_cache import LocalResultCacheBackend, SearchResultCache, SQLiteResultCacheBackend
+    from .search_documents import search_documents
+    from .search_index import destination_index
+    from .tag_index import tag_index
+
+    previous = (nlp_utils.NLP_ADVANCED, nlp_utils.search_cache, settings.NLP_EMBEDDING_STORE_DIR)
+    mode_name = 'advanced' if advanced else 'fallback'
+    if cache_backend == 'sqlite':
+        backend = SQLiteResultCacheBackend(os.path.join(scratch_dir, f'search_cache_{mode_name}.sqlite3'))
+    else:
+        backend = LocalResultCacheBackend(max_entries=getattr(settings, 'NLP_SEARCH_CACHE_SIZE', 500))
+
+    nlp_utils.NLP_ADVANCED = advanced
+    nlp_utils.search_cache = SearchResultCache(backend)
+    settings.NLP_EMBEDDING_STORE_DIR = os.path.join(scratch_dir, f'embeddings_{mode_name}')
+    processor = nlp_utils.nlp_processor
+    processor.embedding_store = None
+    processor.embedding_cache.clear()
+    processor.sentiment_cache.clear()
+    for manager in (search_documents, keyword_index, bm25_index, destination_index, tag_index):
+        manager.mark_dirty()
+    try:
+        yield processor
+    finally:
+        nlp_utils.NLP_ADVANCED, nlp_utils.search_cache, settings.NLP_EMBEDDING_STORE_DIR = previous
+        processor.embedding_store = None
+
+
+def run_mode(advanced, users, scratch_dir, rounds=1, top_n=20, cache_backend='sqlite'):
+    """
+    한 NLP 모드의 시나리오를 실행합니다.
+
+    - index_build: 검색 문서 카탈로그와 검색 인덱스 구축 (첫 검색 전에 한 번)
+    - search_cold: 빈 검색 결과 캐시로 search_destinations
+    - search_warm: 같은 검색어 반복 (캐시 적중)
+    - keyword_search: BM25 키워드 검색 (폴백 경로)
+    - recommend_<유형>: 합성 사용자 유형별 recommend_destinations
+    """
+    from .bm25 import bm25_index
+    from .inverted_index import keyword_index
+    from .models import Location
+    from .search_documents import search_documents
+    from .search_index import destination_index
+
+    mode_report = {'scenarios': {}}
+    with nlp_mode(advanced, scratch_dir, cache_backend) as processor:
+        destinations = Location.objects.all()
+
+        def build_indexes():
+            search_documents.get()
+            keyword_index.get()
+            bm25_index.get()
+            if advanced and processor.search_engine() in ('matrix', 'hybrid'):
+                processor.load_models()
+                destination_index.get(processor.encode_texts, store=processor.get_embedding_store())
+
+        scenarios = mode_report['scenarios']
+        scenarios['index_build'] = run_scenario([build_indexes])
+        scenarios['search_cold'] = run_scenario([
+            (lambda query=query: processor.search_destinations(query, destinations, top_n=top_n))
+            for query in QUERY_CORPUS
+        ])
+        scenarios['search_warm'] = run_scenario([
+            (lambda query=query: processor.search_destinations(query, destinations, top_n=top_n))
+            for _ in range(rounds) for query in QUERY_CORPUS
+        ])
+        scenarios['keyword_search'] = run_scenario([
+            (lambda query=query: processor.keyword_search(query, destinations, top_n=top_n))
+            for _ in range(rounds) for query in QUERY_CORPUS
+        ])
+        for profile in USER_PROFILES:
+            scenarios[f'recommend_{profile}'] = run_scenario([
+                _recommend_call(user, viewed)
+                for _ in range(rounds) for user_profile, user, viewed in users if user_profile == profile
+            ])
+
+        # 모델을 불러오지 못해 실행 중 폴백 모드로 바뀐 경우 표시
+        from . import nlp_utils
+        mode_report['effective_advanced'] = nlp_utils.NLP_ADVANCED
+        mode_report['search_engine'] = processor.search_engine() if advanced else 'keyword'
+    return mode_report
+
+
+def git_revision(directory):
+    """현재 커밋 해시 (git이 없으면 None)"""
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+@contextmanager
+def scratch_database(path, keep=False):
+    """
+    임시 SQLite DB를 만들고 마이그레이션한 뒤 기본 연결을 그 DB로 바꿉니다. (테스트 DB 생성 기능 사용)
+    keep이면 기존 파일과 데이터를 재사용하고 끝난 뒤에도 지우지 않습니다.
+    """
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = str(path)
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False, keepdb=keep)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keep)
+
+
+def run_benchmark(csv_dir, scratch_dir, modes=('fallback', 'advanced'), rounds=1, top_n=20,
+                  users_per_profile=3, seed=0, cache_backend='sqlite', keep_db=False):
+    """
+    CSV 카탈로그를 임시 DB에 적재하고 모드별 시나리오를 실행한 보고서(dict)를 반환합니다.
+    """
+    from django.conf import settings
+    from . import nlp_utils
+    from .models import Location
+
+    os.makedirs(scratch_dir, exist_ok=True)
+    # 고급 NLP 라이브러리 설치 여부 (nlp_utils.NLP_ADVANCED와 같은 기준, 모드 전환과 무관)
+    advanced_available = all(
+        nlp_utils._module_available(name) for name in ('transformers', 'torch', 'sklearn', 'sentence_transformers')
+    )
+
+    report = {
+        'revision': git_revision(settings.BASE_DIR),
+        'python': sys.version.split()[0],
+        'rounds': rounds,
+        'top_n': top_n,
+        'seed': seed,
+        'cache_backend': cache_backend,
+        'queries': len(QUERY_CORPUS),
+        'modes': {},
+    }
+
+    previous_sample_rate = getattr(settings, 'NLP_LOG_SAMPLE_RATE', 1.0)
+    # 로그 출력이 측정값에 섞이지 않도록 샘플링 로그를 끔
+    settings.NLP_LOG_SAMPLE_RATE = 0.0
+    try:
+        with scratch_database(os.path.join(scratch_dir, 'benchmark.sqlite3'), keep=keep_db):
+            start_time = time.perf_counter()
+            if keep_db and Location.objects.exists():
+                num_locations, num_files = Location.objects.count(), None
+            else:
+                num_locations, num_files = load_catalog(csv_dir)
+            users = create_users(users_per_profile, seed=seed)
+            report['catalog'] = {
+                'locations': num_locations,
+                'csv_files': num_files,
+                'users': len(users),
+                'load_seconds': round(time.perf_counter() - start_time, 3),
+            }
+
+            for mode in modes:
+                if mode == 'advanced' and not advanced_available:
+                    report['modes'][mode] = {'skipped': '고급 NLP 라이브러리(transformers/torch/sklearn/sentence-transformers)가 없습니다.'}
+                    continue
+                report['modes'][mode] = run_mode(
+                    mode == 'advanced', users, scratch_dir, rounds=rounds, top_n=top_n, cache_backend=cache_backend
+                )
+    finally:
+        settings.NLP_LOG_SAMPLE_RATE = previous_sample_rate
+    return report
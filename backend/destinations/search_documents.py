@@ -0,0 +1,228 @@
+"""
+미리 분석된 여행지 검색 문서
+
+여행지마다 임베딩용 표준 텍스트, 소문자로 변환한 필드 문자열, 불용어를 제거한 토큰을
+SearchDocument 테이블에 저장해 두고(여행지 저장 시 갱신), 프로세스마다 한 번 읽어
+토큰 ID 배열(CSR 형식)을 포함한 메모리 카탈로그로 보관합니다.
+검색 경로와 인덱스 구축은 이 카탈로그만 사용하므로, 쿼리마다 여행지 데이터를 다시 조합하거나 토큰화하지 않습니다.
+"""
+import hashlib
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from .bm25 import field_text
+from .inverted_index import analyze, keyword_document
+from .lazy_index import LazyIndex
+from .nlp_utils import DEFAULT_STOP_WORDS
+from .search_index import build_destination_text
+
+logger = logging.getLogger(__name__)
+
+# 문서를 만들 때 DB에서 가져올 여행지 필드
+SOURCE_FIELDS = ('id', 'name', 'description', 'category', 'city', 'country', 'subcategories', 'subtypes')
+
+# 저장되는 문서 필드 (source_hash 제외)
+DOCUMENT_FIELDS = ('embedding_text', 'name', 'description', 'category', 'city', 'country', 'subcategories', 'tokens')
+
+# 메모리 카탈로그에 보관하는 소문자 필드
+LOWER_FIELDS = ('name', 'description', 'category', 'city', 'country', 'subcategories')
+
+# 검색 경로에서 여행지 하나를 조회한 결과
+CatalogDocument = namedtuple('CatalogDocument', ['embedding_text', 'text_lower', 'name', 'city', 'country'])
+
+
+def document_tokens(location):
+    """이름/설명/도시/국가 토큰에서 불용어를 제거하고 중복을 없앤 목록 (처음 등장한 순서 유지)"""
+    tokens = analyze(keyword_document(location.name, location.description, location.city, location.country))
+    return [token for token in dict.fromkeys(tokens) if token not in DEFAULT_STOP_WORDS]
+
+
+def document_fields(location):
+    """
+    여행지로 검색 문서 필드를 만듭니다.
+
+    Args:
+        location: SOURCE_FIELDS 속성을 가진 객체 (마이그레이션의 과거 모델도 가능)
+
+    Returns:
+        dict: SearchDocument 필드 값 (source_hash 포함)
+    """
+    fields = {
+        'embedding_text': build_destination_text(location),
+        'name': (location.name or '').lower(),
+        'description': (location.description or '').lower(),
+        'category': (location.category or '').lower(),
+        'city': (location.city or '').lower(),
+        'country': (location.country or '').lower(),
+        'subcategories': field_text(location.subcategories).lower(),
+        'tokens': ' '.join(document_tokens(location)),
+    }
+    digest = hashlib.sha256('\x00'.join(fields[name] for name in DOCUMENT_FIELDS).encode('utf-8'))
+    fields['source_hash'] = digest.hexdigest()
+    return fields
+
+
+def refresh_document(location):
+    """
+    여행지 하나의 검색 문서를 갱신합니다. 내용이 바뀌지 않았으면 쓰지 않습니다.
+
+    Returns:
+        bool: 문서를 새로 쓰거나 갱신했는지 여부
+    """
+    from .models import SearchDocument
+
+    fields = document_fields(location)
+    current_hash = SearchDocument.objects.filter(location_id=location.id).values_list('source_hash', flat=True).first()
+    if current_hash == fields['source_hash']:
+        return False
+    SearchDocument.objects.update_or_create(location_id=location.id, defaults=fields)
+    return True
+
+
+def rebuild_documents(locations=None, batch_size=1000, document_model=None):
+    """
+    여러 여행지의 검색 문서를 한 번에 만들거나 덮어씁니다. (bulk_create + 충돌 시 갱신)
+
+    Args:
+        locations: Location 쿼리셋 (None이면 전체 여행지)
+        batch_size: 한 번에 쓰는 문서 수
+        document_model: 문서 모델 (마이그레이션에서 과거 모델을 넘길 때 사용)
+
+    Returns:
+        int: 쓴 문서 수
+    """
+    if document_model is None:
+        from .models import Location, SearchDocument
+        document_model = SearchDocument
+        if locations is None:
+            locations = Location.objects.all()
+
+    count = 0
+    batch = []
+    for location in locations.only(*SOURCE_FIELDS).order_by('id').iterator(chunk_size=batch_size):
+        batch.append(document_model(location_id=location.id, **document_fields(location)))
+        if len(batch) >= batch_size:
+            count += _write_documents(document_model, batch)
+            batch = []
+    if batch:
+        count += _write_documents(document_model, batch)
+    return count
+
+
+def _write_documents(document_model, documents):
+    document_model.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=['location'],
+        update_fields=list(DOCUMENT_FIELDS) + ['source_hash', 'updated_at'],
+    )
+    return len(documents)
+
+
+def ensure_documents():
+    """검색 문서가 없는 여행지(bulk_create 등 시그널 없이 추가된 여행지)의 문서를 만듭니다."""
+    from .models import Location
+
+    return rebuild_documents(Location.objects.filter(search_document__isnull=True))
+
+
+class SearchDocumentCatalog:
+    """
+    메모리 검색 문서 카탈로그 (위치 ID 오름차순으로 정렬된 행)
+
+    토큰은 어휘 사전(토큰 → 토큰 ID)과 CSR 형식 배열로 보관합니다.
+    행 i의 토큰 ID는 token_ids[token_offsets[i]:token_offsets[i + 1]] 입니다.
+    """
+
+    def __init__(self, ids, embedding_texts, fields, vocabulary, token_offsets, token_ids):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.row_of = {int(loc_id): row for row, loc_id in enumerate(self.ids)}
+        self.embedding_texts = embedding_texts
+        self.text_lower = [text.lower() for text in embedding_texts]
+        self.fields = fields
+        self.vocabulary = vocabulary
+        self.token_offsets = token_offsets
+        self.token_ids = token_ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls):
+        """SearchDocument 테이블에서 카탈로그를 읽습니다. (쿼리 한 번)"""
+        from .models import SearchDocument
+
+        ids, embedding_texts, tokens = [], [], []
+        fields = {field: [] for field in LOWER_FIELDS}
+        vocabulary = {}
+        token_ids = []
+        token_offsets = [0]
+
+        rows = SearchDocument.objects.values_list(
+            'location_id', 'embedding_text', 'tokens', *LOWER_FIELDS
+        ).order_by('location_id').iterator(chunk_size=2000)
+        for location_id, embedding_text, tokens, *values in rows:
+            ids.append(location_id)
+            embedding_texts.append(embedding_text)
+            for field, value in zip(LOWER_FIELDS, values):
+                fields[field].append(value)
+            for token in tokens.split():
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+            token_offsets.append(len(token_ids))
+
+        return cls(
+            ids, embedding_texts, fields,
+            vocabulary=list(vocabulary),
+            token_offsets=np.asarray(token_offsets, dtype=np.int64),
+            token_ids=np.asarray(token_ids, dtype=np.int32),
+        )
+
+    def document(self, location_id):
+        """위치 ID의 문서 (없으면 None)"""
+        row = self.row_of.get(location_id)
+        if row is None:
+            return None
+        return CatalogDocument(
+            self.embedding_texts[row],
+            self.text_lower[row],
+            self.fields['name'][row],
+            self.fields['city'][row],
+            self.fields['country'][row],
+        )
+
+    def token_postings(self):
+        """토큰 → 정렬된 위치 ID 배열 (역색인 구축용)"""
+        if len(self.token_ids) == 0:
+            return {}
+        rows = np.repeat(np.arange(len(self.ids)), np.diff(self.token_offsets))
+        # 토큰 ID 순, 같은 토큰 안에서는 행(= 위치 ID) 순으로 정렬
+        order = np.lexsort((rows, self.token_ids))
+        sorted_tokens = self.token_ids[order]
+        sorted_ids = self.ids[rows[order]]
+        boundaries = np.flatnonzero(np.diff(sorted_tokens)) + 1
+        starts = np.concatenate(([0], boundaries))
+        return {
+            self.vocabulary[sorted_tokens[start]]: ids
+            for start, ids in zip(starts, np.split(sorted_ids, boundaries))
+        }
+
+    def field_documents(self):
+        """(위치 ID, {필드: 소문자 텍스트}) 이터레이터 (BM25 인덱스 구축용)"""
+        for row, location_id in enumerate(self.ids.tolist()):
+            yield location_id, {field: self.fields[field][row] for field in LOWER_FIELDS}
+
+
+def load_search_documents():
+    """
+    검색 문서가 없는 여행지의 문서를 만든 뒤 메모리 카탈로그를 읽습니다.
+    """
+    created = ensure_documents()
+    if created:
+        logger.info("검색 문서가 없는 여행지 %d개의 문서를 생성했습니다.", created)
+    return SearchDocumentCatalog.load()
+
+
+# 싱글톤 검색 문서 카탈로그 (여행지가 변경되면 다음 조회 시 다시 읽음)
+search_documents = LazyIndex(load_search_documents)
@@ -0,0 +1,538 @@
+"""
+여행지 임베딩 행렬 기반 검색 인덱스
+
+모든 여행지 임베딩을 하나의 연속된 float32 행렬(위치 ID와 행 정렬)로 보관하고,
+쿼리 하나를 행렬-벡터 곱 한 번으로 점수화한 뒤 argpartition으로 상위 k개만 선택합니다.
+이름/도시/국가 가중치와 감정 카테고리 가중치는 벡터화된 마스크로 같은 패스에서 적용합니다.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from .instrumentation import record, span
+from .lazy_index import LazyIndex
+from .vector_store import normalize_rows
+
+# 감정 기반 가중치를 받는 카테고리 (기존 search_destinations 규칙과 동일)
+POSITIVE_CATEGORIES = ["Fun & Games", "Entertainment", "Spas & Wellness", "Food & Drink"]
+NEGATIVE_CATEGORIES = ["Nature & Parks", "Museums", "Sights & Landmarks"]
+
+# 인덱스 구축 시 DB에서 가져올 필드
+INDEX_FIELDS = ('id', 'name', 'description', 'city', 'country', 'subcategories', 'subtypes')
+
+
+def build_destination_text(dest):
+    """
+    여행지 임베딩에 사용할 텍스트를 생성합니다.
+
+    도시와 국가는 가중치를 위해 3번 반복하고, 서브카테고리/서브타입은 처음 5개만 사용합니다.
+    """
+    dest_text = f"{dest.name} {dest.description or ''}"
+
+    if dest.city:
+        dest_text += f" {dest.city} {dest.city} {dest.city}"
+    if dest.country:
+        dest_text += f" {dest.country} {dest.country} {dest.country}"
+
+    for values in (dest.subcategories, dest.subtypes):
+        if values:
+            if isinstance(values, list):
+                dest_text += " " + " ".join(values[:5])
+            elif isinstance(values, str):
+                dest_text += " " + values
+
+    return dest_text
+
+
+class FieldHaystack:
+    """
+    문자열 필드 전체를 하나의 큰 문자열로 이어 붙여, 부분 문자열 포함 여부를
+    C 수준의 str.find 반복만으로 행 마스크로 변환합니다. (반복 횟수 = 일치하는 행 수)
+    """
+
+    SEPARATOR = '\x00'
+
+    def __init__(self, values):
+        values = [v or '' for v in values]
+        self.size = len(values)
+        self.text = self.SEPARATOR.join(values)
+        lengths = np.fromiter((len(v) + 1 for v in values), dtype=np.int64, count=self.size)
+        # 각 행의 시작 오프셋
+        self.starts = np.zeros(self.size, dtype=np.int64)
+        if self.size > 1:
+            np.cumsum(lengths[:-1], out=self.starts[1:])
+
+    def contains(self, word):
+        """word를 포함하는 행의 불리언 마스크를 반환합니다."""
+        mask = np.zeros(self.size, dtype=bool)
+        if not word or self.size == 0:
+            return mask
+
+        text = self.text
+        starts = self.starts
+        pos = text.find(word)
+        while pos != -1:
+            row = int(np.searchsorted(starts, pos, side='right')) - 1
+            mask[row] = True
+            # 같은 행의 중복 일치는 건너뛰고 다음 행부터 다시 검색
+            if row + 1 >= self.size:
+                break
+            pos = text.find(word, int(starts[row + 1]))
+        return mask
+
+
+class DestinationEmbeddingIndex:
+    """
+    여행지 임베딩 행렬과 가중치 계산용 사전 데이터를 보관하는 인덱스
+    """
+
+    # 단어별 마스크 캐시 최대 크기
+    MAX_MASK_CACHE = 2048
+
+    def __init__(self, ids, texts, names, cities, countries, matrix, normalized=False):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.ids_sorted = bool(np.all(np.diff(self.ids) > 0))
+        self.row_of = {int(loc_id): row for row, loc_id in enumerate(self.ids)}
+
+        if matrix.ndim != 2 or matrix.shape[0] != len(self.ids):
+            raise ValueError("임베딩 행렬의 행 수가 여행지 수와 일치하지 않습니다.")
+        if normalized:
+            # 저장소의 메모리 맵을 복사하지 않고 그대로 사용 (워커 간 페이지 캐시 공유)
+            self.matrix = matrix
+        else:
+            # 코사인 유사도를 내적 하나로 계산하기 위해 행 단위 정규화
+            self.matrix = np.ascontiguousarray(normalize_rows(matrix), dtype=np.float32)
+
+        self.fields = {
+            'name': FieldHaystack([n.lower() for n in names]),
+            'city': FieldHaystack([(c or '').lower() for c in cities]),
+            'country': FieldHaystack([(c or '').lower() for c in countries]),
+            'text': FieldHaystack([t.lower() for t in texts]),
+        }
+
+        # 감정 카테고리 가중치는 쿼리와 무관하므로 미리 계산 (원본 텍스트 기준, 대소문자 구분)
+        self.positive_boost = self._category_boost(texts, POSITIVE_CATEGORIES)
+        self.negative_boost = self._category_boost(texts, NEGATIVE_CATEGORIES)
+
+        self._mask_cache = {}
+        self._mask_lock = threading.Lock()
+
+        # 근사 최근접 이웃 인덱스 (대규모 카탈로그에서만 사용)
+        self.ann = None
+
+        # 압축 행렬 (CompressedMatrix)과 원본 행렬로 다시 계산할 상위 후보 수 (0이면 다시 계산하지 않음)
+        self.compressed = None
+        self.rerank = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dimension(self):
+        return self.matrix.shape[1]
+
+    @staticmethod
+    def _category_boost(texts, categories):
+        haystack = FieldHaystack(texts)
+        counts = np.zeros(len(texts), dtype=np.float32)
+        for category in categories:
+            counts += haystack.contains(category)
+        return np.power(np.float32(1.2), counts).astype(np.float32)
+
+    @classmethod
+    def build(cls, locations, encode_fn, store=None):
+        """
+        여행지 목록으로 인덱스를 구축합니다.
+
+        Args:
+            locations: Location 객체 이터러블 (INDEX_FIELDS 필드 필요)
+            encode_fn: 텍스트 목록을 (N, d) 임베딩 행렬로 변환하는 함수
+            store: 임베딩 저장소 (EmbeddingStore). 지정하면 텍스트가 바뀐 행만 임베딩
+
+        Returns:
+            DestinationEmbeddingIndex
+        """
+        ids, texts, names, cities, countries = [], [], [], [], []
+        for dest in locations:
+            ids.append(dest.id)
+            texts.append(build_destination_text(dest))
+            names.append(dest.name or '')
+            cities.append(dest.city)
+            countries.append(dest.country)
+
+        if store is not None:
+            matrix = store.sync(ids, texts, encode_fn)
+            return cls(ids, texts, names, cities, countries, matrix, normalized=True)
+
+        if texts:
+            matrix = encode_fn(texts)
+        else:
+            matrix = np.zeros((0, 1), dtype=np.float32)
+        return cls(ids, texts, names, cities, countries, matrix)
+
+    @classmethod
+    def from_catalog(cls, catalog, encode_fn, store=None):
+        """
+        검색 문서 카탈로그(SearchDocumentCatalog)로 인덱스를 구축합니다.
+        임베딩 텍스트와 소문자 필드를 문서에서 그대로 사용하므로 여행지 데이터를 다시 조합하지 않습니다.
+        """
+        ids = catalog.ids.tolist()
+        texts = catalog.embedding_texts
+        names = catalog.fields['name']
+        cities = catalog.fields['city']
+        countries = catalog.fields['country']
+
+        if store is not None:
+            matrix = store.sync(ids, texts, encode_fn)
+            return cls(ids, texts, names, cities, countries, matrix, normalized=True)
+
+        if texts:
+            matrix = encode_fn(texts)
+        else:
+            matrix = np.zeros((0, 1), dtype=np.float32)
+        return cls(ids, texts, names, cities, countries, matrix)
+
+    def word_mask(self, field, words):
+        """필드에 words 중 하나라도 포함된 행의 마스크를 반환합니다. (단어별 결과 캐싱)"""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        for word in words:
+            key = (field, word)
+            word_mask = self._mask_cache.get(key)
+            if word_mask is None:
+                word_mask = self.fields[field].contains(word)
+                with self._mask_lock:
+                    if len(self._mask_cache) >= self.MAX_MASK_CACHE:
+                        self._mask_cache.clear()
+                    self._mask_cache[key] = word_mask
+            mask |= word_mask
+        return mask
+
+    def rows_for_ids(self, location_ids):
+        """위치 ID 목록을 인덱스 행 번호 배열로 변환합니다. (인덱스에 없는 ID는 무시)"""
+        if isinstance(location_ids, np.ndarray) and self.ids_sorted:
+            # 정렬된 ID 배열에서 이진 탐색으로 한 번에 변환
+            pos = np.searchsorted(self.ids, location_ids)
+            valid = pos < len(self.ids)
+            valid[valid] = self.ids[pos[valid]] == location_ids[valid]
+            return pos[valid]
+        rows = [self.row_of[loc_id] for loc_id in location_ids if loc_id in self.row_of]
+        return np.asarray(rows, dtype=np.int64)
+
+    def exclusion_mask(self, location_ids):
+        """제외할 위치 ID 배열을 전체 행 길이의 불리언 마스크로 변환합니다. (None이면 None)"""
+        if location_ids is None:
+            return None
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.rows_for_ids(np.asarray(location_ids, dtype=np.int64))] = True
+        return mask
+
+    @staticmethod
+    def normalize_query(query_vector):
+        """쿼리 벡터를 float32 단위 벡터로 변환합니다."""
+        query_vector = np.asarray(query_vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query_vector)
+        if norm > 0:
+            query_vector = query_vector / norm
+        return query_vector
+
+    def similarity(self, query_vector, rows=None, exact=False):
+        """
+        정규화된 쿼리 벡터와의 코사인 유사도를 계산합니다.
+        압축 행렬이 있으면 압축 행렬에서 근사값을 계산하고, exact=True이면 원본 행렬을 사용합니다.
+        """
+        if self.compressed is not None and not exact:
+            return self.compressed.dot(query_vector, rows)
+        if rows is None:
+            return self.matrix @ query_vector
+        return np.asarray(self.matrix[rows], dtype=np.float32) @ query_vector
+
+    def similarity_batch(self, query_vectors):
+        """
+        여러 쿼리 벡터의 코사인 유사도를 행렬-행렬 곱 한 번으로 계산합니다.
+        압축 행렬이 있으면 쿼리마다 압축 행렬에서 근사값을 계산합니다.
+
+        Returns:
+            np.ndarray: (행 수, 쿼리 수) float32
+        """
+        queries = np.stack([self.normalize_query(q) for q in query_vectors]) if len(query_vectors) else \
+            np.zeros((0, self.dimension), dtype=np.float32)
+        if self.compressed is not None:
+            return np.stack([self.compressed.dot(q) for q in queries], axis=1) if len(queries) else \
+                np.zeros((len(self), 0), dtype=np.float32)
+        return np.asarray(self.matrix @ queries.T, dtype=np.float32)
+
+    def score(self, query_vector, query_words, sentiment, short_query, rows=None, exact=False, similarities=None):
+        """
+        여행지 점수를 한 번에 계산합니다.
+
+        기존 search_destinations의 유사도 증폭 및 가중치 규칙을 그대로 벡터화한 것입니다.
+
+        Args:
+            query_vector: 쿼리 임베딩 벡터
+            query_words: 전처리된 쿼리 단어 집합
+            sentiment: 쿼리 감정 ("POSITIVE", "NEGATIVE", "NEUTRAL")
+            short_query: 3단어 미만 쿼리 여부
+            rows: 점수를 계산할 행 번호 배열 (None이면 전체)
+            exact: 압축 행렬이 있어도 원본 행렬로 계산할지 여부
+            similarities: similarity_batch로 미리 계산한 전체 행의 유사도 (exact=True이면 무시)
+
+        Returns:
+            np.ndarray: 점수 (float32). rows를 지정하면 rows 순서와 정렬
+        """
+        query_vector = self.normalize_query(query_vector)
+
+        def take(values):
+            return values if rows is None else values[rows]
+
+        with span('score'):
+            if similarities is not None and not exact:
+                # 아래에서 점수를 제자리에서 곱하므로 복사본 사용
+                scores = np.array(take(similarities), dtype=np.float32)
+            else:
+                scores = self.similarity(query_vector, rows, exact)
+
+        boost_start = time.perf_counter()
+        words = sorted(query_words)
+        name_mask = take(self.word_mask('name', words))
+
+        if short_query:
+            # 짧은 쿼리의 유사도 증폭 (calculate_similarity와 동일)
+            scores = np.where(
+                scores >= 0.2,
+                np.minimum(scores * 1.5, 0.85),
+                np.where(scores >= 0.1, scores * 1.3, scores),
+            ).astype(np.float32)
+
+            multiplier = np.ones(len(scores), dtype=np.float32)
+            multiplier[name_mask] *= 1.5
+            multiplier[take(self.word_mask('city', words))] *= 2.0
+
+            country_mask = take(self.word_mask('country', words))
+            multiplier[country_mask] *= 2.0
+            text_only = take(self.word_mask('text', words)) & ~country_mask
+            multiplier[text_only] *= 1.3
+            scores *= multiplier
+
+        if sentiment == "POSITIVE":
+            scores *= take(self.positive_boost)
+        elif sentiment == "NEGATIVE":
+            scores *= take(self.negative_boost)
+
+        # 쿼리 키워드가 제목에 직접 포함된 경우 가중치 부여
+        scores[name_mask] *= 1.5
+
+        record('boost', time.perf_counter() - boost_start)
+        return scores
+
+    @staticmethod
+    def top_k(scores, k, rows=None, excluded=None):
+        """
+        점수 배열에서 상위 k개를 선택합니다. (전체 정렬 대신 argpartition 사용)
+
+        Args:
+            scores: 점수 배열
+            k: 선택할 개수
+            rows: scores와 정렬된 행 번호 배열 (None이면 scores의 위치가 곧 행 번호)
+            excluded: 선택에서 제외할 행의 불리언 마스크 (전체 행 길이, exclusion_mask로 생성)
+
+        Returns:
+            (행 번호 배열, 점수 배열) - 점수 내림차순
+        """
+        if excluded is not None:
+            # 제외할 행의 점수를 -inf로 내려 argpartition에서 선택되지 않도록 함
+            excluded = excluded if rows is None else excluded[rows]
+            k = min(k, len(scores) - int(np.count_nonzero(excluded)))
+            scores = np.where(excluded, np.float32(-np.inf), scores)
+
+        n = len(scores)
+        k = min(k, n)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        with span('sort'):
+            if k < n:
+                part = np.argpartition(-scores, k - 1)[:k]
+            else:
+                part = np.arange(n)
+            order = part[np.argsort(-scores[part], kind='stable')]
+
+            selected_rows = rows[order] if rows is not None else order
+            return selected_rows, scores[order]
+
+    def candidate_rows(self, query_vector, query_words, k, allowed_rows=None, nprobe=None):
+        """
+        점수를 계산할 후보 행을 결정합니다.
+
+        ANN 인덱스가 있으면 가까운 셀의 행과 이름이 일치하는 행(가장 큰 가중치)을 후보로 사용하고,
+        없으면 allowed_rows(또는 전체)를 그대로 사용합니다.
+
+        Returns:
+            np.ndarray 또는 None (None이면 전체 행)
+        """
+        if self.ann is None:
+            return allowed_rows
+
+        with span('prefilter'):
+            query_vector = self.normalize_query(query_vector)
+            rows = self.ann.candidates(query_vector, nprobe, max(self.ann.min_candidates, k))
+            name_rows = np.flatnonzero(self.word_mask('name', sorted(query_words)))
+            rows = np.union1d(rows, name_rows)
+
+            if allowed_rows is not None:
+                rows = np.intersect1d(rows, allowed_rows, assume_unique=True)
+                # 검색 대상이 좁혀져 후보가 부족하면 대상 전체를 정확히 계산
+                if len(rows) < k:
+                    return allowed_rows
+            return rows
+
+    def search(self, query_vector, query_words, sentiment, short_query, k, allowed_rows=None, nprobe=None,
+               similarities=None, excluded=None):
+        """
+        후보 선택, 점수 계산, 상위 k개 선택을 한 번에 수행합니다.
+
+        Args:
+            similarities: similarity_batch로 미리 계산한 이 쿼리의 유사도 열 (배치 검색용, 선택)
+            excluded: 상위 k개 선택에서 제외할 행의 불리언 마스크 (exclusion_mask로 생성, 선택)
+
+        Returns:
+            (행 번호 배열, 점수 배열) - 점수 내림차순, 제외된 행 없이 최대 k개
+        """
+        # ANN 후보에서 제외될 행만큼 후보를 더 확보
+        candidate_k = k if excluded is None else k + int(np.count_nonzero(excluded))
+        rows = self.candidate_rows(query_vector, query_words, candidate_k, allowed_rows, nprobe)
+        scores = self.score(query_vector, query_words, sentiment, short_query, rows=rows, similarities=similarities)
+
+        if self.compressed is not None and self.rerank:
+            # 압축 점수 상위 후보만 원본 행렬로 다시 계산
+            rerank_rows, _ = self.top_k(scores, max(k, self.rerank), rows, excluded)
+            rerank_rows = np.sort(rerank_rows)
+            scores = self.score(query_vector, query_words, sentiment, short_query, rows=rerank_rows, exact=True)
+            return self.top_k(scores, k, rerank_rows)
+
+        return self.top_k(scores, k, rows, excluded)
+
+
+def ann_index_path(store):
+    """임베딩 저장소 옆에 저장되는 ANN 인덱스 파일 경로 (저장소가 없으면 None)"""
+    if store is None:
+        return None
+    return os.path.join(store.directory, f"{store.name}.ivf.npz")
+
+
+def compressed_index_path(store, tag):
+    """임베딩 저장소 옆에 저장되는 압축 행렬 파일 경로 접두어 (저장소가 없으면 None)"""
+    if store is None:
+        return None
+    return os.path.join(store.directory, f"{store.name}.{tag}")
+
+
+def build_destination_index(encode_fn, store=None):
+    """
+    검색 문서 카탈로그로 임베딩 인덱스를 구축하고, 설정에 따라 ANN 인덱스와 압축 행렬을 연결합니다.
+
+    Args:
+        encode_fn: 텍스트 목록을 임베딩 행렬로 변환하는 함수
+        store: 임베딩 저장소 (EmbeddingStore, 선택)
+    """
+    from .search_documents import search_documents
+
+    index = DestinationEmbeddingIndex.from_catalog(search_documents.get(), encode_fn, store=store)
+    index.ann = _load_or_train_ann(index, store)
+    _attach_compressed(index, store)
+    return index
+
+
+def _load_or_train_ann(index, store):
+    """
+    설정에 따라 ANN 인덱스를 불러오거나 학습합니다.
+    저장소가 있으면 같은 세대로 저장된 인덱스를 재사용합니다.
+    """
+    from django.conf import settings
+
+    if not getattr(settings, 'NLP_ANN_ENABLED', False):
+        return None
+    if len(index) < getattr(settings, 'NLP_ANN_MIN_ROWS', 50000):
+        return None
+
+    from .ann_index import IVFIndex
+
+    nprobe = getattr(settings, 'NLP_ANN_NPROBE', 8)
+    min_candidates = getattr(settings, 'NLP_ANN_MIN_CANDIDATES', 2000)
+
+    def train():
+        return IVFIndex(
+            nlist=getattr(settings, 'NLP_ANN_NLIST', None),
+            nprobe=nprobe,
+            min_candidates=min_candidates,
+        ).train(index.matrix)
+
+    def load():
+        ann = IVFIndex.load(path, nprobe=nprobe, min_candidates=min_candidates, generation=store.generation)
+        if ann is not None and ann.num_rows == len(index):
+            return ann
+        return None
+
+    path = ann_index_path(store)
+    if not path:
+        return train()
+
+    ann = load()
+    if ann is not None:
+        return ann
+
+    # 여러 워커가 동시에 학습/저장하지 않도록 저장소 잠금을 잡고,
+    # 기다리는 동안 다른 워커가 현재 세대의 인덱스를 저장했는지 다시 확인
+    with store.write_lock():
+        ann = load()
+        if ann is None:
+            ann = train()
+            ann.save(path, generation=store.generation)
+    return ann
+
+
+def _attach_compressed(index, store):
+    """
+    설정에 따라 압축 행렬을 불러오거나 만들어 인덱스에 연결합니다.
+    저장소가 있으면 같은 세대로 저장된 압축 행렬을 메모리 맵으로 재사용합니다.
+    """
+    from django.conf import settings
+
+    kind = getattr(settings, 'NLP_VECTOR_COMPRESSION', None)
+    if not kind or len(index) == 0:
+        return
+
+    from .quantization import CompressedMatrix
+
+    pca_dimension = getattr(settings, 'NLP_VECTOR_PCA_DIM', None)
+    generation = store.generation if store is not None else None
+    tag = f"{kind}-pca{pca_dimension}" if pca_dimension else kind
+    path_prefix = compressed_index_path(store, tag)
+
+    def load():
+        compressed = CompressedMatrix.load(path_prefix, generation=generation)
+        if compressed is not None and len(compressed) == len(index):
+            return compressed
+        return None
+
+    if not path_prefix:
+        compressed = CompressedMatrix.build(index.matrix, kind, pca_dimension)
+    else:
+        compressed = load()
+        if compressed is None:
+            # 여러 워커가 동시에 만들지 않도록 저장소 잠금을 잡고, 기다리는 동안 저장된 행렬이 있는지 다시 확인
+            with store.write_lock():
+                compressed = load()
+                if compressed is None:
+                    built = CompressedMatrix.build(index.matrix, kind, pca_dimension)
+                    built.save(path_prefix, generation=generation)
+                    # 저장 후 메모리 맵으로 다시 열어 워커 간 페이지 캐시를 공유
+                    compressed = load() or built
+
+    index.compressed = compressed
+    index.rerank = getattr(settings, 'NLP_VECTOR_RERANK', 200)
+
+
+# 싱글톤 인덱스 (카탈로그가 변경되면 다음 검색 시 다시 구축)
+destination_index = LazyIndex(build_destination_index)
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Location
+from .lazy_index import invalidate_catalog
+from .location_tags import sync_location_tags
+from .search_documents import refresh_document
+
+
+@receiver(post_save, sender=Location)
+def location_saved(sender, instance, update_fields=None, **kwargs):
+    # 좋아요 수만 변경된 경우는 검색 인덱스에 영향이 없으므로 무시
+    if update_fields and set(update_fields) <= {'likes_count'}:
+        return
+    # 검색 문서를 갱신하고 (내용이 같으면 쓰지 않음) 카탈로그를 다시 읽도록 표시
+    refresh_document(instance)
+    # 서브카테고리/서브타입 태그 행 갱신 (내용이 같으면 쓰지 않음)
+    sync_location_tags(instance)
+    # 검색 인덱스를 무효화하고 카탈로그 버전을 올려 모든 워커의 색인과 검색 결과 캐시를 무효화
+    invalidate_catalog()
+
+
+@receiver(post_delete, sender=Location)
+def location_deleted(sender, instance, **kwargs):
+    # 검색 문서는 CASCADE로 함께 삭제됨
+    # 검색 인덱스를 무효화하고 카탈로그 버전을 올려 모든 워커의 색인과 검색 결과 캐시를 무효화
+    invalidate_catalog()
@@ -0,0 +1,373 @@
+"""
+대규모 테스트용 합성 카탈로그/사용자 활동 생성기
+
+ds/*.csv의 실제 여행지 행을 재표본추출하고 이름, 도시(좌표), 서브카테고리를 변형하여 여행지를 늘리고,
+좋아요/리뷰 수가 멱법칙(power-law)을 따르는 사용자를 생성합니다.
+- 여행지 인기도: 무작위 순위에 대한 Zipf 분포 (소수의 여행지에 활동이 몰림)
+- 사용자별 좋아요/리뷰 수: Zipf 분포 (대부분은 적고 일부 사용자가 매우 많음)
+- selected_tags: 첫 번째 서브카테고리 빈도에 비례해 3~7개, 좋아요의 절반은 선택 태그의 여행지에서 고름
+
+모든 난수는 시드로 고정된 NumPy Generator에서 나오므로 같은 시드와 같은 DB에서 같은 데이터가 만들어집니다.
+행은 청크 단위 bulk_create로, 청크마다 트랜잭션 하나로 저장합니다.
+"""
+import time
+
+import numpy as np
+
+# 합성 여행지 ID 시작값 (실제 TripAdvisor ID와 겹치지 않고 32비트 정수 범위 안)
+SYNTHETIC_LOCATION_ID_START = 1_000_000_000
+
+SYNTHETIC_USER_PREFIX = 'synth_'
+
+# 합성 여행지 이름에 붙이는 수식어
+NAME_MODIFIERS = (
+    'Old', 'New', 'Grand', 'Little', 'Royal', 'Hidden', 'Upper', 'Lower',
+    'East', 'West', 'North', 'South', 'Central', 'Historic', 'Riverside', 'Hilltop',
+)
+
+# 좌표 변형 표준편차 (도 단위, 약 2km)
+COORDINATE_NOISE = 0.02
+
+# 별점 분포 (1~5점, 실제 리뷰처럼 높은 점수가 많음)
+RATING_PROBABILITIES = (0.05, 0.08, 0.15, 0.32, 0.40)
+
+REVIEW_TEMPLATES = {
+    1: 'Very disappointing visit. Crowded and not worth it.',
+    2: 'Below expectations, the {tag} part was boring.',
+    3: 'An average {tag} stop. Fine if you are nearby.',
+    4: 'Really enjoyed this place, great {tag} experience.',
+    5: 'Amazing! A must see, loved the {tag}.',
+}
+
+
+def zipf_weights(size, exponent, rng):
+    """무작위 순서로 섞은 Zipf 가중치 (합 1)"""
+    weights = 1.0 / np.arange(1, size + 1, dtype=np.float64) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def activity_counts(rng, size, exponent, maximum):
+    """Zipf 분포를 따르는 0 이상의 활동 수 (최대 maximum)"""
+    if exponent <= 1.0:
+        raise ValueError("활동 분포 지수는 1보다 커야 합니다.")
+    return np.minimum(rng.zipf(exponent, size=size) - 1, maximum)
+
+
+def sample_unique(rng, cdf, count):
+    """누적 분포에서 중복 없이 최대 count개의 인덱스를 뽑습니다. (복원 추출 후 중복 제거)"""
+    if count <= 0:
+        return np.zeros(0, dtype=np.int64)
+    draws = np.searchsorted(cdf, rng.random(count * 2 + 8), side='right')
+    draws = np.minimum(draws, len(cdf) - 1)
+    _, first = np.unique(draws, return_index=True)
+    return draws[np.sort(first)][:count]
+
+
+class SyntheticDataGenerator:
+    """
+    실제 여행지 행을 바탕으로 합성 여행지와 사용자 활동을 생성합니다.
+
+    Args:
+        templates: 실제 여행지 Location 객체 목록 (search_benchmark.read_catalog)
+        seed: 난수 시드
+        batch_size: 청크(트랜잭션) 크기
+        log: 진행 상황 출력 함수
+    """
+
+    def __init__(self, templates, seed=0, batch_size=5000, log=None):
+        if not templates:
+            raise ValueError("원본 여행지 행이 없습니다.")
+        self.templates = templates
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+
+        # 도시/국가/좌표는 실제 행에서 함께 뽑아 조합이 어긋나지 않게 함
+        self.places = [
+            (t.city, t.state, t.country, t.latitude, t.longitude)
+            for t in templates if t.city and t.latitude is not None and t.longitude is not None
+        ] or [(t.city, t.state, t.country, t.latitude, t.longitude) for t in templates]
+
+        tag_counts = {}
+        for t in templates:
+            for tag in t.subcategories or []:
+                tag_counts[tag] = tag_counts.get(tag, 0) + 1
+        self.tags = sorted(tag_counts)
+        counts = np.array([tag_counts[tag] for tag in self.tags], dtype=np.float64)
+        self.tag_probabilities = counts / counts.sum() if len(counts) else counts
+
+    def _random_tag(self):
+        return self.tags[self.rng.choice(len(self.tags), p=self.tag_probabilities)]
+
+    def _perturb_subcategories(self, subcategories):
+        """첫 번째 서브카테고리는 대부분 유지하고, 나머지는 일부 제거/추가합니다."""
+        subcategories = list(subcategories or [])
+        if not self.tags:
+            return subcategories
+        if not subcategories or self.rng.random() < 0.1:
+            subcategories = [self._random_tag()] + subcategories[1:]
+        rest = [tag for tag in subcategories[1:] if self.rng.random() >= 0.2]
+        if self.rng.random() < 0.3:
+            rest.append(self._random_tag())
+        return list(dict.fromkeys([subcategories[0]] + rest))
+
+    def build_location(self, location_id):
+        """실제 행 하나를 골라 변형한 합성 Location 객체 (저장하지 않음)"""
+        from .models import Location
+
+        template = self.templates[self.rng.integers(len(self.templates))]
+        city, state, country, latitude, longitude = self.places[self.rng.integers(len(self.places))]
+
+        modifier = NAME_MODIFIERS[self.rng.integers(len(NAME_MODIFIERS))]
+        description = template.description
+        if description and template.city and city and template.city != city:
+            description = description.replace(template.city, city)
+        if latitude is not None:
+            latitude = float(latitude + self.rng.normal(0, COORDINATE_NOISE))
+            longitude = float(longitude + self.rng.normal(0, COORDINATE_NOISE))
+
+        return Location(
+            id=location_id,
+            name=f"{modifier} {template.name}"[:255],
+            description=description,
+            category=template.category,
+            type=template.type,
+            subcategories=self._perturb_subcategories(template.subcategories),
+            subtypes=list(template.subtypes or []),
+            city=city,
+            state=state,
+            country=country,
+            latitude=latitude,
+            longitude=longitude,
+            image=template.image,
+        )
+
+    def create_locations(self, count):
+        """
+        합성 여행지 count개를 청크 단위로 저장합니다. (태그 행 포함)
+
+        Returns:
+            (저장한 여행지 ID 배열, 여행지별 첫 번째 서브카테고리 목록)
+        """
+        from django.db import transaction
+        from .location_tags import write_location_tags
+        from .models import Location
+
+        start_id = SYNTHETIC_LOCATION_ID_START
+        ids = np.arange(start_id, start_id + count, dtype=np.int64)
+        first_tags = []
+        for chunk_start in range(0, count, self.batch_size):
+            chunk = [self.build_location(int(loc_id)) for loc_id in ids[chunk_start:chunk_start + self.batch_size]]
+            first_tags.extend((loc.subcategories or [None])[0] for loc in chunk)
+            with transaction.atomic():
+                Location.objects.bulk_create(chunk, batch_size=self.batch_size)
+                write_location_tags(chunk, batch_size=self.batch_size)
+            self.log(f"여행지 {chunk_start + len(chunk)}/{count}개 저장")
+        return ids, first_tags
+
+    def _tag_rows(self, tag_rows, selected_tags, count):
+        """선택 태그 중 하나를 고르고 그 태그의 여행지에서 고른 행 번호 count개 (중복 가능)"""
+        picks = self.rng.integers(len(selected_tags), size=count)
+        rows = [
+            tag_rows[tag][self.rng.integers(len(tag_rows[tag]), size=int((picks == t).sum()))]
+            for t, tag in enumerate(selected_tags)
+        ]
+        return np.concatenate(rows)
+
+    def create_users_and_activity(self, count, location_ids, location_tags, like_exponent=1.8,
+                                  review_exponent=2.2, popularity_exponent=1.0, max_likes=500, max_reviews=200):
+        """
+        사용자와 좋아요/리뷰를 청크 단위로 저장합니다.
+
+        Args:
+            count: 사용자 수
+            location_ids: 활동 대상 여행지 ID 배열
+            location_tags: location_ids와 정렬된 첫 번째 서브카테고리 목록
+            like_exponent / review_exponent: 사용자별 좋아요/리뷰 수 Zipf 지수 (클수록 활동이 적음)
+            popularity_exponent: 여행지 인기도 Zipf 지수
+
+        Returns:
+            dict: 생성한 사용자/좋아요/리뷰 수와 여행지별 좋아요 수 배열(likes_per_location)
+        """
+        from django.contrib.auth import get_user_model
+        from django.db import transaction
+        from .models import Like, Review
+        from .review_utils import review_content_hash
+
+        User = get_user_model()
+        location_ids = np.asarray(location_ids, dtype=np.int64)
+        cdf = np.cumsum(zipf_weights(len(location_ids), popularity_exponent, self.rng))
+
+        # 태그별 여행지 (선택 태그 기반 좋아요용)
+        tag_rows = {}
+        for row, tag in enumerate(location_tags):
+            if tag:
+                tag_rows.setdefault(tag, []).append(row)
+        tag_rows = {tag: np.asarray(rows, dtype=np.int64) for tag, rows in tag_rows.items()}
+        tag_names = sorted(tag_rows)
+        tag_sizes = np.array([len(tag_rows[tag]) for tag in tag_names], dtype=np.float64)
+        tag_probabilities = tag_sizes / tag_sizes.sum()
+
+        like_counts = activity_counts(self.rng, count, like_exponent, max_likes)
+        review_counts = activity_counts(self.rng, count, review_exponent, max_reviews)
+        likes_per_location = np.zeros(len(location_ids), dtype=np.int64)
+        totals = {'users': 0, 'likes': 0, 'reviews': 0}
+
+        for chunk_start in range(0, count, self.batch_size):
+            chunk_end = min(count, chunk_start + self.batch_size)
+            users, selections = [], []
+            for i in range(chunk_start, chunk_end):
+                selected_tags = []
+                if tag_names:
+                    num_tags = min(int(self.rng.integers(3, 8)), len(tag_names))
+                    chosen = self.rng.choice(len(tag_names), size=num_tags, replace=False, p=tag_probabilities)
+                    selected_tags = [tag_names[t] for t in chosen]
+                users.append(User(
+                    username=f"{SYNTHETIC_USER_PREFIX}{i}",
+                    email=f"{SYNTHETIC_USER_PREFIX}{i}@example.com",
+                    password='!',  # 로그인할 수 없는 비밀번호
+                    selected_tags=selected_tags,
+                ))
+                selections.append(selected_tags)
+
+            with transaction.atomic():
+                User.objects.bulk_create(users, batch_size=self.batch_size)
+                user_ids = dict(User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list('username', 'id'))
+
+                likes, reviews = [], []
+                for offset, (user, selected_tags) in enumerate(zip(users, selections)):
+                    i = chunk_start + offset
+                    num_likes, num_reviews = int(like_counts[i]), int(review_counts[i])
+                    if not num_likes and not num_reviews:
+                        continue
+
+                    # 좋아요의 절반은 선택 태그의 여행지, 나머지는 전체 인기도 분포에서
+                    rows = sample_unique(self.rng, cdf, num_likes + num_reviews)
+                    if selected_tags and num_likes > 1:
+                        rows = np.concatenate([self._tag_rows(tag_rows, selected_tags, num_likes // 2), rows])
+                        _, first = np.unique(rows, return_index=True)
+                        rows = rows[np.sort(first)]
+
+                    liked_rows = rows[:num_likes]
+                    reviewed_rows = rows[len(liked_rows):len(liked_rows) + num_reviews]
+                    likes_per_location[liked_rows] += 1
+                    user_id = user_ids[user.username]
+                    likes.extend(Like(user_id=user_id, location_id=int(location_ids[row])) for row in liked_rows)
+                    for row in reviewed_rows:
+                        rating = int(self.rng.choice(5, p=RATING_PROBABILITIES)) + 1
+                        tag = location_tags[row] or 'place'
+                        content = REVIEW_TEMPLATES[rating].format(tag=tag.lower())
+                        reviews.append(Review(
+                            user_id=user_id,
+                            location_id=int(location_ids[row]),
+                            content=content,
+                            rating=rating,
+                            sentiment='POSITIVE' if rating >= 4 else ('NEGATIVE' if rating <= 2 else 'NEUTRAL'),
+                            sentiment_score=round(0.5 + (rating - 3) * 0.2, 2),
+                            keywords=tag.lower().split()[:5],
+                            analysis_hash=review_content_hash(content),
+                        ))
+
+                Like.objects.bulk_create(likes, batch_size=self.batch_size)
+                Review.objects.bulk_create(reviews, batch_size=self.batch_size)
+
+            totals['users'] += len(users)
+            totals['likes'] += len(likes)
+            totals['reviews'] += len(reviews)
+            self.log(f"사용자 {chunk_end}/{count}명 저장 (좋아요 {totals['likes']}개, 리뷰 {totals['reviews']}개)")
+
+        totals['likes_per_location'] = likes_per_location
+        return totals
+
+
+def apply_likes_counts(location_ids, likes_per_location, batch_size=5000):
+    """여행지별 좋아요 증감분을 likes_count에 더합니다. (같은 증감분끼리 묶어 UPDATE)"""
+    from django.db import transaction
+    from django.db.models import F
+    from .models import Location
+
+    location_ids = np.asarray(location_ids, dtype=np.int64)
+    likes_per_location = np.asarray(likes_per_location, dtype=np.int64)
+    with transaction.atomic():
+        for increment in np.unique(likes_per_location[likes_per_location != 0]):
+            ids = location_ids[likes_per_location == increment].tolist()
+            for start in range(0, len(ids), batch_size):
+                Location.objects.filter(id__in=ids[start:start + batch_size]).update(
+                    likes_count=F('likes_count') + int(increment)
+                )
+
+
+def clear_synthetic_data():
+    """이전에 생성한 합성 사용자(좋아요/리뷰 포함)와 합성 여행지를 삭제합니다."""
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+    from django.db.models.signals import post_delete
+    from .lazy_index import invalidate_catalog
+    from .models import Like, Location
+    from .signals import location_deleted
+
+    # 실제 여행지에 더했던 합성 사용자의 좋아요 수를 되돌림
+    synthetic_likes = (
+        Like.objects.filter(user__username__startswith=SYNTHETIC_USER_PREFIX, location_id__lt=SYNTHETIC_LOCATION_ID_START)
+        .values_list('location_id').annotate(count=Count('id'))
+    )
+    location_ids, counts = zip(*synthetic_likes) if synthetic_likes else ((), ())
+    apply_likes_counts(location_ids, [-count for count in counts])
+
+    get_user_model().objects.filter(username__startswith=SYNTHETIC_USER_PREFIX).delete()
+    # 여행지마다 삭제 시그널이 실행되지 않도록 잠시 연결 해제하고, 끝나면 검색 인덱스와 캐시를 한 번만 무효화
+    post_delete.disconnect(location_deleted, sender=Location)
+    try:
+        Location.objects.filter(id__gte=SYNTHETIC_LOCATION_ID_START).delete()
+    finally:
+        post_delete.connect(location_deleted, sender=Location)
+    invalidate_catalog()
+
+
+def generate(templates, locations=100000, users=10000, seed=0, batch_size=5000, like_exponent=1.8,
+             review_exponent=2.2, popularity_exponent=1.0, max_likes=500, max_reviews=200,
+             build_documents=True, log=None):
+    """
+    합성 여행지와 사용자 활동을 생성합니다. 활동 대상은 DB의 기존 여행지와 새 합성 여행지 전체입니다.
+
+    Returns:
+        dict: 생성 결과 요약
+    """
+    from .lazy_index import invalidate_catalog
+    from .models import Location
+    from .search_documents import rebuild_documents
+
+    log = log or (lambda message: None)
+    generator = SyntheticDataGenerator(templates, seed=seed, batch_size=batch_size, log=log)
+    summary = {'seed': seed}
+
+    start_time = time.perf_counter()
+    existing = list(Location.objects.exclude(id__gte=SYNTHETIC_LOCATION_ID_START)
+                    .order_by('id').values_list('id', 'subcategories'))
+    new_ids, new_tags = generator.create_locations(locations)
+    location_ids = np.concatenate([np.array([loc_id for loc_id, _ in existing], dtype=np.int64), new_ids])
+    location_tags = [(subcategories or [None])[0] for _, subcategories in existing] + new_tags
+    summary['locations'] = int(len(new_ids))
+    summary['location_seconds'] = round(time.perf_counter() - start_time, 2)
+
+    start_time = time.perf_counter()
+    totals = generator.create_users_and_activity(
+        users, location_ids, location_tags,
+        like_exponent=like_exponent, review_exponent=review_exponent,
+        popularity_exponent=popularity_exponent, max_likes=max_likes, max_reviews=max_reviews,
+    )
+    apply_likes_counts(location_ids, totals.pop('likes_per_location'), batch_size=batch_size)
+    summary.update(totals)
+    summary['activity_seconds'] = round(time.perf_counter() - start_time, 2)
+
+    if build_documents:
+        start_time = time.perf_counter()
+        rebuild_documents(Location.objects.filter(id__gte=SYNTHETIC_LOCATION_ID_START), batch_size=batch_size)
+        summary['document_seconds'] = round(time.perf_counter() - start_time, 2)
+
+    # bulk_create는 시그널을 실행하지 않으므로 검색 인덱스와 캐시를 직접 무효화
+    invalidate_catalog()
+    return summary
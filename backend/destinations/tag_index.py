@@ -0,0 +1,129 @@
+"""
+추천용 서브카테고리/서브타입 태그 메모리 색인
+
+정규화된 태그 테이블(LocationTag)과 여행지 국가를 한 번 읽어
+태그 값 → 정렬된 위치 ID 배열로 보관합니다.
+추천 API는 요청마다 전체 여행지를 순회하며 JSON을 파싱하고 부분 문자열을 검사하는 대신,
+이 색인의 배열 조회와 집합 연산(np.union1d 등)만으로 후보를 구합니다.
+
+부분 문자열 검색(기존 `tag.lower() in value.lower()` 규칙)은 전체 여행지가 아니라
+서로 다른 태그 값 목록(수백 개)만 검사하며, 결과는 검색어별로 기억해 둡니다.
+"""
+import itertools
+import threading
+
+import numpy as np
+
+from .lazy_index import LazyIndex
+
+# 색인하는 필드 (country는 정확히 일치하는 값만 조회)
+TAG_FIELDS = ('subcategories', 'subtypes', 'country')
+
+# 필드별로 기억해 둘 부분 문자열 검색 결과의 최대 개수
+MAX_SUBSTRING_CACHE = 4096
+
+
+def _empty_ids():
+    return np.zeros(0, dtype=np.int64)
+
+
+class TagIndex:
+    """
+    필드별 태그 값 → 정렬된 위치 ID 배열 색인
+    """
+
+    def __init__(self, postings):
+        # postings[field][태그 값] = 정렬된 위치 ID 배열
+        self.postings = postings
+        # 소문자 태그 값 → 그 값을 가진 (원래 표기) 태그 목록 (부분 문자열 검색용)
+        self._lower_values = {
+            field: self._group_lower(values) for field, values in postings.items()
+        }
+        self._substring_cache = {field: {} for field in postings}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _group_lower(values):
+        groups = {}
+        for value in values:
+            if isinstance(value, str):
+                groups.setdefault(value.lower(), []).append(value)
+        return sorted(groups.items())
+
+    @classmethod
+    def build(cls, rows):
+        """
+        (필드, 태그 값, 위치 ID) 목록으로 색인을 구축합니다.
+        """
+        postings = {field: {} for field in TAG_FIELDS}
+        for field, value, location_id in rows:
+            postings[field].setdefault(value, []).append(location_id)
+
+        return cls({
+            field: {tag: np.unique(np.asarray(ids, dtype=np.int64)) for tag, ids in values.items()}
+            for field, values in postings.items()
+        })
+
+    def exact(self, field, tags):
+        """태그 중 하나와 정확히 일치하는 값을 가진 여행지 ID (정렬된 배열)"""
+        values = self.postings[field]
+        arrays = [values[tag] for tag in tags if isinstance(tag, str) and tag in values]
+        return self._union(arrays)
+
+    def contains(self, field, text):
+        """text를 대소문자 구분 없이 포함하는 태그 값을 가진 여행지 ID (정렬된 배열)"""
+        needle = text.lower()
+        cache = self._substring_cache[field]
+        ids = cache.get(needle)
+        if ids is not None:
+            return ids
+
+        tags = [
+            tag
+            for lowered, originals in self._lower_values[field] if needle in lowered
+            for tag in originals
+        ]
+        ids = self.exact(field, tags)
+        with self._lock:
+            if len(cache) >= MAX_SUBSTRING_CACHE:
+                cache.clear()
+            cache[needle] = ids
+        return ids
+
+    def contains_any(self, field, texts):
+        """texts 중 하나라도 포함하는 태그 값을 가진 여행지 ID의 합집합 (정렬된 배열)"""
+        return self._union([self.contains(field, text) for text in texts if isinstance(text, str)])
+
+    @staticmethod
+    def _union(arrays):
+        arrays = [array for array in arrays if len(array)]
+        if not arrays:
+            return _empty_ids()
+        if len(arrays) == 1:
+            return arrays[0]
+        return np.unique(np.concatenate(arrays))
+
+
+def build_tag_index():
+    """
+    정규화된 태그 행과 국가 열로 태그 색인을 구축합니다. (JSON 필드를 파싱하지 않음)
+    """
+    from .models import Location, LocationTag
+
+    tag_fields = {LocationTag.KIND_SUBCATEGORY: 'subcategories', LocationTag.KIND_SUBTYPE: 'subtypes'}
+    tag_rows = (
+        (tag_fields[kind], value, location_id)
+        for kind, value, location_id in
+        LocationTag.objects.values_list('kind', 'value', 'location_id').iterator(chunk_size=5000)
+    )
+    country_rows = (
+        ('country', country, location_id)
+        for location_id, country in
+        Location.objects.exclude(country__isnull=True).exclude(country='')
+        .values_list('id', 'country').iterator(chunk_size=5000)
+    )
+    return TagIndex.build(itertools.chain(tag_rows, country_rows))
+
+
+# 싱글톤 태그 색인 (여행지가 변경되면 다음 조회 시 다시 구축)
+tag_index = LazyIndex(build_tag_index)
@@ -1,3 +1,213 @@
-from django.test import TestCase
+import os
+import tempfile
+import zlib
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .models import Location, Review, ReviewAnalysisJob
+from .review_jobs import claim_jobs, enqueue_review_analysis, process_jobs
+from .review_utils import review_content_hash
+from .vector_store import KEEP_GENERATIONS, EmbeddingStore, normalize_rows
+
+
+def _resolved(result=None, error=None):
+    future = Future()
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+    return future
+
+
+class ReviewJobQueueTests(TestCase):
+    """리뷰 분석 작업 큐 (review_jobs) 테스트"""
+
+    def setUp(self):
+        user = get_user_model().objects.create(username='tester', email='tester@example.com')
+        # bulk_create는 save()/시그널을 거치지 않으므로 저장 시 감정 분석이 실행되지 않음
+        location = Location.objects.bulk_create([Location(name='테스트 여행지')])[0]
+        self.review = Review.objects.bulk_create([
+            Review(user=user, location=location, content='풍경이 정말 아름다웠어요', rating=5)
+        ])[0]
+        enqueue_review_analysis(self.review)
+
+    def _job(self):
+        return ReviewAnalysisJob.objects.get(review=self.review)
+
+    def _process(self, jobs, worker_id, max_attempts=3, sentiment=('POSITIVE', 0.9), error=None):
+        future = _resolved(sentiment, error)
+        with mock.patch('destinations.review_jobs.nlp_processor.analyze_sentiment_async', return_value=future) as analyze, \
+                mock.patch('destinations.review_jobs.extract_keywords', return_value=['풍경']):
+            stats = process_jobs(jobs, worker_id, max_attempts=max_attempts)
+        return stats, analyze
+
+    def test_claim_skips_active_lease_and_reclaims_expired_one(self):
+        """임대 중인 작업은 다른 워커가 가져가지 못하고, 임대 시간이 지나면 다시 가져감"""
+        self.assertEqual(len(claim_jobs('worker-1', lease_seconds=300)), 1)
+        self.assertEqual(claim_jobs('worker-2', lease_seconds=300), [])
+
+        ReviewAnalysisJob.objects.filter(pk=self._job().pk).update(
+            locked_at=timezone.now() - timedelta(seconds=301)
+        )
+        jobs = claim_jobs('worker-2', lease_seconds=300)
+
+        self.assertEqual(len(jobs), 1)
+        job = self._job()
+        self.assertEqual(job.status, ReviewAnalysisJob.STATUS_RUNNING)
+        self.assertEqual(job.locked_by, 'worker-2')
+        self.assertEqual(job.attempts, 2)
+
+    def test_reenqueued_job_is_not_marked_done(self):
+        """처리 도중 리뷰 내용이 바뀌어 다시 대기열에 들어간 작업은 완료로 표시하지 않음"""
+        jobs = claim_jobs('worker-1')
+
+        self.review.content = '다시 가보니 너무 붐볐어요'
+        Review.objects.filter(pk=self.review.pk).update(content=self.review.content)
+        enqueue_review_analysis(self.review)
+
+        self._process(jobs, 'worker-1')
+
+        job = self._job()
+        self.assertEqual(job.status, ReviewAnalysisJob.STATUS_PENDING)
+        self.assertIsNone(job.locked_by)
+        self.assertEqual(job.content_hash, review_content_hash(self.review.content))
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        """분석이 실패하면 대기 상태로 되돌리고, 최대 시도 횟수에 도달하면 실패로 표시"""
+        for attempt in range(1, 3):
+            jobs = claim_jobs('worker-1')
+            self.assertEqual(len(jobs), 1)
+            with self.assertLogs('destinations.review_jobs', level='ERROR'):
+                stats, _ = self._process(jobs, 'worker-1', max_attempts=2, error=RuntimeError('model error'))
+            self.assertEqual(stats['failed'], 1)
+
+            job = self._job()
+            self.assertEqual(job.attempts, attempt)
+            self.assertIsNone(job.locked_by)
+            self.assertEqual(job.error, 'model error')
+
+        self.assertEqual(job.status, ReviewAnalysisJob.STATUS_FAILED)
+        self.assertEqual(claim_jobs('worker-1'), [])
+
+    def test_skips_review_already_analyzed_with_current_content(self):
+        """분석 결과가 현재 내용의 해시와 같으면 다시 분석하지 않고 완료로 표시"""
+        Review.objects.filter(pk=self.review.pk).update(analysis_hash=review_content_hash(self.review.content))
+        jobs = claim_jobs('worker-1')
+
+        stats, analyze = self._process(jobs, 'worker-1')
+
+        analyze.assert_not_called()
+        self.assertEqual(stats, {'analyzed': 0, 'skipped': 1, 'failed': 0})
+        self.assertEqual(self._job().status, ReviewAnalysisJob.STATUS_DONE)
+
+    def test_analyzes_changed_review(self):
+        """분석 결과를 기록하고 작업을 완료로 표시"""
+        stats, analyze = self._process(claim_jobs('worker-1'), 'worker-1')
+
+        analyze.assert_called_once_with(self.review.content)
+        self.assertEqual(stats, {'analyzed': 1, 'skipped': 0, 'failed': 0})
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.sentiment, 'POSITIVE')
+        self.assertEqual(self.review.analysis_hash, review_content_hash(self.review.content))
+        self.assertEqual(self._job().status, ReviewAnalysisJob.STATUS_DONE)
+
+
+class EmbeddingStoreSyncTests(SimpleTestCase):
+    """임베딩 저장소 (vector_store.EmbeddingStore) 동기화 테스트"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.encoded_texts = []
+
+    def _encode(self, texts):
+        self.encoded_texts.extend(texts)
+        return np.stack([
+            np.random.default_rng(zlib.crc32(text.encode('utf-8'))).standard_normal(8).astype(np.float32)
+            for text in texts
+        ])
+
+    def _store(self, model_name='model-a'):
+        return EmbeddingStore(self.directory, name='test', model_name=model_name)
+
+    def _sync(self, store, rows):
+        self.encoded_texts = []
+        ids = [location_id for location_id, _ in rows]
+        texts = [text for _, text in rows]
+        return np.asarray(store.sync(ids, texts, self._encode))
+
+    def test_unchanged_rows_are_reused_without_encoding(self):
+        """텍스트가 그대로면 새 프로세스(새 저장소 객체)에서도 다시 임베딩하지 않음"""
+        rows = [(1, '서울 궁궐'), (2, '부산 해변'), (3, '제주 오름')]
+        first_store = self._store()
+        first = self._sync(first_store, rows)
+
+        store = self._store()
+        second = self._sync(store, rows)
+
+        self.assertEqual(self.encoded_texts, [])
+        self.assertEqual(store.last_sync['reused'], 3)
+        self.assertEqual(store.last_sync['encoded'], 0)
+        # 변경이 없으면 새 세대를 만들지 않음
+        self.assertEqual(store.generation, first_store.generation)
+        np.testing.assert_array_equal(first, second)
+
+    def test_only_changed_and_new_rows_are_encoded(self):
+        """텍스트가 바뀐 행과 새 행만 임베딩하고 나머지는 기존 벡터를 복사"""
+        first = self._sync(self._store(), [(1, '서울 궁궐'), (2, '부산 해변'), (3, '제주 오름')])
+
+        store = self._store()
+        second = self._sync(store, [(1, '서울 궁궐'), (2, '부산 야경'), (3, '제주 오름'), (4, '강릉 커피')])
+
+        self.assertEqual(sorted(self.encoded_texts), ['강릉 커피', '부산 야경'])
+        self.assertEqual(store.last_sync['rows'], 4)
+        self.assertEqual(store.last_sync['reused'], 2)
+        self.assertEqual(store.last_sync['encoded'], 2)
+        np.testing.assert_array_equal(second[[0, 2]], first[[0, 2]])
+        np.testing.assert_allclose(second[1], normalize_rows(self._encode(['부산 야경']))[0])
+
+    def test_reordered_ids_reuse_rows_in_new_order(self):
+        """ID 순서가 바뀌면 임베딩 없이 새 순서로 행을 재배열"""
+        first = self._sync(self._store(), [(1, '서울 궁궐'), (2, '부산 해변'), (3, '제주 오름')])
+
+        store = self._store()
+        second = self._sync(store, [(3, '제주 오름'), (1, '서울 궁궐'), (2, '부산 해변')])
+
+        self.assertEqual(self.encoded_texts, [])
+        np.testing.assert_array_equal(second, first[[2, 0, 1]])
+        np.testing.assert_array_equal(store.ids, [3, 1, 2])
+
+    def test_store_built_with_other_model_is_not_reused(self):
+        """다른 모델로 만든 저장소는 불러오지 않고 모든 행을 다시 임베딩"""
+        rows = [(1, '서울 궁궐'), (2, '부산 해변')]
+        self._sync(self._store('model-a'), rows)
+
+        store = self._store('model-b')
+        self.assertFalse(store.load())
+        self._sync(store, rows)
+
+        self.assertEqual(sorted(self.encoded_texts), ['부산 해변', '서울 궁궐'])
+        self.assertEqual(store.last_sync['reused'], 0)
+        self.assertTrue(self._store('model-b').load())
+        self.assertFalse(self._store('model-a').load())
+
+    def test_cleanup_keeps_recent_generations_and_current(self):
+        """오래된 세대는 지우고 현재 세대를 포함해 최근 세대만 남김"""
+        store = self._store()
+        for version in range(KEEP_GENERATIONS + 3):
+            self._sync(store, [(1, f'서울 궁궐 {version}'), (2, '부산 해변')])
+
+        generations = [entry for entry in os.listdir(self.directory) if entry.startswith('test-')]
+        self.assertEqual(len(generations), KEEP_GENERATIONS)
+        self.assertIn(f'test-{store.generation}', generations)
+
+        reloaded = self._store()
+        self.assertTrue(reloaded.load())
+        self.assertEqual(reloaded.generation, store.generation)
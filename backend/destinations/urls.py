@@ -12,6 +12,11 @@ urlpatterns = [
     path('<int:pk>/', views.get_location_detail, name='get_location_detail'),
     path('tag/<str:tag>/', views.get_locations_by_tag, name='get_locations_by_tag'),
     path('search/nlp/', views.search_destinations_nlp, name='search_destinations_nlp'),
+    path('search/nlp/batch/', views.search_destinations_nlp_batch, name='search_destinations_nlp_batch'),
+    path('nlp/ready/', views.nlp_readiness, name='nlp_readiness'),
+    path('nlp/review-queue/', views.review_analysis_queue, name='review_analysis_queue'),
+    path('nlp/cache-stats/', views.nlp_cache_stats, name='nlp_cache_stats'),
+    path('nlp/timings/', views.nlp_timing_stats, name='nlp_timing_stats'),
     
     # 좋아요 및 리뷰 API
     path('', include(router.urls)),
@@ -0,0 +1,249 @@
+"""
+메모리 맵 기반 여행지 임베딩 저장소
+
+여행지 ID별로 임베딩 벡터 하나와 해당 벡터를 만든 텍스트의 해시를 디스크에 저장합니다.
+벡터 파일은 numpy.memmap(읽기 전용)으로 열리므로 같은 서버의 모든 워커가
+페이지 캐시의 동일한 사본을 공유하고, 워커를 재시작해도 다시 임베딩하지 않습니다.
+
+디렉토리 구조:
+    <name>.current          현재 세대 디렉토리 이름 (원자적으로 교체)
+    <name>-<세대>/vectors.npy  정규화된 float32 (N, d) 행렬
+    <name>-<세대>/ids.npy      int64 위치 ID (행 정렬)
+    <name>-<세대>/hashes.npy   uint64 텍스트 해시 (행 정렬)
+    <name>-<세대>/meta.json    모델 이름, 차원, 행 수
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+# 한 번에 읽고 쓰는 행 수 (대용량 카탈로그에서 메모리 사용량 제한)
+CHUNK_ROWS = 65536
+
+# 유지할 이전 세대 수 (이전 세대를 아직 매핑 중인 워커를 위해)
+KEEP_GENERATIONS = 2
+
+
+def text_hash(text):
+    """임베딩 텍스트의 64비트 해시를 반환합니다."""
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def normalize_rows(matrix):
+    """행 단위 L2 정규화 (0 벡터는 그대로 유지)"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingStore:
+    """
+    위치 ID와 텍스트 해시로 관리되는 영속 임베딩 저장소
+    """
+
+    def __init__(self, directory, name='destinations', model_name=None):
+        self.directory = str(directory)
+        self.name = name
+        self.model_name = model_name
+
+        self.vectors = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.generation = None
+
+        # 마지막 동기화 통계
+        self.last_sync = {}
+
+    @property
+    def pointer_path(self):
+        return os.path.join(self.directory, f"{self.name}.current")
+
+    @property
+    def lock_path(self):
+        return os.path.join(self.directory, f"{self.name}.lock")
+
+    def _generation_dir(self, generation):
+        return os.path.join(self.directory, f"{self.name}-{generation}")
+
+    @contextmanager
+    def write_lock(self):
+        """여러 워커가 동시에 저장소를 갱신하지 않도록 파일 잠금을 사용합니다."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        """
+        현재 세대를 읽기 전용 메모리 맵으로 엽니다.
+
+        Returns:
+            bool: 사용 가능한 저장소를 열었는지 여부
+        """
+        try:
+            with open(self.pointer_path) as f:
+                generation = f.read().strip()
+        except FileNotFoundError:
+            return False
+
+        if generation == self.generation and self.vectors is not None:
+            return True
+
+        path = self._generation_dir(generation)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                meta = json.load(f)
+            if self.model_name and meta.get('model') != self.model_name:
+                # 다른 모델로 만든 벡터는 재사용할 수 없음
+                return False
+
+            self.vectors = np.load(os.path.join(path, 'vectors.npy'), mmap_mode='r')
+            self.ids = np.load(os.path.join(path, 'ids.npy'))
+            self.hashes = np.load(os.path.join(path, 'hashes.npy'))
+            self.generation = generation
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def sync(self, ids, texts, encode_fn):
+        """
+        주어진 여행지 목록과 저장소를 동기화합니다.
+        텍스트 해시가 바뀌었거나 새로 추가된 행만 다시 임베딩합니다.
+
+        Args:
+            ids: 위치 ID 목록 (결과 행 순서)
+            texts: 위치별 임베딩 텍스트 목록
+            encode_fn: 텍스트 목록을 (n, d) 행렬로 변환하는 함수
+
+        Returns:
+            np.ndarray: ids 순서와 정렬된 읽기 전용 (N, d) 메모리 맵 행렬
+        """
+        start_time = time.time()
+        new_ids = np.asarray(ids, dtype=np.int64)
+        new_hashes = np.fromiter((text_hash(t) for t in texts), dtype=np.uint64, count=len(texts))
+
+        with self.write_lock():
+            # 다른 워커가 이미 갱신했을 수 있으므로 잠금 안에서 다시 읽음
+            self.load()
+            reuse_mask, source_rows = self._match(new_ids, new_hashes)
+
+            unchanged = (
+                self.vectors is not None
+                and len(new_ids) == len(self.ids)
+                and bool(reuse_mask.all())
+                and np.array_equal(source_rows, np.arange(len(new_ids)))
+            )
+            encoded = 0
+            if not unchanged:
+                encoded = self._write_generation(new_ids, new_hashes, texts, reuse_mask, source_rows, encode_fn)
+
+        self.last_sync = {
+            'rows': int(len(new_ids)),
+            'reused': int(reuse_mask.sum()),
+            'encoded': int(encoded),
+            'seconds': round(time.time() - start_time, 3),
+        }
+        return self.vectors
+
+    def _match(self, new_ids, new_hashes):
+        """새 행마다 재사용 가능한 기존 행 번호를 찾습니다."""
+        reuse_mask = np.zeros(len(new_ids), dtype=bool)
+        source_rows = np.full(len(new_ids), -1, dtype=np.int64)
+        if self.vectors is None or len(self.ids) == 0 or len(new_ids) == 0:
+            return reuse_mask, source_rows
+
+        order = np.argsort(self.ids, kind='stable')
+        sorted_ids = self.ids[order]
+        pos = np.clip(np.searchsorted(sorted_ids, new_ids), 0, len(sorted_ids) - 1)
+        candidates = order[pos]
+
+        reuse_mask = (self.ids[candidates] == new_ids) & (self.hashes[candidates] == new_hashes)
+        source_rows[reuse_mask] = candidates[reuse_mask]
+        return reuse_mask, source_rows
+
+    def _write_generation(self, new_ids, new_hashes, texts, reuse_mask, source_rows, encode_fn):
+        """새 세대 디렉토리를 만들고 포인터를 원자적으로 교체합니다."""
+        # 같은 밀리초에 다시 동기화해도 현재 세대 디렉토리를 덮어쓰지 않도록 임의값을 붙임
+        generation = f"{int(time.time() * 1000)}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        path = self._generation_dir(generation)
+        os.makedirs(path, exist_ok=True)
+
+        missing_rows = np.flatnonzero(~reuse_mask)
+        dimension = self.vectors.shape[1] if self.vectors is not None else None
+
+        # 차원을 모르면 첫 번째 청크를 먼저 임베딩하여 결정
+        pending = None
+        if dimension is None and len(missing_rows):
+            first = missing_rows[:CHUNK_ROWS]
+            pending = (first, normalize_rows(encode_fn([texts[i] for i in first])))
+            dimension = pending[1].shape[1]
+        if dimension is None:
+            dimension = 1
+
+        out = np.lib.format.open_memmap(
+            os.path.join(path, 'vectors.npy'), mode='w+', dtype=np.float32,
+            shape=(len(new_ids), dimension)
+        )
+
+        # 재사용 행 복사 (청크 단위)
+        reuse_rows = np.flatnonzero(reuse_mask)
+        for start in range(0, len(reuse_rows), CHUNK_ROWS):
+            rows = reuse_rows[start:start + CHUNK_ROWS]
+            out[rows] = self.vectors[source_rows[rows]]
+
+        # 변경/신규 행 임베딩
+        encoded = 0
+        if pending is not None:
+            out[pending[0]] = pending[1]
+            encoded += len(pending[0])
+            missing_rows = missing_rows[len(pending[0]):]
+        for start in range(0, len(missing_rows), CHUNK_ROWS):
+            rows = missing_rows[start:start + CHUNK_ROWS]
+            out[rows] = normalize_rows(encode_fn([texts[i] for i in rows]))
+            encoded += len(rows)
+
+        out.flush()
+        del out
+
+        np.save(os.path.join(path, 'ids.npy'), new_ids)
+        np.save(os.path.join(path, 'hashes.npy'), new_hashes)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'model': self.model_name, 'dimension': int(dimension), 'rows': int(len(new_ids))}, f)
+
+        tmp_pointer = self.pointer_path + '.tmp'
+        with open(tmp_pointer, 'w') as f:
+            f.write(generation)
+        os.replace(tmp_pointer, self.pointer_path)
+
+        self.load()
+        self._cleanup_generations()
+        return encoded
+
+    def _cleanup_generations(self):
+        """오래된 세대 디렉토리를 정리합니다."""
+        prefix = f"{self.name}-"
+        generations = sorted(
+            (entry for entry in os.listdir(self.directory)
+             if entry.startswith(prefix) and os.path.isdir(os.path.join(self.directory, entry))),
+            key=lambda entry: os.path.getmtime(os.path.join(self.directory, entry)),
+        )
+        for entry in generations[:-KEEP_GENERATIONS]:
+            if entry != f"{prefix}{self.generation}":
+                shutil.rmtree(os.path.join(self.directory, entry), ignore_errors=True)
@@ -6,13 +6,14 @@ from destinations.serializers import (
     LocationSerializer, LocationDetailSerializer, 
     LikeSerializer, ReviewSerializer
 )
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from django.shortcuts import render, get_object_or_404
+from django.http import StreamingHttpResponse
 import json
+import base64
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 import urllib.parse
-from django.db import connection
 from .nlp_utils import nlp_processor
 from .review_utils import find_similar_destinations
 from collections import Counter
@@ -21,7 +22,17 @@ from rest_framework.views import APIView
 from django.db import models
 import time
 import random  # 무작위성 추가를 위한 random 모듈 추가
+import numpy as np
+import logging
 from django.db.models import Count
+from .instrumentation import SampledLogger, current_timings, span, timing_histograms
+from .result_cache import hydrate_results
+from .location_tags import first_subcategories, first_subcategory_location_ids
+from .tag_index import tag_index
+
+logger = logging.getLogger(__name__)
+# 요청마다 실행되는 검색/추천 경로의 debug/info 로그는 샘플링하여 기록
+search_log = SampledLogger(logger)
 
 # ✅ 모든 여행지 목록 조회
 class LocationListView(generics.ListAPIView):
@@ -66,80 +77,62 @@ def get_locations_by_tag(request, tag):
     try:
         # URL 디코딩
         decoded_tag = urllib.parse.unquote(tag)
-        print(f"태그 검색: {decoded_tag}")
-        
-        # 정확한 subcategory0 기반으로 여행지 검색
-        with connection.cursor() as cursor:
-            # 유효한 subcategory0 목록 가져오기
-            cursor.execute("""
-                SELECT DISTINCT json_extract(subcategories, '$[0]') AS first_subcategory
-                FROM destinations_location
-                WHERE json_extract(subcategories, '$[0]') IS NOT NULL
-                ORDER BY first_subcategory;
-            """)
-            valid_tags = [row[0] for row in cursor.fetchall() if row[0]]
-            
-            # 디버깅: 모든 유효한 태그 출력
-            print("유효한 태그 목록:")
-            for i, vtag in enumerate(valid_tags):
-                print(f"{i+1}. {vtag}")
-            
-            # 태그 이름 정규화 (특수 문자 처리)
-            normalized_tag = None
+        search_log.info("태그 검색: %s", decoded_tag)
+        
+        # 정확한 subcategory0 기반으로 여행지 검색 (LocationTag 인덱스 조회)
+        # 유효한 subcategory0 목록 가져오기
+        valid_tags = first_subcategories()
+        
+        # 디버깅: 모든 유효한 태그 출력 (debug 레벨, 한 줄)
+        search_log.debug("유효한 태그 목록 (%d개): %s", len(valid_tags), ', '.join(valid_tags))
+        
+        # 태그 이름 정규화 (특수 문자 처리)
+        normalized_tag = None
+        
+        # 정확히 일치하는 태그 찾기
+        if decoded_tag in valid_tags:
+            normalized_tag = decoded_tag
+        else:
+            # 대소문자 무시하고 비교
+            for valid_tag in valid_tags:
+                if valid_tag.lower() == decoded_tag.lower():
+                    normalized_tag = valid_tag
+                    break
             
-            # 정확히 일치하는 태그 찾기
-            if decoded_tag in valid_tags:
-                normalized_tag = decoded_tag
-            else:
-                # 대소문자 무시하고 비교
+            # 특수 문자 처리하여 비교
+            if not normalized_tag:
                 for valid_tag in valid_tags:
-                    if valid_tag.lower() == decoded_tag.lower():
+                    # '&'와 'and' 변환 비교
+                    if valid_tag.replace('&', 'and').lower() == decoded_tag.lower() or \
+                       decoded_tag.replace('and', '&').lower() == valid_tag.lower():
                         normalized_tag = valid_tag
                         break
-                
-                # 특수 문자 처리하여 비교
-                if not normalized_tag:
-                    for valid_tag in valid_tags:
-                        # '&'와 'and' 변환 비교
-                        if valid_tag.replace('&', 'and').lower() == decoded_tag.lower() or \
-                           decoded_tag.replace('and', '&').lower() == valid_tag.lower():
-                            normalized_tag = valid_tag
-                            break
-            
-            if not normalized_tag:
-                print(f"유효하지 않은 태그: {decoded_tag}")
-                
-                # 가장 유사한 태그 찾기 (부분 일치)
-                similar_tags = []
-                for valid_tag in valid_tags:
-                    if decoded_tag.lower() in valid_tag.lower() or valid_tag.lower() in decoded_tag.lower():
-                        similar_tags.append(valid_tag)
-                
-                if similar_tags:
-                    print(f"유사한 태그: {similar_tags}")
-                    normalized_tag = similar_tags[0]  # 첫 번째 유사한 태그 사용
-                else:
-                    return Response({"error": f"유효하지 않은 태그입니다: {decoded_tag}"}, status=status.HTTP_400_BAD_REQUEST)
-            
-            print(f"정규화된 태그: {normalized_tag}")
-            
-            # 첫 번째 서브카테고리가 태그와 일치하는 여행지 검색
-            cursor.execute("""
-                SELECT id, name
-                FROM destinations_location
-                WHERE json_extract(subcategories, '$[0]') = %s
-                LIMIT 20
-            """, [normalized_tag])
+        
+        if not normalized_tag:
+            search_log.debug("유효하지 않은 태그: %s", decoded_tag)
             
-            matching_rows = cursor.fetchall()
-            matching_ids = [row[0] for row in matching_rows]
+            # 가장 유사한 태그 찾기 (부분 일치)
+            similar_tags = []
+            for valid_tag in valid_tags:
+                if decoded_tag.lower() in valid_tag.lower() or valid_tag.lower() in decoded_tag.lower():
+                    similar_tags.append(valid_tag)
             
-            print(f"첫 번째 서브카테고리가 '{normalized_tag}'인 여행지: {len(matching_ids)}개")
-            for row in matching_rows[:5]:  # 처음 5개만 출력
-                print(f"일치하는 여행지 - ID: {row[0]}, 이름: {row[1]}")
+            if similar_tags:
+                search_log.debug("유사한 태그: %s", similar_tags)
+                normalized_tag = similar_tags[0]  # 첫 번째 유사한 태그 사용
+            else:
+                return Response({"error": f"유효하지 않은 태그입니다: {decoded_tag}"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        search_log.debug("정규화된 태그: %s", normalized_tag)
+        
+        # 첫 번째 서브카테고리가 태그와 일치하는 여행지 검색
+        matching_ids = first_subcategory_location_ids(normalized_tag, limit=20)
+        
+        search_log.debug("첫 번째 서브카테고리가 '%s'인 여행지: %s개", normalized_tag, len(matching_ids))
+        search_log.debug("일치하는 여행지 ID: %s", matching_ids[:5])  # 처음 5개만 출력
         
         if not matching_ids:
-            print(f"태그 '{normalized_tag}'에 해당하는 여행지가 없습니다.")
+            search_log.debug("태그 '%s'에 해당하는 여행지가 없습니다.", normalized_tag)
             return Response({"tag": decoded_tag, "destinations": []}, status=status.HTTP_200_OK)
         
         # 일치하는 여행지 가져오기
@@ -152,9 +145,118 @@ def get_locations_by_tag(request, tag):
         }, status=status.HTTP_200_OK)
         
     except Exception as e:
-        print(f"태그 검색 중 오류 발생: {str(e)}")
+        logger.exception("태그 검색 중 오류 발생")
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def nlp_readiness(request):
+    """
+    NLP 모델/검색 인덱스 준비 상태 확인 API (로드 밸런서 헬스 체크용)
+    예열 모드에서는 예열이 끝나기 전까지 503을 반환합니다.
+    """
+    from django.conf import settings
+    from .warmup import model_warmup
+    
+    warmup_enabled = getattr(settings, 'NLP_WARMUP_ON_STARTUP', False)
+    status_data = model_warmup.status()
+    status_data['warmup_enabled'] = warmup_enabled
+    status_data['ready'] = model_warmup.is_ready or not warmup_enabled
+    
+    http_status = status.HTTP_200_OK if status_data['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE
+    return Response(status_data, status=http_status)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def review_analysis_queue(request):
+    """리뷰 분석 작업 큐 상태 (대기 작업 수, 가장 오래 기다린 작업의 대기 시간)"""
+    from .review_jobs import queue_stats
+    return Response(queue_stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def nlp_cache_stats(request):
+    """검색/임베딩/감정 분석 캐시 통계와 검색어 정규화 효과 (원본 대비 표준형 키 수)"""
+    return Response(nlp_processor.cache_stats())
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAdminUser])
+def nlp_timing_stats(request):
+    """검색 단계별 소요 시간 히스토그램 (프로세스 단위, DELETE로 초기화, 관리자 전용)"""
+    if request.method == 'DELETE':
+        timing_histograms.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(timing_histograms.stats())
+
+def _encode_search_cursor(query, offset):
+    """검색어와 시작 위치를 불투명한 커서 문자열로 변환합니다."""
+    payload = json.dumps({"q": query, "o": offset}, ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def _decode_search_cursor(cursor, query):
+    """커서에서 시작 위치를 꺼냅니다. 형식이 잘못되었거나 다른 검색어의 커서이면 None"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        offset = int(payload["o"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if payload.get("q") != query or offset < 0:
+        return None
+    return offset
+
+def _format_search_results(search_results):
+    """[(Location, 유사도)]를 응답 형식으로 변환합니다."""
+    formatted_results = []
+    with span('serialize'):
+        for location, similarity in search_results:
+            formatted_results.append({
+                "id": location.id,
+                "name": location.name,
+                "description": location.description,
+                "category": location.category,
+                "subcategories": location.subcategories,
+                "subtypes": location.subtypes,
+                "image": location.image,
+                "city": location.city,
+                "country": location.country,
+                "similarity_score": float(similarity)  # numpy float를 Python float로 변환
+            })
+    return formatted_results
+
+def _search_page(query, limit, offset, search_results):
+    """limit + 1개로 검색한 결과를 한 페이지 응답으로 만듭니다. (초과분으로 다음 페이지 존재 여부 판단)"""
+    has_more = len(search_results) > limit and offset + limit < nlp_processor.rank_depth()
+    formatted_results = _format_search_results(search_results[:limit])
+    next_offset = offset + limit if has_more else None
+    return {
+        "query": query,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more,
+        "next_offset": next_offset,
+        "next_cursor": _encode_search_cursor(query, next_offset) if has_more else None,
+        "results_count": len(formatted_results),
+        "results": formatted_results
+    }
+
+def _stream_search_events(query, destinations, limit, offset, use_sse):
+    """
+    스트리밍 검색 이벤트 (NDJSON 한 줄 또는 SSE 이벤트 하나씩)
+    중간 단계는 {"stage", "results"}만, 마지막 'final' 이벤트는 일반 검색 응답과 같은 형식입니다.
+    """
+    start_time = time.time()
+    for stage, search_results in nlp_processor.stream_search(query, destinations, top_n=limit + 1, offset=offset):
+        if stage == 'final':
+            payload = _search_page(query, limit, offset, search_results)
+            payload["timings"] = current_timings()
+        else:
+            payload = {"query": query, "results": _format_search_results(search_results[:limit])}
+        payload["stage"] = stage
+        payload["elapsed_ms"] = round((time.time() - start_time) * 1000, 1)
+        
+        data = json.dumps(payload, ensure_ascii=False)
+        yield f"event: {stage}\ndata: {data}\n\n" if use_sse else data + "\n"
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def search_destinations_nlp(request):
@@ -164,7 +266,12 @@ def search_destinations_nlp(request):
     매개변수:
     - query: 검색어
     - limit: 반환할 결과 개수 (기본값: 20, 최대: 200)
+    - offset: 건너뛸 결과 개수 (기본값: 0)
+    - cursor: 이전 응답의 next_cursor (지정하면 offset 대신 사용)
     - retry: 재시도 여부 (True인 경우 캐시를 무시하고 새로 검색)
+    - stream: 1이면 결과를 단계별로 스트리밍 (NDJSON, stream=sse 또는 Accept: text/event-stream이면 SSE)
+    
+    같은 검색어의 순위는 한 번만 계산되므로, limit/offset이 달라도 캐시된 순위 목록에서 잘라서 반환합니다.
     """
     try:
         query = request.query_params.get('query', '')
@@ -178,11 +285,25 @@ def search_destinations_nlp(request):
             limit = max(5, min(limit, 200))
         except ValueError:
             limit = 20
+        
+        # 시작 위치 처리 (커서가 있으면 커서 우선)
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            offset = _decode_search_cursor(cursor, query)
+            if offset is None:
+                return Response({"error": "유효하지 않은 cursor입니다."}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            try:
+                offset = max(0, int(request.query_params.get('offset', 0)))
+            except ValueError:
+                offset = 0
+        # 캐시된 순위 목록 범위를 넘는 페이지는 제공하지 않음
+        offset = min(offset, nlp_processor.rank_depth())
             
         # 재시도 여부 확인
         retry = request.query_params.get('retry', 'false').lower() == 'true'
         
-        print(f"NLP 검색 쿼리: {query}, 결과 제한: {limit}개, 재시도: {retry}")
+        search_log.info("NLP 검색 쿼리: %s, 결과 제한: %s개, 시작 위치: %s, 재시도: %s", query, limit, offset, retry)
         
         # 모든 여행지 가져오기
         all_locations = Location.objects.all()
@@ -190,42 +311,94 @@ def search_destinations_nlp(request):
         # NLP 검색 수행 (재시도 시 캐시 무시)
         if retry:
             # 캐시 키 생성
-            cache_key = f"{query}:{limit}"
+            cache_key = nlp_processor.search_cache_key(query)
             # 캐시에서 해당 키 제거
             from .nlp_utils import search_cache
-            if search_cache.get(cache_key):
-                search_cache.cache.pop(cache_key, None)
-                search_cache.timestamps.pop(cache_key, None)
-                print(f"캐시 항목 제거: {cache_key}")
+            if search_cache.invalidate(cache_key):
+                search_log.debug("캐시 항목 제거: %s", cache_key)
         
-        # NLP 검색 수행
-        search_results = nlp_processor.search_destinations(query, all_locations, top_n=limit)
+        # 스트리밍 모드: 키워드 결과 → 임베딩 중간 결과 → 최종 결과 순서로 전송
+        stream = request.query_params.get('stream', '').lower()
+        if stream in ('1', 'true', 'sse'):
+            # ?format=은 DRF 콘텐츠 협상에 쓰이므로 SSE는 stream=sse 또는 Accept 헤더로 선택
+            use_sse = stream == 'sse' or 'text/event-stream' in request.META.get('HTTP_ACCEPT', '')
+            response = StreamingHttpResponse(
+                _stream_search_events(query, all_locations, limit, offset, use_sse),
+                content_type='text/event-stream' if use_sse else 'application/x-ndjson',
+            )
+            response['Cache-Control'] = 'no-cache'
+            # 프록시(nginx)가 응답을 모아서 보내지 않도록 함
+            response['X-Accel-Buffering'] = 'no'
+            return response
         
-        # 결과 포맷팅
-        formatted_results = []
-        for location, similarity in search_results:
-            formatted_results.append({
-                "id": location.id,
-                "name": location.name,
-                "description": location.description,
-                "category": location.category,
-                "subcategories": location.subcategories,
-                "subtypes": location.subtypes,
-                "image": location.image,
-                "city": location.city,
-                "country": location.country,
-                "similarity_score": float(similarity)  # numpy float를 Python float로 변환
-            })
+        # NLP 검색 수행 (다음 페이지 존재 여부 확인을 위해 1개 더 요청)
+        search_results = nlp_processor.search_destinations(query, all_locations, top_n=limit + 1, offset=offset)
+        response_data = _search_page(query, limit, offset, search_results)
+        # 검색 단계별 소요 시간(ms)
+        response_data["timings"] = current_timings()
+        return Response(response_data, status=status.HTTP_200_OK)
+    
+    except Exception as e:
+        logger.exception("NLP 검색 중 오류 발생")
+        return Response(
+            {"error": f"검색 중 오류가 발생했습니다: {str(e)}"},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def search_destinations_nlp_batch(request):
+    """
+    여러 검색어를 한 번에 검색하는 API
+    
+    요청 본문:
+    - queries: 검색어 목록 (최대 NLP_BATCH_MAX_QUERIES개)
+    - limit: 검색어별 반환할 결과 개수 (기본값: 20, 최대: 200)
+    - offset: 건너뛸 결과 개수 (기본값: 0)
+    
+    캐시에 없는 검색어는 임베딩 배치 한 번과 행렬 곱 한 번으로 함께 계산됩니다.
+    """
+    from django.conf import settings
+    
+    try:
+        queries = request.data.get('queries')
+        if not isinstance(queries, list) or not queries:
+            return Response({"error": "queries는 검색어 목록이어야 합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if not all(isinstance(query, str) and query.strip() for query in queries):
+            return Response({"error": "빈 검색어는 사용할 수 없습니다."}, status=status.HTTP_400_BAD_REQUEST)
+        max_queries = getattr(settings, 'NLP_BATCH_MAX_QUERIES', 32)
+        if len(queries) > max_queries:
+            return Response(
+                {"error": f"검색어는 최대 {max_queries}개까지 보낼 수 있습니다."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = max(5, min(int(request.data.get('limit', 20)), 200))
+        except (TypeError, ValueError):
+            limit = 20
+        try:
+            offset = min(max(0, int(request.data.get('offset', 0))), nlp_processor.rank_depth())
+        except (TypeError, ValueError):
+            offset = 0
+        
+        start_time = time.time()
+        batch_results = nlp_processor.search_destinations_batch(
+            queries, Location.objects.all(), top_n=limit + 1, offset=offset
+        )
         
         return Response({
-            "query": query,
             "limit": limit,
-            "results_count": len(formatted_results),
-            "results": formatted_results
+            "offset": offset,
+            "elapsed_ms": round((time.time() - start_time) * 1000, 1),
+            "results": [
+                _search_page(query, limit, offset, search_results)
+                for query, search_results in zip(queries, batch_results)
+            ]
         }, status=status.HTTP_200_OK)
     
     except Exception as e:
-        print(f"NLP 검색 중 오류 발생: {str(e)}")
+        logger.exception("NLP 배치 검색 중 오류 발생")
         return Response(
             {"error": f"검색 중 오류가 발생했습니다: {str(e)}"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -277,14 +450,14 @@ class ReviewViewSet(viewsets.ModelViewSet):
         return Review.objects.filter(user=self.request.user)
     
     def create(self, request, *args, **kwargs):
-        print("리뷰 생성 요청 받음:", request.data)
+        logger.debug("리뷰 생성 요청 받음: %s", request.data)
         
         # 요청 데이터 검증
         location_id = request.data.get('location_id')
         rating = request.data.get('rating')
         content = request.data.get('content')
         
-        print(f"위치 ID: {location_id}, 평점: {rating}, 내용: {content}")
+        logger.debug("위치 ID: %s, 평점: %s, 내용: %s", location_id, rating, content)
         
         if not location_id:
             return Response({"error": "location_id는 필수 항목입니다."}, status=status.HTTP_400_BAD_REQUEST)
@@ -301,7 +474,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
             existing_review = Review.objects.filter(user=request.user, location=location).first()
             
             if existing_review:
-                print(f"이미 리뷰가 존재합니다. 리뷰 ID: {existing_review.id}")
+                logger.info("이미 리뷰가 존재합니다. 리뷰 ID: %s", existing_review.id)
                 return Response(
                     {"error": "이미 이 여행지에 대한 리뷰를 작성했습니다. 기존 리뷰를 수정해주세요."},
                     status=status.HTTP_409_CONFLICT
@@ -315,10 +488,10 @@ class ReviewViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
-            print("리뷰 생성 성공:", serializer.data)
+            logger.info("리뷰 생성 성공: 리뷰 ID %s", serializer.data.get('id'))
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         except Exception as e:
-            print(f"리뷰 생성 중 오류 발생: {str(e)}")
+            logger.exception("리뷰 생성 중 오류 발생")
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # 여행지 추천 API
@@ -332,7 +505,7 @@ def recommend_destinations(request):
     # 무작위성을 위한 시드 설정 (현재 시간 기반)
     random.seed(time.time())
     
-    print(f"사용자 {user.username}의 맞춤 추천 시작 - 타임스탬프: {time.time()}")
+    search_log.info("사용자 %s의 맞춤 추천 시작 - 타임스탬프: %s", user.username, time.time())
     
     # 1. 사용자의 활동 데이터 수집
     likes = Like.objects.filter(user=user)
@@ -342,25 +515,25 @@ def recommend_destinations(request):
     reviews_count = reviews.count()
     total_activities = likes_count + reviews_count
     
-    print(f"사용자 활동: 좋아요 {likes_count}개, 리뷰 {reviews_count}개")
+    search_log.debug("사용자 활동: 좋아요 %s개, 리뷰 %s개", likes_count, reviews_count)
     
     # 최근 본 여행지 정보 가져오기
     recently_viewed = request.data.get('recently_viewed', [])
     has_recently_viewed = len(recently_viewed) > 0
     
     if has_recently_viewed:
-        print(f"최근 본 여행지 수: {len(recently_viewed)}")
+        search_log.debug("최근 본 여행지 수: %s", len(recently_viewed))
     
     # 좋아요한 여행지 ID 출력 (디버깅)
     liked_location_ids = [like.location.id for like in likes]
-    print(f"좋아요한 여행지 ID: {liked_location_ids}")
+    search_log.debug("좋아요한 여행지 ID: %s", liked_location_ids)
     
     # 2. 활동 데이터 기반 추천 비율 결정 (활동이 많을수록 태그 의존도 감소)
     # 활동이 10개 이상이면 태그 기반 추천은 거의 사용하지 않음
     activity_weight = min(total_activities / 10, 1.0)
     tag_weight = 1.0 - activity_weight
     
-    print(f"추천 가중치: 활동 기반 {activity_weight:.2f}, 태그 기반 {tag_weight:.2f}")
+    search_log.debug("추천 가중치: 활동 기반 %.2f, 태그 기반 %.2f", activity_weight, tag_weight)
     
     results = []
     
@@ -373,71 +546,31 @@ def recommend_destinations(request):
             selected_tags = []
         
         if selected_tags:
-            print(f"신규 사용자의 선택 태그 기반 추천: {selected_tags}")
+            search_log.debug("신규 사용자의 선택 태그 기반 추천: %s", selected_tags)
             
             # 각 태그별로 여행지 검색 및 그룹화
             tag_based_results = []
             tag_groups = {}  # 태그별 여행지 그룹
             
+            index = tag_index.get()
+            liked_ids = set(liked_location_ids)
+            
             for tag in selected_tags:
                 # 태그에 해당하는 여행지 검색 (정확한 일치 또는 포함 관계)
                 # 1. 카테고리가 정확히 일치하는 경우
-                exact_matches = Location.objects.filter(category=tag)
-                
-                # 2. 서브카테고리에 포함된 경우 (JSON 필드 검색)
-                # SQLite에서는 JSON 필드 검색이 제한적이므로 Python에서 필터링
-                all_locations = Location.objects.all()
-                subcategory_matches = []
+                exact_match_ids = list(Location.objects.filter(category=tag).values_list('id', flat=True))
                 
-                for loc in all_locations:
-                    if loc.subcategories:
-                        # 문자열인 경우 리스트로 변환 시도
-                        subcats = loc.subcategories
-                        if isinstance(subcats, str):
-                            try:
-                                import json
-                                subcats = json.loads(subcats)
-                            except:
-                                subcats = [subcats]
-                        
-                        # 리스트가 아닌 경우 리스트로 변환
-                        if not isinstance(subcats, list):
-                            subcats = [subcats]
-                        
-                        # 태그가 서브카테고리에 포함되어 있는지 확인
-                        if any(tag.lower() in subcat.lower() for subcat in subcats if subcat):
-                            subcategory_matches.append(loc)
-                
-                # 3. 서브타입에 포함된 경우 (JSON 필드 검색)
-                subtype_matches = []
-                for loc in all_locations:
-                    if loc.subtypes:
-                        # 문자열인 경우 리스트로 변환 시도
-                        subtypes = loc.subtypes
-                        if isinstance(subtypes, str):
-                            try:
-                                import json
-                                subtypes = json.loads(subtypes)
-                            except:
-                                subtypes = [subtypes]
-                        
-                        # 리스트가 아닌 경우 리스트로 변환
-                        if not isinstance(subtypes, list):
-                            subtypes = [subtypes]
-                        
-                        # 태그가 서브타입에 포함되어 있는지 확인
-                        if any(tag.lower() in subtype.lower() for subtype in subtypes if subtype):
-                            subtype_matches.append(loc)
+                # 2. 서브카테고리 / 3. 서브타입에 포함된 경우 (태그 색인 조회, 대소문자 구분 없음)
+                subcategory_match_ids = index.contains('subcategories', tag).tolist()
+                subtype_match_ids = index.contains('subtypes', tag).tolist()
                 
-                # 모든 결과 합치기
-                tag_locations = list(exact_matches) + subcategory_matches + subtype_matches
-                
-                # 중복 제거
-                tag_locations = list({loc.id: loc for loc in tag_locations}.values())
-                
-                # 이미 좋아요한 여행지 제외
-                liked_ids = [like.location.id for like in likes]
-                tag_locations = [loc for loc in tag_locations if loc.id not in liked_ids]
+                # 모든 결과 합치기 (중복 제거, 순서 유지) 및 이미 좋아요한 여행지 제외
+                tag_location_ids = [
+                    loc_id
+                    for loc_id in dict.fromkeys(exact_match_ids + subcategory_match_ids + subtype_match_ids)
+                    if loc_id not in liked_ids
+                ]
+                tag_locations = [loc for loc, _ in hydrate_results([(loc_id, 0.7) for loc_id in tag_location_ids[:5]])]
                 
                 # 결과가 있는 경우에만 태그 그룹 추가
                 if tag_locations:
@@ -468,12 +601,13 @@ def recommend_destinations(request):
                 for location, similarity in group_results:
                     tag_group_recommendations[tag].append((location, similarity))
             
-            print(f"태그 기반 추천 결과: {len(results)}개, 태그 그룹 수: {len(tag_group_recommendations)}")
+            search_log.debug("태그 기반 추천 결과: %s개, 태그 그룹 수: %s", len(results), len(tag_group_recommendations))
     
     # 4. 활동 기반 추천 (좋아요와 리뷰 분석)
     if total_activities > 0:
         # 3.1 좋아요한 여행지 분석
         liked_locations = [like.location for like in likes]
+        liked_id_array = np.unique(np.asarray(liked_location_ids, dtype=np.int64))
         liked_categories = Counter()
         liked_subcategories = Counter()
         liked_subtypes = Counter()
@@ -531,18 +665,18 @@ def recommend_destinations(request):
             elif review.sentiment == 'POSITIVE':
                 positive_reviews.append(review)
         
-        print(f"높은 별점(4-5점)을 준 여행지 ID: {high_rated_location_ids}")
-        print(f"낮은 별점(1-2점)을 준 여행지 ID: {low_rated_location_ids}")
+        search_log.debug("높은 별점(4-5점)을 준 여행지 ID: %s", high_rated_location_ids)
+        search_log.debug("낮은 별점(1-2점)을 준 여행지 ID: %s", low_rated_location_ids)
         
         # 3.3 키워드 빈도 계산
         keyword_counts = Counter(review_keywords)
         top_keywords = [word for word, count in keyword_counts.most_common(10)]
         
-        print(f"상위 키워드: {top_keywords}")
-        print(f"선호 카테고리: {liked_categories.most_common(3)}")
-        print(f"선호 서브카테고리: {liked_subcategories.most_common(5)}")
-        print(f"선호 서브타입: {liked_subtypes.most_common(5)}")
-        print(f"선호 지역: {liked_countries.most_common(3)}")
+        search_log.debug("상위 키워드: %s", top_keywords)
+        search_log.debug("선호 카테고리: %s", liked_categories.most_common(3))
+        search_log.debug("선호 서브카테고리: %s", liked_subcategories.most_common(5))
+        search_log.debug("선호 서브타입: %s", liked_subtypes.most_common(5))
+        search_log.debug("선호 지역: %s", liked_countries.most_common(3))
         
         # 3.4 활동 기반 추천 여행지 검색
         # 좋아요한 여행지의 특성과 리뷰 키워드를 기반으로 유사한 여행지 검색
@@ -550,7 +684,7 @@ def recommend_destinations(request):
         
         # 3.4.1 키워드 기반 검색
         if top_keywords:
-            print(f"Top keywords: {top_keywords}")
+            search_log.debug("Top keywords: %s", top_keywords)
             keyword_results = find_similar_destinations(
                 top_keywords, 
                 user.id, 
@@ -601,7 +735,7 @@ def recommend_destinations(request):
                             # 유사도 점수 증가 (최대 0.95까지)
                             new_similarity = min(similarity + 0.2, 0.95)
                             keyword_results[i] = (location, new_similarity)
-                            print(f"Increased similarity for {location.name} from {similarity} to {new_similarity}")
+                            search_log.debug("Increased similarity for %s from %s to %s", location.name, similarity, new_similarity)
                             break
                     except Location.DoesNotExist:
                         continue
@@ -611,126 +745,71 @@ def recommend_destinations(request):
                 # 대신 activity_based_results에 추가
                 activity_based_results.append((location, similarity))
                 keyword_recommendations.append((location, similarity))  # 키워드 기반 추천 결과 별도 저장
-                print(f"키워드 기반 추천: {location.name}, 유사도: {similarity:.2f}")
+                search_log.debug("키워드 기반 추천: %s, 유사도: %.2f", location.name, similarity)
         
         # 3.4.2 서브카테고리 기반 검색
         if liked_subcategories:
             top_subcategories = [subcat for subcat, _ in liked_subcategories.most_common(5)]
-            print(f"상위 서브카테고리: {top_subcategories}")
+            search_log.debug("상위 서브카테고리: %s", top_subcategories)
             
-            # JSON 필드 검색을 위한 쿼리 구성
-            subcategory_locations = []
+            # 서브카테고리가 정확히 일치하는 여행지 (태그 색인 조회) 중 이미 좋아요한 여행지 제외
+            subcategory_location_ids = np.setdiff1d(
+                tag_index.get().exact('subcategories', top_subcategories), liked_id_array
+            ).tolist()
             
-            # 데이터베이스 호환성 문제로 인해 모든 여행지를 가져와서 Python에서 필터링
-            all_locations = Location.objects.all()
-            
-            for loc in all_locations:
-                if loc.subcategories:
-                    # 문자열인 경우 리스트로 변환
-                    loc_subcats = loc.subcategories
-                    if isinstance(loc_subcats, str):
-                        try:
-                            import json
-                            loc_subcats = json.loads(loc_subcats)
-                        except:
-                            loc_subcats = [loc_subcats]
-                    
-                    # 리스트가 아닌 경우 리스트로 변환
-                    if not isinstance(loc_subcats, list):
-                        loc_subcats = [loc_subcats]
-                    
-                    # 서브카테고리 일치 여부 확인
-                    for subcat in top_subcategories:
-                        if subcat in loc_subcats:
-                            subcategory_locations.append(loc)
-                            break
-            
-            # 중복 제거
-            subcategory_locations = list({loc.id: loc for loc in subcategory_locations}.values())
-            
-            # 이미 좋아요한 여행지 제외
-            liked_ids = [loc.id for loc in liked_locations]
-            subcategory_locations = [loc for loc in subcategory_locations if loc.id not in liked_ids]
-            
-            print(f"서브카테고리 기반 추천 여행지 수: {len(subcategory_locations)}")
+            search_log.debug("서브카테고리 기반 추천 여행지 수: %s", len(subcategory_location_ids))
             
             # 무작위로 섞어서 다양한 추천 결과 제공
-            random.shuffle(subcategory_locations)
+            random.shuffle(subcategory_location_ids)
             
             # 상위 결과만 선택 (유사도 점수 다양화)
             subcategory_results = []
-            for i, loc in enumerate(subcategory_locations[:limit]):
+            subcategory_locations = hydrate_results([(loc_id, 0) for loc_id in subcategory_location_ids[:limit]])
+            for i, (loc, _) in enumerate(subcategory_locations):
                 # 유사도 점수 - 무작위성 제거
                 base_similarity = 0.75 + (i % 4) * 0.05
                 similarity = base_similarity
                 
                 subcategory_results.append((loc, similarity))
-                print(f"서브카테고리 기반 추천: {loc.name}, 유사도: {similarity:.2f}")
+                search_log.debug("서브카테고리 기반 추천: %s, 유사도: %.2f", loc.name, similarity)
             
             activity_based_results.extend(subcategory_results)
         
         # 3.4.3 서브타입 기반 검색
         if liked_subtypes:
             top_subtypes = [subtype for subtype, _ in liked_subtypes.most_common(5)]
-            print(f"상위 서브타입: {top_subtypes}")
-            
-            # JSON 필드 검색을 위한 쿼리 구성
-            subtype_locations = []
-            
-            # 데이터베이스 호환성 문제로 인해 모든 여행지를 가져와서 Python에서 필터링
-            all_locations = Location.objects.all()
-            
-            for loc in all_locations:
-                if loc.subtypes:
-                    # 문자열인 경우 리스트로 변환
-                    loc_subtypes = loc.subtypes
-                    if isinstance(loc_subtypes, str):
-                        try:
-                            import json
-                            loc_subtypes = json.loads(loc_subtypes)
-                        except:
-                            loc_subtypes = [loc_subtypes]
-                    
-                    # 리스트가 아닌 경우 리스트로 변환
-                    if not isinstance(loc_subtypes, list):
-                        loc_subtypes = [loc_subtypes]
-                    
-                    # 서브타입 일치 여부 확인
-                    for subtype in top_subtypes:
-                        # 정확한 일치 또는 부분 일치(포함) 확인
-                        if subtype in loc_subtypes or any(subtype.lower() in st.lower() for st in loc_subtypes):
-                            subtype_locations.append(loc)
-                            break
-            
-            # 중복 제거
-            subtype_locations = list({loc.id: loc for loc in subtype_locations}.values())
+            search_log.debug("상위 서브타입: %s", top_subtypes)
             
+            # 서브타입이 정확히 또는 부분적으로 일치하는 여행지 (태그 색인 조회)
             # 이미 좋아요한 여행지와 서브카테고리 결과에 포함된 여행지 제외
-            liked_ids = [loc.id for loc in liked_locations]
             subcategory_ids = [loc[0].id for loc in subcategory_results]
-            subtype_locations = [loc for loc in subtype_locations if loc.id not in liked_ids and loc.id not in subcategory_ids]
+            subtype_location_ids = np.setdiff1d(
+                tag_index.get().contains_any('subtypes', top_subtypes),
+                np.concatenate([liked_id_array, np.asarray(subcategory_ids, dtype=np.int64)]),
+            ).tolist()
             
-            print(f"서브타입 기반 추천 여행지 수: {len(subtype_locations)}")
+            search_log.debug("서브타입 기반 추천 여행지 수: %s", len(subtype_location_ids))
             
             # 무작위로 섞어서 다양한 추천 결과 제공
-            random.shuffle(subtype_locations)
+            random.shuffle(subtype_location_ids)
             
             # 상위 결과만 선택 (유사도 점수 다양화)
             subtype_results = []
-            for i, loc in enumerate(subtype_locations[:limit]):
+            subtype_locations = hydrate_results([(loc_id, 0) for loc_id in subtype_location_ids[:limit]])
+            for i, (loc, _) in enumerate(subtype_locations):
                 # 유사도 점수 - 무작위성 제거
                 base_similarity = 0.7 + (i % 4) * 0.05
                 similarity = base_similarity
                 
                 subtype_results.append((loc, similarity))
-                print(f"서브타입 기반 추천: {loc.name}, 유사도: {similarity:.2f}")
+                search_log.debug("서브타입 기반 추천: %s, 유사도: %.2f", loc.name, similarity)
             
             activity_based_results.extend(subtype_results)
         
         # 3.4.4 국가 기반 검색
         if liked_countries:
             top_countries = [country for country, _ in liked_countries.most_common(3)]
-            print(f"상위 국가: {top_countries}")
+            search_log.debug("상위 국가: %s", top_countries)
             
             country_locations = Location.objects.filter(country__in=top_countries)
             
@@ -750,7 +829,7 @@ def recommend_destinations(request):
             country_locations_list = list(country_locations)
             random.shuffle(country_locations_list)
             
-            print(f"국가 기반 추천 여행지 수: {len(country_locations_list)}")
+            search_log.debug("국가 기반 추천 여행지 수: %s", len(country_locations_list))
             
             # 상위 결과만 선택 (유사도 점수 다양화)
             country_results = []
@@ -760,7 +839,7 @@ def recommend_destinations(request):
                 similarity = base_similarity
                 
                 country_results.append((loc, similarity))
-                print(f"국가 기반 추천: {loc.name}, 유사도: {similarity:.2f}")
+                search_log.debug("국가 기반 추천: %s, 유사도: %.2f", loc.name, similarity)
             
             activity_based_results.extend(country_results)
         
@@ -789,7 +868,7 @@ def recommend_destinations(request):
             selected_tags = []
         
         if selected_tags:
-            print(f"사용자 선택 태그: {selected_tags}")
+            search_log.debug("사용자 선택 태그: %s", selected_tags)
             
             # 각 태그별로 여행지 검색
             tag_based_results = []
@@ -822,7 +901,7 @@ def recommend_destinations(request):
     
     # 6. 결과가 부족한 경우 인기 여행지로 채우기
     if len(results) < limit:
-        print("추천 결과가 부족하여 인기 여행지로 보충합니다")
+        search_log.debug("추천 결과가 부족하여 인기 여행지로 보충합니다")
         
         # 인기 여행지 (좋아요가 많은 순)
         popular_locations = Location.objects.annotate(
@@ -892,78 +971,37 @@ def recommend_destinations(request):
         rv_subcategories = list(set(rv_subcategories))
         rv_subtypes = list(set(rv_subtypes))
         
-        print(f"최근 본 여행지 국가: {rv_countries}")
-        print(f"최근 본 여행지 서브카테고리: {rv_subcategories}")
-        print(f"최근 본 여행지 서브타입: {rv_subtypes}")
+        search_log.debug("최근 본 여행지 국가: %s", rv_countries)
+        search_log.debug("최근 본 여행지 서브카테고리: %s", rv_subcategories)
+        search_log.debug("최근 본 여행지 서브타입: %s", rv_subtypes)
         
-        # 최근 본 여행지와 유사한 여행지 찾기
-        recently_viewed_locations = []
+        # 최근 본 여행지와 유사한 여행지 찾기 (태그 색인 조회)
+        # 국가 일치 0.3, 서브카테고리/서브타입 부분 일치 각 0.2 (최대 0.7)
+        index = tag_index.get()
+        country_ids = index.exact('country', rv_countries)
+        subcategory_ids = index.contains_any('subcategories', rv_subcategories)
+        subtype_ids = index.contains_any('subtypes', rv_subtypes)
         
-        # 데이터베이스 호환성 문제로 인해 모든 여행지를 가져와서 Python에서 필터링
-        all_locations = Location.objects.all()
+        # 이미 좋아요한 여행지나 최근 본 여행지는 제외
+        excluded_ids = np.asarray(liked_location_ids + [rv.get('id') for rv in recently_viewed if rv.get('id') is not None], dtype=np.int64)
+        candidate_ids = np.setdiff1d(np.union1d(np.union1d(country_ids, subcategory_ids), subtype_ids), excluded_ids)
         
-        for loc in all_locations:
-            # 이미 좋아요한 여행지나 최근 본 여행지는 제외
-            if loc.id in liked_location_ids or any(rv['id'] == loc.id for rv in recently_viewed):
-                continue
-                
-            match_score = 0  # 유사도 점수
-            
-            # 1. 국가 일치 여부 확인
-            if loc.country and loc.country in rv_countries:
-                match_score += 0.3
-            
-            # 2. 서브카테고리 일치 여부 확인
-            if loc.subcategories:
-                loc_subcats = loc.subcategories
-                if isinstance(loc_subcats, str):
-                    try:
-                        import json
-                        loc_subcats = json.loads(loc_subcats)
-                    except:
-                        loc_subcats = [loc_subcats]
-                
-                if not isinstance(loc_subcats, list):
-                    loc_subcats = [loc_subcats]
-                
-                for subcat in rv_subcategories:
-                    if any(subcat.lower() in sc.lower() for sc in loc_subcats):
-                        match_score += 0.2
-                        break
-            
-            # 3. 서브타입 일치 여부 확인
-            if loc.subtypes:
-                loc_subtypes = loc.subtypes
-                if isinstance(loc_subtypes, str):
-                    try:
-                        import json
-                        loc_subtypes = json.loads(loc_subtypes)
-                    except:
-                        loc_subtypes = [loc_subtypes]
-                
-                if not isinstance(loc_subtypes, list):
-                    loc_subtypes = [loc_subtypes]
-                
-                for subtype in rv_subtypes:
-                    if any(subtype.lower() in st.lower() for st in loc_subtypes):
-                        match_score += 0.2
-                        break
-            
-            # 유사도 점수가 0.2 이상인 경우만 추가 (최소 하나 이상 일치)
-            if match_score >= 0.2:
-                # 유사도 점수 최대 0.7로 제한 (너무 높지 않게 설정)
-                match_score = min(match_score, 0.7)
-                recently_viewed_locations.append((loc, match_score))
-        
-        # 유사도 점수 기준으로 정렬
-        recently_viewed_locations.sort(key=lambda x: x[1], reverse=True)
+        match_scores = (
+            0.3 * np.isin(candidate_ids, country_ids, assume_unique=True)
+            + 0.2 * np.isin(candidate_ids, subcategory_ids, assume_unique=True)
+            + 0.2 * np.isin(candidate_ids, subtype_ids, assume_unique=True)
+        )
+        match_scores = np.minimum(match_scores, 0.7)
         
-        # 상위 결과 선택
-        recently_viewed_recommendations = recently_viewed_locations[:limit]
+        # 유사도 점수 기준으로 정렬 (동점은 ID 순) 후 상위 결과 선택
+        order = np.argsort(-match_scores, kind='stable')[:limit]
+        recently_viewed_recommendations = hydrate_results(
+            list(zip(candidate_ids[order].tolist(), match_scores[order].tolist()))
+        )
         
-        print(f"최근 본 여행지 기반 추천 수: {len(recently_viewed_recommendations)}")
+        search_log.debug("최근 본 여행지 기반 추천 수: %s", len(recently_viewed_recommendations))
     
-    print(f"최종 추천 결과: {len(results)}개")
+    search_log.info("최종 추천 결과: %s개", len(results))
     
     # Location 객체를 JSON 직렬화 가능한 딕셔너리로 변환하는 함수
     def location_to_dict(location, similarity, recommendation_type="general"):
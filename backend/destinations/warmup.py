@@ -0,0 +1,112 @@
+"""
+NLP 모델 및 검색 인덱스 예열
+
+프로세스 시작 시 백그라운드 스레드에서 감정 분석/문장 임베딩 모델과 검색 인덱스를 미리 로드하여,
+첫 요청이 모델 로딩 시간을 부담하지 않도록 합니다.
+진행 상태와 단계별 소요 시간은 준비 상태(readiness) 엔드포인트에서 확인할 수 있습니다.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# 지연 초기화(torch 커널 준비 등)를 유도하기 위한 더미 입력
+WARMUP_TEXT = 'warmup: a quiet museum with beautiful gardens'
+
+
+class ModelWarmup:
+    """
+    백그라운드 예열 작업과 그 상태
+
+    상태: 'idle'(시작 전) → 'warming'(진행 중) → 'ready'(완료) 또는 'failed'(오류)
+    """
+
+    def __init__(self):
+        self.state = 'idle'
+        self.error = None
+        self.timings = {}
+        self.started_at = None
+        self.finished_at = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """예열 스레드를 시작합니다. 이미 시작되었으면 아무 작업도 하지 않습니다."""
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self.state = 'warming'
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self.run, name='nlp-warmup', daemon=True)
+            self._thread.start()
+            return True
+
+    def _step(self, name, func):
+        start_time = time.time()
+        result = func()
+        self.timings[name] = round(time.time() - start_time, 3)
+        return result
+
+    def run(self):
+        """검색 문서 로드 → 모델 로드 → 더미 추론 → 검색 인덱스 구축 순서로 예열합니다."""
+        from .nlp_utils import nlp_processor, NLP_ADVANCED
+        from .bm25 import bm25_index
+        from .inverted_index import keyword_index
+        from .search_documents import search_documents
+
+        try:
+            self._step('search_documents', search_documents.get)
+            if NLP_ADVANCED:
+                self._step('load_models', nlp_processor.load_models)
+                self._step('sentiment_inference', lambda: nlp_processor._classify_sentiment_batch([WARMUP_TEXT]))
+                self._step('embedding_inference', lambda: nlp_processor.encode_texts([WARMUP_TEXT]))
+                if nlp_processor.use_matrix_search() or nlp_processor.use_hybrid_search():
+                    from .search_index import destination_index
+                    self._step('destination_index', lambda: destination_index.get(
+                        nlp_processor.encode_texts, store=nlp_processor.get_embedding_store()
+                    ))
+                self._step('keyword_index', keyword_index.get)
+                if nlp_processor.use_hybrid_search():
+                    self._step('bm25_index', bm25_index.get)
+            else:
+                self._step('bm25_index', bm25_index.get)
+            self.state = 'ready'
+            logger.info("NLP 예열 완료 (소요 시간: %.2f초)", sum(self.timings.values()))
+        except Exception as e:
+            self.state = 'failed'
+            self.error = str(e)
+            logger.exception("NLP 예열 중 오류 발생: %s", e)
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def is_ready(self):
+        return self.state == 'ready'
+
+    def status(self):
+        """예열 및 모델/인덱스 상태를 반환합니다."""
+        from .nlp_utils import nlp_processor, NLP_ADVANCED
+        from .bm25 import bm25_index
+        from .inverted_index import keyword_index
+        from .search_index import destination_index
+        from .search_documents import search_documents
+
+        return {
+            'state': self.state,
+            'error': self.error,
+            'nlp_advanced': NLP_ADVANCED,
+            'models_loaded': nlp_processor.models_loaded,
+            'indexes': {
+                'search_documents': search_documents.is_ready,
+                'destination_index': destination_index.is_ready,
+                'keyword_index': keyword_index.is_ready,
+                'bm25_index': bm25_index.is_ready,
+            },
+            'timings': dict(self.timings),
+            'elapsed': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+        }
+
+
+# 싱글톤 예열 작업
+model_warmup = ModelWarmup()